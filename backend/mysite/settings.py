@@ -60,9 +60,32 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Persistent connections: the SQLite profile pragmas run once per worker thread, not per request
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a statement waits for the write lock before failing with "database is locked"
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+            # Write transactions take the write lock on BEGIN instead of failing on the lock upgrade
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # File test database: the concurrency tests read through WAL snapshots from several threads,
+        # which an in-memory database cannot do
+        'TEST': {
+            'NAME': os.getenv('TEST_DB_NAME', str(BASE_DIR / 'test_db.sqlite3')),
+        },
     }
 }
 
+# SQLite profile applied to every new connection (products/utils/sqlite_profile.py): journal mode,
+# sync level, page cache (negative = KiB), memory-mapped I/O in bytes and temporary storage
+SQLITE_PROFILE_ENABLED = os.getenv('SQLITE_PROFILE_ENABLED', 'true').lower() in ('true', '1')
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'wal')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'normal')
+SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', str(-64 * 1024)))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'memory')
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -94,4 +117,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20, # Optimized for frontend performance
-}
\ No newline at end of file
+}
+
+# ETL Configuration - rows written per bulk statement during the load stage
+ETL_LOAD_BATCH_SIZE = int(os.getenv('ETL_LOAD_BATCH_SIZE', '500'))
+# Rows written per committed transaction, so API reads never wait for a whole load (0 = one transaction per load)
+ETL_LOAD_COMMIT_ROWS = int(os.getenv('ETL_LOAD_COMMIT_ROWS', '5000'))
+# Load mode: 'incremental' upserts rows in place, 'shadow' builds the new catalog in a staging
+# table and swaps it in at once (SQLite only, products/etl/shadow_load.py)
+ETL_LOAD_MODE = os.getenv('ETL_LOAD_MODE', 'incremental').lower()
+# Delete the products of a loaded supplier that its file no longer lists
+ETL_SWEEP_ENABLED = os.getenv('ETL_SWEEP_ENABLED', 'true').lower() in ('true', '1')
+
+# Parallel extract+transform: worker processes (1 = sequential) and per-file time limit in seconds
+ETL_WORKERS = int(os.getenv('ETL_WORKERS', '1'))
+ETL_FILE_TIMEOUT = int(os.getenv('ETL_FILE_TIMEOUT', '600'))
+
+# Streaming ETL: read, transform and load supplier files in chunks of ETL_CHUNK_SIZE rows
+ETL_STREAMING = os.getenv('ETL_STREAMING', 'false').lower() in ('true', '1')
+ETL_CHUNK_SIZE = int(os.getenv('ETL_CHUNK_SIZE', '5000'))
+
+# Parsed-workbook cache for the extract stage (size-bounded, LRU eviction)
+ETL_CACHE_ENABLED = os.getenv('ETL_CACHE_ENABLED', 'true').lower() in ('true', '1')
+ETL_CACHE_DIR = os.getenv('ETL_CACHE_DIR', str(BASE_DIR / 'cache' / 'etl'))
+ETL_CACHE_MAX_BYTES = int(os.getenv('ETL_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Background ETL jobs: a queued/running job without progress for this long is considered dead;
+# running jobs save their heartbeat at most this often while they report progress
+ETL_JOB_STALE_SECONDS = int(os.getenv('ETL_JOB_STALE_SECONDS', '1800'))
+ETL_JOB_HEARTBEAT_SECONDS = int(os.getenv('ETL_JOB_HEARTBEAT_SECONDS', '30'))
+
+# ETL progress stream (SSE): keep-alive comment interval, database polling interval
+# used for jobs running in another process, and seconds after which the stream is closed
+# so the browser reconnects (each open stream holds a WSGI worker)
+ETL_SSE_HEARTBEAT_SECONDS = int(os.getenv('ETL_SSE_HEARTBEAT_SECONDS', '15'))
+ETL_SSE_POLL_SECONDS = float(os.getenv('ETL_SSE_POLL_SECONDS', '2'))
+ETL_SSE_MAX_SECONDS = int(os.getenv('ETL_SSE_MAX_SECONDS', '60'))
+
+# Chunked supplier file uploads: maximum file size, suggested and maximum chunk size in bytes,
+# and seconds after which an unfinished upload is discarded from the staging area
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(200 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(4 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('UPLOAD_CHUNK_MAX_BYTES', str(16 * 1024 * 1024)))
+UPLOAD_STAGING_MAX_AGE = int(os.getenv('UPLOAD_STAGING_MAX_AGE', '86400'))
+
+# Product list: seconds the total count of a filter is cached in cursor pagination mode
+PRODUCT_COUNT_CACHE_SECONDS = int(os.getenv('PRODUCT_COUNT_CACHE_SECONDS', '60'))
+
+# Catalog export: rows fetched from the database and written per chunk of the streamed file
+PRODUCT_EXPORT_CHUNK_SIZE = int(os.getenv('PRODUCT_EXPORT_CHUNK_SIZE', '2000'))
+
+# Product list response cache: rendered pages kept per process (LRU, 0 disables it).
+# With PRODUCT_RESPONSE_CACHE_SHARED the pages are also shared by every worker of the host
+# through the 'responses' file cache
+PRODUCT_RESPONSE_CACHE_SIZE = int(os.getenv('PRODUCT_RESPONSE_CACHE_SIZE', '256'))
+PRODUCT_RESPONSE_CACHE_SHARED = os.getenv('PRODUCT_RESPONSE_CACHE_SHARED', 'false').lower() in ('true', '1')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('PRODUCT_RESPONSE_CACHE_DIR', str(BASE_DIR / 'cache' / 'responses')),
+        # Entries of old catalog generations are never read again; let them age out
+        'TIMEOUT': int(os.getenv('PRODUCT_RESPONSE_CACHE_SECONDS', '86400')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('PRODUCT_RESPONSE_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
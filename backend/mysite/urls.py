@@ -2,19 +2,33 @@ from django.contrib import admin
 from django.urls import path
 from products.api.products_api import ProductListAPIView
 from products.views.file_views import file_list, file_upload, file_delete, file_add
-from products.views.etl_views import run_etl, get_etl_status, last_etl_update
-from products.views.provider_views import provider_config, get_file_config
+from products.views.etl_views import run_etl, get_etl_status, last_etl_update, get_etl_job, cancel_job, etl_progress_stream, get_etl_metrics
+from products.views.provider_views import provider_config, get_file_config, preview_config
+from products.views.export_views import export_products
+from products.views.price_views import price_changes
+from products.views.upload_views import upload_create, upload_detail, upload_finalize
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/products/', ProductListAPIView.as_view(), name='product-list'),
+    path('api/products/export/', export_products, name='product-export'),
+    path('api/products/price-changes/', price_changes, name='price-changes'),
     path('files/', file_list, name='file-list'),
     path('files/upload/', file_upload, name='file-upload'),
     path('files/delete/<str:filename>', file_delete, name='file-delete'),
     path('files/add/', file_add, name='file-add'),
+    path('files/uploads/', upload_create, name='upload-create'),
+    path('files/uploads/<uuid:upload_id>/', upload_detail, name='upload-detail'),
+    path('files/uploads/<uuid:upload_id>/finalize/', upload_finalize, name='upload-finalize'),
     path('files/etl/', run_etl, name='run-etl'),
     path('files/etl/status/', get_etl_status, name='get-etl-status'),
+    path('files/etl/metrics/', get_etl_metrics, name='get-etl-metrics'),
+    path('files/etl/jobs/<uuid:job_id>/', get_etl_job, name='get-etl-job'),
+    path('files/etl/jobs/<uuid:job_id>/cancel/', cancel_job, name='cancel-etl-job'),
+    path('files/etl/jobs/<uuid:job_id>/events/', etl_progress_stream, name='etl-job-events'),
+    path('files/etl/events/', etl_progress_stream, name='etl-events'),
     path('files/etl/last-update/', last_etl_update, name='last-etl-update'),
     path('files/config/file/', provider_config, name='provider-config'),
+    path('files/config/preview/', preview_config, name='preview-config'),
     path('files/config/id/<str:file_identifier>/', get_file_config, name='get-file-config'),
 ]
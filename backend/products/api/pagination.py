@@ -0,0 +1,174 @@
+"""
+KEYSET PAGINATION - Constant-time pages for the product list
+
+Page-number pagination runs COUNT(*) over the filtered catalog plus an OFFSET
+scan on every request, so deep pages get slower as the catalog grows.
+Keyset pagination remembers the last row of the page instead, and the next
+page starts from it with an indexed range condition:
+
+    WHERE product_price >= :price AND (product_price > :price OR id > :id)
+    ORDER BY product_price, id
+
+TECHNICAL SOLUTION:
+- One cursor per supported ordering (product_name, product_price,
+  fecha_actualizacion, ascending or descending), with id as tiebreaker
+- Opaque cursors: urlsafe base64 JSON holding the ordering, the last
+  (value, id) pair and the direction (next/previous)
+- The total count is cached per filter and catalog generation for
+  settings.PRODUCT_COUNT_CACHE_SECONDS and flagged as approximate, so no page
+  pays for COUNT(*)
+"""
+
+import json
+import base64
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from products.models import Product
+from products.services.cache_service import catalog_generation
+
+KEYSET_ORDERINGS = ["product_name", "product_price", "fecha_actualizacion"]
+DEFAULT_ORDERING = "product_name"
+COUNT_CACHE_PREFIX = "products:count:"
+
+
+def encode_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Position encoded by encode_cursor; anything but a JSON object is rejected"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise ValidationError({"cursor": "Cursor inválido."})
+    if not isinstance(position, dict):
+        raise ValidationError({"cursor": "Cursor inválido."})
+    return position
+
+
+class ProductKeysetPagination(BasePagination):
+    """Opt-in cursor pagination of ProductListAPIView (?pagination=cursor or ?cursor=...)"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'order_by'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, request):
+        """(field, descending) requested through ?order_by=, validated against KEYSET_ORDERINGS"""
+        ordering = request.query_params.get(self.ordering_query_param) or DEFAULT_ORDERING
+        field = ordering.lstrip("-")
+        if field not in KEYSET_ORDERINGS:
+            raise ValidationError({
+                self.ordering_query_param: f"El orden '{ordering}' no está disponible con paginación por cursor. "
+                                           f"Valores permitidos: {', '.join(KEYSET_ORDERINGS)}."
+            })
+        return field, ordering.startswith("-")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None and position.get("o") != self.ordering_key():
+            raise ValidationError({"cursor": "El cursor no corresponde al orden solicitado."})
+        backwards = position is not None and position.get("d") == "previous"
+        self.count = self.get_cached_count(queryset, request)
+
+        # Walking backwards = same range condition with the ordering reversed, page flipped afterwards
+        descending = self.descending != backwards
+        queryset = queryset.order_by(*self.order_by_fields(descending))
+        if position is not None:
+            queryset = queryset.filter(self.after_condition(position, descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        self.has_next = has_more if not backwards else True
+        self.has_previous = position is not None and (has_more if backwards else True)
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def ordering_key(self):
+        return f"-{self.field}" if self.descending else self.field
+
+    def order_by_fields(self, descending):
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}id"]
+
+    def after_condition(self, position, descending):
+        """Rows strictly after (value, id) in the given direction"""
+        try:
+            value = Product._meta.get_field(self.field).to_python(position["v"])
+            last_id = int(position["id"])
+        except (KeyError, TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({"cursor": "Cursor inválido."})
+        lookup = "lt" if descending else "gt"
+        # The redundant inclusive bound lets the database seek the (field, id) index
+        # instead of scanning it from the start and filtering
+        return Q(**{f"{self.field}__{lookup}e": value}) & (
+            Q(**{f"{self.field}__{lookup}": value}) | Q(**{f"id__{lookup}": last_id})
+        )
+
+    def build_cursor(self, row, direction):
+        value = getattr(row, self.field)
+        value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        return encode_cursor({"o": self.ordering_key(), "v": value, "id": row.id, "d": direction})
+
+    def get_link(self, row, direction):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        return replace_query_param(url, self.cursor_query_param, self.build_cursor(row, direction))
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.get_link(self.last_row, "next")
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_row is None:
+            return None
+        return self.get_link(self.first_row, "previous")
+
+    def get_cached_count(self, queryset, request):
+        """
+        Total rows of the current filters, cached so that paging never runs COUNT(*).
+        Keyed by the catalog generation, so an ETL load or supplier change starts a new count.
+        """
+        filters = {key: request.query_params.get(key, "").strip() for key in ("search", "proveedor")}
+        filters["generation"] = catalog_generation()
+        key = COUNT_CACHE_PREFIX + hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, settings.PRODUCT_COUNT_CACHE_SECONDS)
+        return count
+
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.count,
+            "count_is_approximate": True,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
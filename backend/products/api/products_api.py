@@ -1,9 +1,17 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from products.models import Product
-from products.serializers import ProductSerializer
-from rest_framework.filters import SearchFilter, OrderingFilter
+from products.serializers import ProductSerializer, PRODUCT_ROW_FIELDS, serialize_product_rows
+from products.services.product_service import filter_products, is_valid_ordering
+from products.services.provider_service import list_providers
+from products.services.cache_service import response_cache_key, get_cached_response, store_response
+from products.api.pagination import ProductKeysetPagination
+from products.api.renderers import FastJSONRenderer
+from rest_framework.filters import OrderingFilter
 
 class ProductListPagination(PageNumberPagination):
     page_size = 20 
@@ -13,39 +21,81 @@ class ProductListPagination(PageNumberPagination):
 class ProductListAPIView(ListAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
-    search_fields = ['item', 'product_name', 'proveedor']
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    # Search is resolved in get_queryset through the full-text index
+    filter_backends = [OrderingFilter]
     proveedor = ['proveedor']
     ordering_fields = ['product_price', 'product_name', 'fecha_actualizacion']
 
     pagination_class = ProductListPagination
+    # Opt-in with ?pagination=cursor; the page-number mode stays the default for the UI
+    keyset_pagination_class = ProductKeysetPagination
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get(self, request, *args, **kwargs):
+        # Identical requests within a catalog generation are answered from the response cache
+        self.response_cache_key = response_cache_key(request)
+        if self.response_cache_key is not None:
+            entry = get_cached_response(self.response_cache_key)
+            if entry is not None:
+                return self.cached_response(*entry)
+        return super().get(request, *args, **kwargs)
+
+    def cached_response(self, body, content_type, etag):
+        """
+        Response of a cache hit: an already rendered DRF Response, so finalize_response gives
+        it the negotiated renderer and the same Allow/Vary headers as a miss
+        """
+        response = Response(content_type=content_type)
+        response.content = body
+        response['Content-Type'] = content_type
+        response['ETag'] = etag
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'response_cache_key', None) is None or response.status_code != 200:
+            return response
+        if not response.has_header('ETag'):
+            response.render()
+            store_response(self.response_cache_key, response)
+        # Clients revalidate every time; an unchanged page costs a 304 without body
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(request, etag=response['ETag'], response=response)
 
     def get_queryset(self):
         """
         This method is overridden to allow searching, sorting, and pagination to be applied correctly in the query.
         """
-        queryset = Product.objects.all()
-        
-        search_query = self.request.query_params.get('search', '').strip()
-        proveedor = self.request.query_params.get('proveedor', '').strip()
-        order_by = self.request.query_params.get('order_by', 'product_name')
-        
-        if search_query:
-            queryset = queryset.filter(product_name__istartswith=search_query) | queryset.filter(item__icontains=search_query)
-
-        
-        if proveedor:
-                queryset = queryset.filter(proveedor__icontains=proveedor)
-        
-        queryset = queryset.order_by(order_by)
-        return queryset
+        params = self.request.query_params
+        search_query = params.get('search', '')
+        order_by = params.get('order_by')
+        if not is_valid_ordering(order_by, search_query):
+            raise ValidationError({'order_by': f"El orden '{order_by}' no es válido."})
+        return filter_products(search_query, params.get('proveedor', ''), order_by)
     
     def list(self, request, *args, **kwargs):
-        # Override the `list` method to add unique providers
-        response = super().list(request, *args, **kwargs)
+        # Fast path: rows read as tuples and serialized without model instances,
+        # same output as ProductSerializer (products/serializers.py)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*PRODUCT_ROW_FIELDS, named=True)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(serialize_product_rows(page))
+        else:
+            response = Response(serialize_product_rows(queryset))
+
+        # Materialized provider list, refreshed by the ETL load and file changes
+        providers = list_providers()
 
-        proveedores = Product.objects.values_list('proveedor', flat=True).distinct().order_by('proveedor')
-        
-        response.data['proveedores'] = proveedores
+        response.data['proveedores'] = [provider['name'] for provider in providers]
+        response.data['proveedores_detalle'] = providers
         return Response(response.data)
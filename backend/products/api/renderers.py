@@ -0,0 +1,49 @@
+"""
+FAST JSON RENDERER - Byte-identical drop-in for DRF's JSONRenderer
+
+DRF renders with the standard library json module and a Python-level encoder.
+When orjson is installed, compact responses are encoded by orjson instead; the
+values orjson would spell differently or not encode (datetimes, decimals, lazy
+strings) are handed back to DRF's encoder, so the bytes do not change.
+Without orjson, or for indented output, DRF's renderer is used as is.
+
+Non-finite numbers: DRF's strict JSON (STRICT_JSON, the default) raises
+ValueError for NaN and Infinity. The values DRF's encoder converts to a float
+(Decimal('NaN')) are checked here and fall back to DRF, which raises. orjson
+writes native NaN/Infinity floats as null instead of raising; the product list
+and the export never hold native floats (prices are Decimals rendered as strings).
+"""
+
+import math
+import logging
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, see requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        encoder_default = self.encoder_class().default
+
+        def default(value):
+            value = encoder_default(value)
+            if self.strict and isinstance(value, float) and not math.isfinite(value):
+                raise TypeError(f"Valor numérico no finito: {value}")
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError as e:
+            logger.debug(f"orjson no pudo serializar la respuesta, se usa el codificador estándar: {str(e)}")
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of the JavaScript line separators as DRF
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
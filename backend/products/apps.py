@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def repair_search_index(sender, using="default", **kwargs):
+    # SQLite drops triggers when a migration rebuilds a table; reinstall them after every migrate
+    from products.services.search_service import ensure_search_index
+    ensure_search_index(using)
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        post_migrate.connect(repair_search_index, sender=self)
+        from products.utils.sqlite_profile import apply_sqlite_profile
+        connection_created.connect(apply_sqlite_profile)
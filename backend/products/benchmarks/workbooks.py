@@ -0,0 +1,142 @@
+"""
+SYNTHETIC SUPPLIER WORKBOOKS - Benchmark Input Generator
+
+Builds .xlsx price lists shaped like the real supplier files described in
+config_proveedores.json, together with the matching provider configuration:
+- Title/banner rows above the header (extract_config.skiprows)
+- Extra columns outside the configured range (extract_config.usecols)
+- Currency-formatted prices in en_US ("$1,234.56") and es_AR ("$ 1.234,56")
+  formats, plain numeric prices and a few unparseable values ("Consultar")
+- Product names with junk prefixes ("##", "--", "* ") that the transform strips
+
+Generation is deterministic for a given seed, so runs are comparable. The same
+price list can also be written as CSV (write_csv), for the reader benchmark.
+"""
+
+import os
+import csv
+import numpy as np
+from openpyxl import Workbook
+
+# One entry per supplier layout; providers cycle through them
+PROVIDER_SHAPES = [
+    {
+        "name": "ferreteria",
+        "skiprows": 5,
+        "usecols": "a:e",
+        "columns": ["Codigo", "Descripcion", "Rubro", "Marca", "PrecNeto"],
+        "mappings": {"Codigo": "item", "Descripcion": "product_name", "PrecNeto": "product_price"},
+        "price_format": "en_US",
+        "price_style": "currency",
+        "leading_columns": 0,
+    },
+    {
+        "name": "bulonera",
+        "skiprows": 0,
+        "usecols": "b:d",
+        "columns": ["Art", "Detalle", "Precio"],
+        "mappings": {"Art": "item", "Detalle": "product_name", "Precio": "product_price"},
+        "price_format": "es_AR",
+        "price_style": "currency",
+        "leading_columns": 1,
+    },
+    {
+        "name": "electro",
+        "skiprows": 2,
+        "usecols": "a,c:d",
+        "columns": ["Cod", "Stock", "Nombre", "Lista"],
+        "mappings": {"Cod": "item", "Nombre": "product_name", "Lista": "product_price"},
+        "price_format": "en_US",
+        "price_style": "numeric",
+        "leading_columns": 0,
+    },
+]
+
+JUNK_PREFIXES = ["", "", "##", "--", "* ", ".."]
+PRODUCT_WORDS = ["TORNILLO", "TUERCA", "ARANDELA", "BULON", "CABLE", "LLAVE", "CAÑO", "CODO", "MECHA", "DISCO"]
+INVALID_PRICE_RATE = 0.001
+
+
+def provider_names(count):
+    """Provider names for `count` suppliers: the shape name plus an index when shapes repeat"""
+    names = []
+    for index in range(count):
+        shape = PROVIDER_SHAPES[index % len(PROVIDER_SHAPES)]
+        suffix = "" if index < len(PROVIDER_SHAPES) else str(index // len(PROVIDER_SHAPES) + 1)
+        names.append(shape["name"] + suffix)
+    return names
+
+
+def format_price(value, shape):
+    if shape["price_style"] == "numeric":
+        return float(value)
+    if shape["price_format"] == "es_AR":
+        text = f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return f"$ {text}"
+    return f"${value:,.2f}"
+
+
+def build_rows(rows, shape, seed):
+    """Yields the data rows of one workbook, laid out in the shape's column order"""
+    rng = np.random.default_rng(seed)
+    prices = rng.uniform(10, 250_000, size=rows).round(2)
+    words = rng.integers(0, len(PRODUCT_WORDS), size=rows)
+    prefixes = rng.integers(0, len(JUNK_PREFIXES), size=rows)
+    invalid = rng.random(size=rows) < INVALID_PRICE_RATE
+    padding = [None] * shape["leading_columns"]
+    # Target field of every sheet column; unmapped columns get filler values
+    targets = [shape["mappings"].get(column) for column in shape["columns"]]
+
+    for index in range(rows):
+        values = {
+            "item": f"{shape['name'][:3].upper()}{index:07d}",
+            "product_name": f"{JUNK_PREFIXES[prefixes[index]]}{PRODUCT_WORDS[words[index]]} M{index % 12} X {index % 90}MM",
+            "product_price": "Consultar" if invalid[index] else format_price(prices[index], shape),
+        }
+        yield padding + [values[target] if target else f"X{index % 7}" for target in targets]
+
+
+def write_workbook(file_path, rows, shape, seed=0):
+    """Writes one synthetic price list with banner rows, header and `rows` data rows"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Lista de precios")
+    for banner_index in range(shape["skiprows"]):
+        sheet.append([f"Lista de precios {shape['name']} - línea {banner_index + 1}"])
+    sheet.append([None] * shape["leading_columns"] + shape["columns"])
+    for row in build_rows(rows, shape, seed):
+        sheet.append(row)
+    workbook.save(file_path)
+
+
+def write_csv(file_path, rows, shape, seed=0):
+    """Same price list as write_workbook (same seed, same rows) as a CSV file"""
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for banner_index in range(shape["skiprows"]):
+            writer.writerow([f"Lista de precios {shape['name']} - línea {banner_index + 1}"])
+        writer.writerow([""] * shape["leading_columns"] + shape["columns"])
+        writer.writerows(build_rows(rows, shape, seed))
+
+
+def provider_config(shape):
+    """config_proveedores.json entry matching a generated workbook"""
+    return {
+        "extract_config": {"skiprows": shape["skiprows"], "usecols": shape["usecols"]},
+        "transform_config": {"column_mappings": dict(shape["mappings"]), "price_format": shape["price_format"]},
+    }
+
+
+def generate_dataset(directory, total_rows, providers, seed=0):
+    """
+    Writes `providers` workbooks splitting `total_rows` between them into `directory`.
+    Returns the provider configuration for config_proveedores.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    config = {}
+    names = provider_names(providers)
+    for index, name in enumerate(names):
+        shape = {**PROVIDER_SHAPES[index % len(PROVIDER_SHAPES)], "name": name}
+        rows = total_rows // providers + (1 if index < total_rows % providers else 0)
+        write_workbook(os.path.join(directory, f"{name}_lista.xlsx"), rows, shape, seed + index)
+        config[name] = provider_config(shape)
+    return config
@@ -0,0 +1,276 @@
+"""
+ETL EXTRACT CACHE - Parsed Workbook Cache
+
+Excel parsing dominates the ETL run time, yet most supplier files do not change
+between runs. Each parsed table is stored on disk, keyed by the file content
+and the provider's extract_config, so unchanged files are never parsed twice.
+
+TECHNICAL SOLUTION:
+- Key: sha256 of the file content + extract_config + reader engine (+ cache format version)
+- Storage: Parquet (typed columns, pyarrow). Unlike a pickle, reading an entry never
+  executes code, so a tampered cache directory cannot run anything in the ETL process
+- Object columns (cells of mixed types, e.g. prices typed as numbers and as text) are
+  stored as a type code + text pair per cell and rebuilt exactly, as are the header names
+- Atomic writes (temp file + rename) so parallel workers never read half a file
+- Size-based LRU eviction (settings.ETL_CACHE_MAX_BYTES), hits refresh the mtime
+"""
+
+import os
+import json
+import math
+import hashlib
+import logging
+import datetime
+import tempfile
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from products.etl.readers import read_table, resolve_engine
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional dependency, see requirements.txt; without it the cache is off
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 3
+CACHE_SUFFIX = ".parquet"
+# Entries of earlier cache formats: removed on eviction, never read
+LEGACY_SUFFIXES = (".pkl",)
+HASH_BLOCK_SIZE = 1024 * 1024
+COLUMNS_METADATA_KEY = b"etl_cache_columns"
+OBJECT_COLUMNS_METADATA_KEY = b"etl_cache_object_columns"
+
+# Type codes of the cells of object columns and of the header names
+NONE, NAN, NA, NAT, STR, BOOL, INT, FLOAT, TIMESTAMP, DATETIME, DATE, TIME = range(12)
+
+
+def encode_value(value):
+    """(type code, text) of a cell; raises TypeError for types the cache does not store"""
+    if value is None:
+        return NONE, None
+    if value is pd.NA:
+        return NA, None
+    if value is pd.NaT:
+        return NAT, None
+    if isinstance(value, str):
+        return STR, value
+    if isinstance(value, (bool, np.bool_)):
+        return BOOL, "1" if value else ""
+    if isinstance(value, (int, np.integer)):
+        return INT, str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return (NAN, None) if math.isnan(value) else (FLOAT, repr(float(value)))
+    if isinstance(value, pd.Timestamp):
+        return TIMESTAMP, value.isoformat()
+    if isinstance(value, datetime.datetime):
+        return DATETIME, value.isoformat()
+    if isinstance(value, datetime.date):
+        return DATE, value.isoformat()
+    if isinstance(value, datetime.time):
+        return TIME, value.isoformat()
+    raise TypeError(f"tipo no soportado {type(value).__name__}")
+
+
+DECODERS = {
+    NONE: lambda text: None,
+    NAN: lambda text: float("nan"),
+    NA: lambda text: pd.NA,
+    NAT: lambda text: pd.NaT,
+    STR: str,
+    BOOL: bool,
+    INT: int,
+    FLOAT: float,
+    TIMESTAMP: pd.Timestamp,
+    DATETIME: datetime.datetime.fromisoformat,
+    DATE: datetime.date.fromisoformat,
+    TIME: datetime.time.fromisoformat,
+}
+
+
+def decode_value(code, text):
+    return DECODERS[code](text)
+
+
+def frame_to_table(df):
+    """
+    Arrow table of a parsed dataframe: columns stored by position, header names and
+    object columns encoded losslessly. Raises TypeError/ValueError when the frame holds
+    values the cache does not store.
+    """
+    columns = {}
+    object_columns = []
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        name = f"c{position}"
+        if series.dtype == object:
+            codes, texts = zip(*(encode_value(value) for value in series)) if len(series) else ((), ())
+            columns[name] = pd.Series(texts, dtype=object, index=df.index)
+            columns[f"{name}_type"] = pd.Series(codes, dtype="int8", index=df.index)
+            object_columns.append(position)
+        else:
+            columns[name] = series
+    frame = pd.DataFrame(columns, index=df.index)
+    table = pyarrow.Table.from_pandas(frame)
+    metadata = {
+        **(table.schema.metadata or {}),
+        COLUMNS_METADATA_KEY: json.dumps([encode_value(name) for name in df.columns]).encode(),
+        OBJECT_COLUMNS_METADATA_KEY: json.dumps(object_columns).encode(),
+    }
+    return table.replace_schema_metadata(metadata)
+
+
+def table_to_frame(table):
+    """Inverse of frame_to_table"""
+    metadata = table.schema.metadata
+    names = [decode_value(code, text) for code, text in json.loads(metadata[COLUMNS_METADATA_KEY])]
+    object_columns = set(json.loads(metadata[OBJECT_COLUMNS_METADATA_KEY]))
+    frame = table.to_pandas()
+
+    columns = []
+    for position in range(len(names)):
+        name = f"c{position}"
+        if position in object_columns:
+            values = np.empty(len(frame), dtype=object)
+            values[:] = [
+                decode_value(code, text)
+                for code, text in zip(frame[f"{name}_type"].tolist(), frame[name].tolist())
+            ]
+            columns.append(pd.Series(values, index=frame.index, dtype=object))
+        else:
+            columns.append(frame[name])
+    df = pd.concat(columns, axis=1) if columns else pd.DataFrame(index=frame.index)
+    df.columns = pd.Index(names, dtype=object) if any(not isinstance(name, str) for name in names) else pd.Index(names)
+    return df
+
+
+def file_content_hash(file_path):
+    """sha256 of the file content, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(file_path, extract_config, content_hash=None):
+    """
+    Cache key of a workbook parsed with the given extract_config (None = pandas defaults).
+    `content_hash` is the file's sha256 when already known (recorded by the upload), which
+    saves reading the whole file.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}:".encode())
+    digest.update((content_hash or file_content_hash(file_path)).encode())
+    digest.update(json.dumps(extract_config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(settings.ETL_CACHE_DIR, key + CACHE_SUFFIX)
+
+
+def get_cached_frame(key):
+    """Returns the cached dataframe for `key`, or None on a miss"""
+    path = cache_path(key)
+    try:
+        df = table_to_frame(pyarrow.parquet.read_table(path))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Entrada de caché inválida {path}, se descarta: {str(e)}")
+        remove_entry(path)
+        return None
+
+    # Touch the entry so eviction keeps recently used workbooks
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+
+def store_cached_frame(key, df):
+    """Stores a parsed dataframe and evicts old entries if the cache grew too large"""
+    try:
+        table = frame_to_table(df)
+    except (TypeError, ValueError, pyarrow.ArrowException) as e:
+        logger.info(f"La entrada de caché {key} no se guarda: {str(e)}")
+        return
+
+    os.makedirs(settings.ETL_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.ETL_CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        pyarrow.parquet.write_table(table, temp_path)
+        os.replace(temp_path, cache_path(key))
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la entrada de caché {key}: {str(e)}")
+        remove_entry(temp_path)
+        return
+    evict_cache()
+
+
+def remove_entry(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_cache(max_bytes=None):
+    """
+    Removes the least recently used entries until the cache fits in `max_bytes`.
+    Returns the number of removed entries.
+    """
+    max_bytes = settings.ETL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    try:
+        with os.scandir(settings.ETL_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(LEGACY_SUFFIXES):
+                    remove_entry(entry.path)
+                elif entry.name.endswith(CACHE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_entry(path)
+        total -= size
+        removed += 1
+
+    if removed:
+        logger.info(f"Caché de extracción: {removed} entradas eliminadas por tamaño.")
+    return removed
+
+
+def read_table_cached(file_path, extract_config, content_hash=None):
+    """
+    readers.read_table with the on-disk cache in front of it; the reader engine is part
+    of the key, since engines may type cells differently.
+    Returns (df, cache_hit); cache_hit is None when the cache is disabled.
+    """
+    if not settings.ETL_CACHE_ENABLED or pyarrow is None:
+        return read_table(file_path, extract_config), None
+
+    _, engine = resolve_engine(file_path, extract_config)
+    key = cache_key(file_path, {"extract_config": extract_config, "engine": engine}, content_hash)
+    df = get_cached_frame(key)
+    if df is not None:
+        logger.info(f"Caché de extracción: acierto para {file_path}")
+        return df, True
+
+    df = read_table(file_path, extract_config, engine=engine)
+    store_cached_frame(key, df)
+    return df, False
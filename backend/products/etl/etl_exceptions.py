@@ -12,4 +12,8 @@ class TransformationError(ETLError):
 
 class LoadError(ETLError):
     def __init__(self, message="Error durante la carga de datos"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class ETLCancelled(ETLError):
+    def __init__(self, message="Ejecución del ETL cancelada"):
+        super().__init__(message)
@@ -22,30 +22,21 @@ MEASURED RESULTS:
 """
 
 import os
-import json
 import pandas as pd
 import logging
+from collections import defaultdict
 from datetime import datetime
+from itertools import islice
+from openpyxl import load_workbook
 from pytz import timezone
-from products.utils.file_utils import get_config_path, get_providers_path
+from products.utils.file_utils import get_providers_path
 from products.etl.etl_exceptions import ExtractionError
+from products.etl.cache import read_table_cached
+from products.etl.readers import CSV, XLS, SUPPORTED_EXTENSIONS, detect_format, iter_csv_chunks, parse_usecols, read_options
+from products.services.config_service import load_config, get_provider_matcher
 
 logger = logging.getLogger(__name__)
 
-def load_config():
-    """
-    Loads and returns the provider configuration from the JSON file.
-    """
-    try:
-        config_path = get_config_path()
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_providers = json.load(f)
-            logger.info(f"Configuración recargada: {config_providers}")
-        return config_providers
-    except json.JSONDecodeError as e:
-        logger.error(f"Error al decodificar el JSON de configuración: {str(e)}")
-        return {}
-
 def determine_provider(file_name):
     """
     Dynamic supplier identification from filename patterns
@@ -57,12 +48,11 @@ def determine_provider(file_name):
     This pattern matching enables the scalable architecture that allows
     the system to grow from 5 to N suppliers with only config file updates.
     """
-    config_providers = load_config()
-    for provider in config_providers.keys():
-        if provider in file_name.lower():
-            name_without_extension = os.path.splitext(file_name)[0]
+    matcher = get_provider_matcher()
+    if matcher is not None and matcher.search(file_name.lower()):
+        name_without_extension = os.path.splitext(file_name)[0]
 
-            return name_without_extension.split('_')[0].lower()
+        return name_without_extension.split('_')[0].lower()
         
     return file_name.split('_')[0].lower()
 
@@ -70,10 +60,12 @@ def extract_creation_date(file_path, tz_name="America/Argentina/Buenos_Aires"):
     """
     Extracts the file's creation date from the metadata.
     Returns the date in 'YYYY-MM-DD' format.
+    Filesystems without a birth time (Linux) fall back to the last modification time.
     """
     argentina_tz = timezone(tz_name)
     try:
-        timestamp_creacion = os.stat(file_path).st_birthtime
+        stat = os.stat(file_path)
+        timestamp_creacion = getattr(stat, "st_birthtime", stat.st_mtime)
         creation_date = datetime.fromtimestamp(timestamp_creacion)
         creation_date_tz = argentina_tz.localize(creation_date)
         return creation_date_tz
@@ -81,6 +73,196 @@ def extract_creation_date(file_path, tz_name="America/Argentina/Buenos_Aires"):
         logger.error(f"Error al extraer la fecha de creación del archivo {file_path}: {str(e)}")
         return None
 
+def list_provider_files():
+    """
+    Returns the supplier files (Excel workbooks and CSV price lists) found in the providers directory, sorted by name.
+    """
+    providers_path = get_providers_path()
+    return sorted(
+        file for file in os.listdir(providers_path)
+        if file.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+def get_extract_options(provider, config_providers):
+    """
+    Returns the validated (skiprows, usecols) of a provider, or None when it has no configuration.
+    Raises ExtractionError for invalid values.
+    """
+    if provider not in config_providers:
+        return None
+
+    extract_config = config_providers[provider].get("extract_config", {})
+
+    # Validate that 'skiprows' is a non-negative integer
+    skiprows = extract_config.get("skiprows")
+    if skiprows is None or not isinstance(skiprows, int) or skiprows < 0:
+        raise ExtractionError(
+            f"El valor de 'skiprows' para el proveedor {provider} es inválido: {skiprows}. Debe ser un entero no negativo."
+        )
+
+    # Validate that 'usecols' is a string or None
+    usecols = extract_config.get("usecols", None)
+    if usecols is not None and not isinstance(usecols, str):
+        raise ExtractionError(
+            f"El valor de 'usecols' para el proveedor {provider} es inválido: {usecols}. Debe ser una cadena o nulo."
+        )
+
+    return skiprows, usecols
+
+def iter_sheet_rows(file_path, skiprows=0, usecols=None):
+    """
+    Read-only streaming iterator over the first sheet of an .xlsx workbook.
+    Yields tuples of cell values honoring `skiprows`/`usecols`; blank rows are skipped
+    like pandas does, and only one row is held in memory at a time.
+    """
+    columns = parse_usecols(usecols)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        min_col = columns[0] + 1 if columns else 1
+        max_col = columns[-1] + 1 if columns else None
+        offsets = [index - columns[0] for index in columns] if columns else None
+
+        for row in sheet.iter_rows(min_row=skiprows + 1, min_col=min_col, max_col=max_col, values_only=True):
+            if offsets is not None:
+                row = tuple(row[offset] if offset < len(row) else None for offset in offsets)
+            if all(value is None or value == "" for value in row):
+                continue
+            yield row
+    finally:
+        workbook.close()
+
+def header_columns(header):
+    """
+    Column names of a streamed header row, named like pandas' Excel and CSV readers do:
+    empty cells become "Unnamed: 3" and repeated names get ".1", ".2" suffixes that skip
+    names already in the header ("Precio", "Precio.1", "Precio" -> "Precio.2").
+    """
+    columns = [str(name) if name is not None else f"Unnamed: {position}" for position, name in enumerate(header or ())]
+    unnamed = [position for position, name in enumerate(header or ()) if name is None]
+    counts = defaultdict(int)
+    # Named columns keep their names before the unnamed ones are mangled
+    for position in [p for p in range(len(columns)) if p not in unnamed] + unnamed:
+        column = original = columns[position]
+        count = counts[column]
+        while count > 0:
+            counts[original] = count + 1
+            column = f"{original}.{count}"
+            count = count + 1 if column in columns else counts[column]
+        columns[position] = column
+        counts[column] = count + 1
+    return columns
+
+def iter_sheet_chunks(file_path, skiprows, usecols, chunk_size):
+    """Dataframes of at most `chunk_size` rows streamed from the first sheet of an .xlsx workbook"""
+    rows = iter_sheet_rows(file_path, skiprows=skiprows, usecols=usecols)
+    columns = header_columns(next(rows, None))
+    logger.info(f"Columnas leídas: {columns}")
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame.from_records(chunk, columns=columns)
+
+def extract_file_chunks(file, config_providers, chunk_size):
+    """
+    Streaming counterpart of extract_file: yields (df, metadata) chunks of at most
+    `chunk_size` rows, so peak memory depends on the chunk size and not on the file size.
+
+    .xlsx workbooks (first sheet) and CSV files are streamed; legacy .xls files and
+    workbooks read from other or several sheets are read whole and then split.
+    """
+    file_path = os.path.join(get_providers_path(), file)
+
+    try:
+        provider = determine_provider(file)
+    except ValueError as e:
+        raise ExtractionError(str(e)) from e
+
+    extract_options = get_extract_options(provider, config_providers)
+    extract_config = config_providers[provider].get("extract_config", {}) if extract_options is not None else None
+    file_format = detect_format(file_path)
+    if file_format == XLS or (file_format != CSV and read_options(extract_config)["sheet"] != 0):
+        df, metadata = extract_file(file, config_providers)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size], metadata
+        return
+
+    logger.info(f"Procesando archivo en modo streaming: {file_path}")
+    update_date = extract_creation_date(file_path)
+    metadata = {'proveedor': provider, 'fecha_actualizacion': update_date, 'file': file}
+
+    if extract_options is None:
+        logger.warning(f"No se encontró configuración para el proveedor {provider}. Utilizando configuración predeterminada.")
+        extract_options = (0, None)
+    skiprows, usecols = extract_options
+
+    try:
+        if file_format == CSV:
+            frames = iter_csv_chunks(file_path, extract_config, chunk_size)
+        else:
+            frames = iter_sheet_chunks(file_path, skiprows, usecols, chunk_size)
+
+        total_rows = 0
+        for df in frames:
+            total_rows += len(df)
+            df["proveedor"] = provider
+            df["fecha_actualizacion"] = update_date
+            yield df, metadata
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Error inesperado en la extracción del archivo {file}: {str(e)}") from e
+
+    if not total_rows:
+        raise ExtractionError(
+            f"El archivo {file} no contiene datos después de aplicar 'skiprows' y 'usecols'. Revise la configuración de extracción."
+        )
+
+def extract_file(file, config_providers, content_hash=None):
+    """
+    Extracts a single supplier file using its provider configuration.
+    Returns (df, metadata) and raises ExtractionError when the file cannot be read.
+    `content_hash` is the sha256 recorded when the file was uploaded, if still valid.
+
+    Used directly by the parallel ETL workers, one call per supplier file.
+    """
+    file_path = os.path.join(get_providers_path(), file)
+    logger.info(f"Procesando archivo: {file_path}")
+
+    try:
+        provider = determine_provider(file)
+    except ValueError as e:
+        raise ExtractionError(str(e)) from e
+
+    update_date = extract_creation_date(file_path)
+
+    try:
+        # Dynamic configuration per supplier - enables scalability without code changes
+        # Parsed files are cached by file content + extract_config + reader engine (products/etl/cache.py)
+        extract_options = get_extract_options(provider, config_providers)
+        if extract_options is not None:
+            extract_config = config_providers[provider].get("extract_config", {})
+            df, cache_hit = read_table_cached(file_path, extract_config, content_hash)
+            logger.info(f"Columnas leídas: {df.columns.tolist()}")
+            if df.empty:
+                raise ExtractionError(
+                    f"El archivo {file} no contiene datos después de aplicar 'skiprows' y 'usecols'. Revise la configuración de extracción."
+                )
+        else:
+            logger.warning(f"No se encontró configuración para el proveedor {provider}. Utilizando configuración predeterminada.")
+            df, cache_hit = read_table_cached(file_path, None, content_hash)
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Error inesperado en la extracción del archivo {file}: {str(e)}") from e
+
+    # Metadata preservation for audit trails and data freshness tracking
+    metadata = {'proveedor': provider, 'fecha_actualizacion': update_date, 'file': file, 'cache_hit': cache_hit}
+    df["proveedor"] = provider
+    df["fecha_actualizacion"] = update_date
+    return df, metadata
+
 def extract_data():
     """
     Multi-supplier data extraction eliminating manual file searches
@@ -99,62 +281,13 @@ def extract_data():
     PERFORMANCE: Processes 15,000+ products across multiple suppliers automatically
     """
     dataframes = []
-    providers_path = get_providers_path()
     config_providers = load_config()
 
-    for file in os.listdir(providers_path):
-        file_path = os.path.join(providers_path, file)
-
-        if file_path.lower().endswith(('.xlsx', '.xls', '.XLSX', '.XLS')):
-            logger.info(f"Procesando archivo: {file_path}")
-
-            try:
-                provider = determine_provider(file)
-            except ValueError as e:
-                logger.error(str(e))
-                continue
-
-            update_date = extract_creation_date(file_path)
-
-            try:
-                # Dynamic configuration per supplier - enables scalability without code changes
-                if provider in config_providers:
-                    extract_config = config_providers[provider].get("extract_config", {})
-                    
-                    # Validate that 'skiprows' is a non-negative integer
-                    skiprows = extract_config.get("skiprows")
-                    if skiprows is None or not isinstance(skiprows, int) or skiprows < 0:
-                        raise ExtractionError(
-                            f"El valor de 'skiprows' para el proveedor {provider} es inválido: {skiprows}. Debe ser un entero no negativo."
-                        )
-
-                    # Validate that 'usecols' is a string or None
-                    usecols = extract_config.get("usecols", None)
-                    if usecols is not None and not isinstance(usecols, str):
-                        raise ExtractionError(
-                            f"El valor de 'usecols' para el proveedor {provider} es inválido: {usecols}. Debe ser una cadena o nulo."
-                        )
-                    
-                    df = pd.read_excel(file_path, skiprows=skiprows, usecols=usecols, header=0)
-                    logger.info(f"Columnas leídas: {df.columns.tolist()}")
-                    if df.empty:
-                        raise ExtractionError(
-                            f"El archivo {file} no contiene datos después de aplicar 'skiprows' y 'usecols'. Revise la configuración de extracción."
-                        )
-                else:
-                    logger.warning(f"No se encontró configuración para el proveedor {provider}. Utilizando configuración predeterminada.")
-                    df = pd.read_excel(file_path)
-            except ExtractionError as ex:
-                logger.error(f"Error en la extracción para el archivo {file}: {str(ex)}")
-                continue
-            except Exception as e:
-                logger.error(f"Error inesperado en la extracción del archivo {file}: {str(e)}")
-                continue
-
-            # Metadata preservation for audit trails and data freshness tracking
-            metadata = {'proveedor': provider, 'fecha_actualizacion': update_date}
-            df["proveedor"] = provider
-            df["fecha_actualizacion"] = update_date
-            dataframes.append((df, metadata))
+    for file in list_provider_files():
+        try:
+            dataframes.append(extract_file(file, config_providers))
+        except ExtractionError as ex:
+            logger.error(f"Error en la extracción para el archivo {file}: {str(ex)}")
+            continue
             
-    return dataframes
\ No newline at end of file
+    return dataframes
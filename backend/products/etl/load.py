@@ -4,10 +4,29 @@ ETL LOAD MODULE - Optimized Database Operations
 PERFORMANCE OPTIMIZATION (Real client data):
 - 15,000+ products: Previous individual saves ~45+ minutes
 - Bulk operations: Same dataset loaded in <2 minutes
-- Memory efficient: Processes data in chunks to handle large files
+- Set-based lookups: One query per supplier instead of one query per row
+- Change detection: Only new or modified rows are written
+- Price history: old vs. new prices of the modified rows compared in one
+  vectorized pass; only real price changes are appended to ProductPriceHistory
+- Mark and sweep: every load takes a new load generation and stamps it on
+  every product its files list (unchanged ones with one UPDATE per batch);
+  products of a loaded supplier left with an older generation disappeared
+  from its file and are deleted with one statement per supplier
+- Suppliers registered in the Provider table (source file, extraction time) and
+  their counts/last update refreshed once every product is written
+- Cached product list responses invalidated (catalog generation bump) only
+  when the load actually wrote products
+- Memory efficient: Writes data in bounded chunks to handle large files
 
 BUSINESS CONTINUITY:
-- Atomic transactions prevent partial data states if process is interrupted
+- Writes committed in bounded transactions (settings.ETL_LOAD_COMMIT_ROWS): API
+  reads keep being served during a load instead of waiting for the write lock
+- Price history rows are committed with the product updates they describe; an
+  interrupted or cancelled load leaves whole batches behind, which the next run
+  completes since unchanged rows are skipped; supplier counts and the catalog
+  generation are refreshed for those batches on the way out, so cached
+  responses never outlive them (ETL_LOAD_COMMIT_ROWS = 0 loads in a single
+  transaction that an error rolls back)
 - Separate handling of updates vs. creates optimizes for different use cases
 - Comprehensive logging enables tracking of data changes for audit purposes
 
@@ -15,63 +34,465 @@ DATABASE IMPACT: This optimization eliminated the 20% processing bottleneck
 that was part of the original manual workflow inefficiencies.
 """
 
-from products.models import Product
-from django.db import transaction
+import time
 import logging
+from contextlib import nullcontext
+from decimal import ROUND_HALF_EVEN
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.db.models import F
+from products.models import CatalogState, Product, ProductPriceHistory
+from products.utils.db_utils import QueryCounter, chunked
+from products.services.provider_service import register_providers, refresh_providers
+from products.services.cache_service import bump_catalog_generation
 
-def load_to_database(dataframes):
+logger = logging.getLogger(__name__)
+
+# (proveedor, item) is the natural key of a product, enforced by a unique constraint
+UNIQUE_FIELDS = ["proveedor", "item"]
+UPDATE_FIELDS = ["product_name", "product_price", "fecha_actualizacion", "content_hash", "load_generation"]
+
+
+def compute_content_hashes(df):
+    """
+    Vectorized hash of the loaded fields (product_name + price rounded to cents).
+    Returns one 16-char hex digest per row. fecha_actualizacion is left out on purpose:
+    a re-uploaded file with the same prices must not rewrite every product.
+    """
+    hashed = pd.util.hash_pandas_object(
+        pd.DataFrame({
+            "product_name": df["product_name"].astype(str),
+            "product_price": df["product_price"].astype(float).round(2),
+        }),
+        index=False,
+    )
+    return [f"{value:016x}" for value in hashed.to_numpy()]
+
+
+def next_load_generation():
+    """Takes the generation of a new load from the CatalogState counter"""
+    updated = CatalogState.objects.filter(pk=1).update(load_generation=F("load_generation") + 1)
+    if not updated:
+        CatalogState.objects.create(pk=1, load_generation=1)
+    return CatalogState.objects.filter(pk=1).values_list("load_generation", flat=True).get()
+
+
+def provider_sources(dataframes):
+    """{supplier name: source file metadata} of the extracted dataframes, for register_providers"""
+    return {
+        metadata["proveedor"]: {
+            "source_file": metadata.get("file"),
+            "source_modified_at": metadata["fecha_actualizacion"],
+        }
+        for _, metadata in dataframes
+    }
+
+
+def fetch_existing_products(provider_ids):
+    """
+    Returns {(proveedor, item): (id, content_hash, product_price)} for every stored product of the given suppliers.
+    Runs one query per supplier regardless of how many rows the files contain.
+    """
+    existing = {}
+    for provider, provider_id in provider_ids.items():
+        products = Product.objects.filter(proveedor_id=provider_id).values_list("item", "id", "content_hash", "product_price")
+        for item, product_id, content_hash, product_price in products:
+            existing[(provider, item)] = (product_id, content_hash, product_price)
+    return existing
+
+
+def collect_rows(dataframes, provider_ids, generation=0):
+    """
+    Flattens the transformed dataframes into {(proveedor, item): product_data},
+    stamped with the load `generation`.
+    A repeated item inside the same supplier keeps its last occurrence.
+    """
+    rows = {}
+    duplicates = 0
+
+    for df, metadata in dataframes:
+        provider = metadata["proveedor"]
+        provider_id = provider_ids[provider]
+        update_date = metadata["fecha_actualizacion"]
+        columns = df[["item", "product_name", "product_price"]]
+        hashes = compute_content_hashes(columns)
+
+        for (item, product_name, product_price), content_hash in zip(columns.itertuples(index=False, name=None), hashes):
+            key = (provider, str(item))
+            if key in rows:
+                duplicates += 1
+            rows[key] = {
+                "item": key[1],
+                "product_name": product_name,
+                "product_price": product_price,
+                "proveedor_id": provider_id,
+                "fecha_actualizacion": update_date,
+                "content_hash": content_hash,
+                "load_generation": generation,
+            }
+
+    if duplicates:
+        logger.warning(f"Se encontraron {duplicates} productos repetidos en los archivos; se conserva la última aparición.")
+    return rows
+
+
+def fetch_existing_items(provider, provider_id, items, batch_size):
+    """
+    Returns {(proveedor, item): (id, content_hash, product_price)} for the given items of one supplier.
+    Used by the streaming loader, so the lookup stays bounded by the chunk size.
+    """
+    existing = {}
+    for items_batch in chunked(items, batch_size):
+        products = Product.objects.filter(proveedor_id=provider_id, item__in=items_batch).values_list("item", "id", "content_hash", "product_price")
+        for item, product_id, content_hash, product_price in products:
+            existing[(provider, item)] = (product_id, content_hash, product_price)
+    return existing
+
+
+def price_cents(price):
+    """
+    Integer cents of a price, rounded like the DecimalField stores it. Decimal arithmetic
+    only: prices above 2**53 cents or halfway cases would not survive a float round trip.
+    """
+    field = Product._meta.get_field("product_price")
+    return int(field.to_python(price).scaleb(field.decimal_places).to_integral_value(ROUND_HALF_EVEN))
+
+
+def detect_price_changes(changed_keys, rows, existing):
+    """
+    Old vs. new price comparison of the modified products, in integer cents.
+    Returns the keys whose price changed; products modified only in their name are left out.
+    """
+    return [
+        key for key in changed_keys
+        if price_cents(existing[key][2]) != price_cents(rows[key]["product_price"])
+    ]
+
+
+def build_price_history(price_changed_keys, rows, existing, run=None, changed_at=None):
+    """ProductPriceHistory rows for the given keys, all stamped with the same load time"""
+    changed_at = changed_at or timezone.now()
+    return [
+        ProductPriceHistory(
+            product_id=existing[key][0],
+            proveedor_id=rows[key]["proveedor_id"],
+            run=run,
+            old_price=existing[key][2],
+            new_price=rows[key]["product_price"],
+            changed_at=changed_at,
+        )
+        for key in price_changed_keys
+    ]
+
+
+def classify_rows(rows, existing, provider_counts):
+    """
+    Splits `rows` by content hash against `existing`: new products, modified ones and
+    unchanged ones, plus the modified ones whose price changed.
+    Accumulates created/updated/unchanged/price_changes counts per supplier in `provider_counts`.
+    Returns (new_keys, changed_keys, unchanged_keys, price_changed_keys).
+    """
+    new_keys = []
+    changed_keys = []
+    unchanged_keys = []
+    for key, product_data in rows.items():
+        counts = provider_counts.setdefault(key[0], {"created": 0, "updated": 0, "unchanged": 0, "price_changes": 0, "swept": 0})
+        if key not in existing:
+            new_keys.append(key)
+            counts["created"] += 1
+        elif existing[key][1] != product_data["content_hash"]:
+            changed_keys.append(key)
+            counts["updated"] += 1
+        else:
+            unchanged_keys.append(key)
+            counts["unchanged"] += 1
+
+    price_changed_keys = set(detect_price_changes(changed_keys, rows, existing))
+    for key in price_changed_keys:
+        provider_counts[key[0]]["price_changes"] += 1
+    return new_keys, changed_keys, unchanged_keys, price_changed_keys
+
+
+def write_products(rows, existing, batch_size, provider_counts, on_progress=None, run=None, commit_rows=None, generation=0, on_commit=None):
+    """
+    Compares content hashes against `existing` and writes only what changed, in chunks:
+    new products are bulk inserted, modified ones go through a native upsert on
+    (proveedor, item) and unchanged ones only get the load `generation` stamped.
+    Price changes of the modified products are appended to ProductPriceHistory.
+    Every `commit_rows` rows are written in their own transaction (None = one transaction),
+    the price history of a batch included.
+    Accumulates created/updated/unchanged/price_changes counts per supplier in `provider_counts`.
+    `on_progress(written, total)` is called after every chunk; it may raise to abort.
+    `on_commit(rows)` is called after the transaction of every written batch closes.
+    """
+    new_keys, changed_keys, unchanged_keys, price_changed_keys = classify_rows(rows, existing, provider_counts)
+    changed_at = timezone.now()
+
+    total = len(new_keys) + len(changed_keys)
+    commit_rows = max(commit_rows or total, 1)
+    written = 0
+
+    for batch in chunked(new_keys, commit_rows):
+        with transaction.atomic():
+            for chunk in chunked(batch, batch_size):
+                Product.objects.bulk_create([Product(**rows[key]) for key in chunk])
+                written += len(chunk)
+                if on_progress:
+                    on_progress(written, total)
+        if on_commit:
+            on_commit(len(batch))
+
+    for batch in chunked(changed_keys, commit_rows):
+        with transaction.atomic():
+            for chunk in chunked(batch, batch_size):
+                Product.objects.bulk_create(
+                    [Product(**rows[key]) for key in chunk],
+                    update_conflicts=True,
+                    unique_fields=UNIQUE_FIELDS,
+                    update_fields=UPDATE_FIELDS,
+                )
+                written += len(chunk)
+                if on_progress:
+                    on_progress(written, total)
+
+            price_history = build_price_history([key for key in batch if key in price_changed_keys], rows, existing, run, changed_at)
+            for chunk in chunked(price_history, batch_size):
+                ProductPriceHistory.objects.bulk_create(chunk)
+        if on_commit:
+            on_commit(len(batch))
+
+    # Marks the unchanged products as still listed; not counted as written rows
+    for batch in chunked(unchanged_keys, commit_rows):
+        with transaction.atomic():
+            for chunk in chunked(batch, batch_size):
+                Product.objects.filter(id__in=[existing[key][0] for key in chunk]).update(load_generation=generation)
+
+
+def sweep_targets(provider_counts, provider_ids, keep_providers=()):
+    """
+    {supplier: provider_id} of the loaded suppliers to sweep (settings.ETL_SWEEP_ENABLED).
+    Left as is:
+    - suppliers in `keep_providers`: one of their files failed or was skipped, and
+      the rows missing from this load may be in that file
+    - suppliers without loaded rows: an empty file is more likely a broken export
+      than an empty catalog
+    """
+    if not settings.ETL_SWEEP_ENABLED:
+        return {}
+    targets = {}
+    for provider, provider_id in provider_ids.items():
+        if provider in keep_providers:
+            logger.warning(f"Un archivo de {provider} no se pudo cargar; no se eliminan sus productos.")
+        elif provider in provider_counts:
+            targets[provider] = provider_id
+        else:
+            logger.warning(f"El archivo de {provider} no tiene filas; no se eliminan sus productos.")
+    return targets
+
+
+def sweep_providers(provider_counts, provider_ids, generation, keep_providers=()):
+    """
+    Deletes the products of the loaded suppliers whose load generation is older than
+    `generation`: the supplier file of this load no longer lists them. One statement
+    per supplier, plus one for their price history. Suppliers in `keep_providers` are skipped.
+    Accumulates the swept count per supplier in `provider_counts`. Returns the total.
+    """
+    product_table = Product._meta.db_table
+    history_table = ProductPriceHistory._meta.db_table
+    swept = 0
+    with connection.cursor() as cursor:
+        for provider, provider_id in sweep_targets(provider_counts, provider_ids, keep_providers).items():
+            counts = provider_counts[provider]
+            # The price history foreign key is only cascaded by the ORM
+            cursor.execute(
+                f'DELETE FROM "{history_table}" WHERE product_id IN '
+                f'(SELECT id FROM "{product_table}" WHERE proveedor_id = %s AND load_generation < %s)',
+                [provider_id, generation],
+            )
+            cursor.execute(
+                f'DELETE FROM "{product_table}" WHERE proveedor_id = %s AND load_generation < %s',
+                [provider_id, generation],
+            )
+            counts["swept"] = cursor.rowcount
+            swept += cursor.rowcount
+            if cursor.rowcount:
+                logger.info(f"{cursor.rowcount} productos de {provider} ya no figuran en su archivo y fueron eliminados.")
+    return swept
+
+
+def load_transaction(commit_rows):
+    """Transaction around a whole load, only when writes are not committed in batches (commit_rows = 0)"""
+    return nullcontext() if commit_rows else transaction.atomic()
+
+
+def publish_interrupted_load(provider_ids):
+    """
+    Way out of a failed or cancelled load with bounded commits: the batches committed
+    before the error stay in the catalog, so supplier counts and the catalog generation
+    (cached responses, list counts) are refreshed for them. Never raises: the load's
+    own error is the one reported.
+    """
+    try:
+        with transaction.atomic():
+            refresh_providers(provider_ids.values())
+            bump_catalog_generation()
+        logger.warning("Carga interrumpida: los lotes ya confirmados quedan publicados en el catálogo.")
+    except Exception as e:
+        logger.error(f"No se pudo publicar la carga interrumpida: {str(e)}")
+
+
+def catalog_changed(provider_counts):
+    """True when the load created, updated or swept at least one product"""
+    return any(counts["created"] or counts["updated"] or counts["swept"] for counts in provider_counts.values())
+
+
+def build_load_stats(rows, provider_counts, queries, started):
+    """Run report of the load stage, also logged for quick inspection"""
+    elapsed = time.perf_counter() - started
+    stats = {
+        "rows": rows,
+        "created": sum(counts["created"] for counts in provider_counts.values()),
+        "updated": sum(counts["updated"] for counts in provider_counts.values()),
+        "unchanged": sum(counts["unchanged"] for counts in provider_counts.values()),
+        "price_changes": sum(counts["price_changes"] for counts in provider_counts.values()),
+        "swept": sum(counts["swept"] for counts in provider_counts.values()),
+        "providers": provider_counts,
+        "queries": queries,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
+    logger.info(f"{stats['created']} productos nuevos creados.")
+    logger.info(f"{stats['updated']} productos existentes actualizados, {stats['unchanged']} sin cambios.")
+    logger.info(f"{stats['price_changes']} cambios de precio registrados en el historial.")
+    logger.info(f"{stats['swept']} productos eliminados por no figurar en los archivos de sus proveedores.")
+    logger.info(
+        f"Carga finalizada: {stats['rows']} filas en {stats['seconds']}s "
+        f"({stats['rows_per_second']} filas/s, {stats['queries']} consultas)."
+    )
+    return stats
+
+
+def load_to_database(dataframes, batch_size=None, on_progress=None, run=None, commit_rows=None, keep_providers=()):
     """
     Optimized bulk loading for large product catalogs
-    
+
     PERFORMANCE IMPACT (Real client measurements):
     - 15,000+ products: Previous individual database saves ~45+ minutes
     - Bulk operations: Same dataset loaded in <2 minutes (96% time reduction)
-    - Memory efficient: Processes data in manageable chunks
-    
+    - Existing products fetched with one query per supplier, not one per row
+    - Writes split in chunks of `batch_size` rows (settings.ETL_LOAD_BATCH_SIZE)
+
     ERROR PREVENTION & AUDIT:
-    - Atomic transactions prevent partial data corruption during large loads
-    - Comprehensive logging tracks all data changes for client audit requirements
-    - Separate handling of new vs. existing products optimizes database operations
-    
+    - Writes committed every `commit_rows` rows (settings.ETL_LOAD_COMMIT_ROWS,
+      0 = the whole load in one transaction), so readers are never locked out
+      for the length of a load; a load that fails after some commits still
+      refreshes the supplier counts and the catalog generation for them
+    - Content hashes compared in bulk: unchanged products are not rewritten,
+      which keeps write transactions (and SQLite write locks) short
+    - Updates use native upsert on the (proveedor, item) unique constraint
+    - Price changes appended to ProductPriceHistory, linked to `run` (the ETL job)
+    - Products missing from the file of a loaded supplier are swept once every
+      batch is written (settings.ETL_SWEEP_ENABLED), except the suppliers in
+      `keep_providers` (a file of theirs failed in this run)
+    - Returns created/updated/unchanged/price_changes/swept counts per supplier, query
+      count and rows/sec for the run report
+
     BUSINESS VALUE: Eliminated the processing bottleneck that contributed to
     manual workflow inefficiencies, enabling real-time product catalog updates.
     """
-    existing_products = []
-    new_products = []
+    batch_size = batch_size or settings.ETL_LOAD_BATCH_SIZE
+    commit_rows = settings.ETL_LOAD_COMMIT_ROWS if commit_rows is None else commit_rows
+    started = time.perf_counter()
+    counter = QueryCounter()
 
-    for df, metadata in dataframes:
-        data = df.to_dict(orient="records")
-
-        for row in data:
-            product_data = {
-                "item": row["item"],
-                "product_name": row["product_name"],
-                "product_price": row["product_price"],
-                "proveedor": row["proveedor"],
-                "fecha_actualizacion": metadata["fecha_actualizacion"],
-            }
+    with connection.execute_wrapper(counter):
+        # Bulk database operations - Critical performance optimization
+        # Previous approach: Individual saves for each product (45+ minutes for 15k products)
+        # Current approach: Chunked bulk inserts plus chunked native upserts
+        provider_counts = {}
+        provider_ids = {}
+        committed = []
+        published = False
+        try:
+            with load_transaction(commit_rows):
+                generation = next_load_generation()
+                provider_ids = register_providers(provider_sources(dataframes))
+                rows = collect_rows(dataframes, provider_ids, generation)
+                existing = fetch_existing_products(provider_ids)
+
+                write_products(
+                    rows, existing, batch_size, provider_counts, on_progress, run, commit_rows, generation,
+                    on_commit=committed.append,
+                )
+                # Generation bumped after the last batch is committed: pages cached mid-load become unreachable
+                with transaction.atomic():
+                    sweep_providers(provider_counts, provider_ids, generation, keep_providers)
+                    refresh_providers(provider_ids.values())
+                    if catalog_changed(provider_counts):
+                        bump_catalog_generation()
+                published = True
+        finally:
+            # Batches committed before an error or cancellation stay; a single transaction was rolled back
+            if not published and commit_rows and committed:
+                publish_interrupted_load(provider_ids)
+
+    return build_load_stats(len(rows), provider_counts, counter.count, started)
+
+
+def load_chunks(chunks, batch_size=None, on_progress=None, run=None, commit_rows=None, keep_providers=()):
+    """
+    Streaming loader: consumes an iterable of (df, metadata) chunks one at a time.
+
+    MEMORY: only the current chunk and the ids of its existing products are kept,
+    so a 500k-row price list loads with the same footprint as a 5k-row one.
+    Writes are committed every `commit_rows` rows, like load_to_database (including the
+    refresh of supplier counts and catalog generation when the load fails); the sweep
+    runs once the last chunk is loaded, so a file that fails midway sweeps nothing;
+    `keep_providers` is read at that point, so it may be filled while the chunks are produced.
+    `on_progress(rows_loaded, None)` is called after every chunk; it may raise to abort.
+    """
+    batch_size = batch_size or settings.ETL_LOAD_BATCH_SIZE
+    commit_rows = settings.ETL_LOAD_COMMIT_ROWS if commit_rows is None else commit_rows
+    started = time.perf_counter()
+    counter = QueryCounter()
+    total_rows = 0
+    provider_counts = {}
+
+    provider_ids = {}
+    committed = []
+    published = False
+
+    with connection.execute_wrapper(counter):
+        try:
+            with load_transaction(commit_rows):
+                generation = next_load_generation()
+                for df, metadata in chunks:
+                    provider = metadata["proveedor"]
+                    if provider not in provider_ids:
+                        provider_ids.update(register_providers(provider_sources([(df, metadata)])))
+
+                    rows = collect_rows([(df, metadata)], provider_ids, generation)
+                    items = [item for _, item in rows]
+                    existing = fetch_existing_items(provider, provider_ids[provider], items, batch_size)
+
+                    write_products(
+                        rows, existing, batch_size, provider_counts, run=run, commit_rows=commit_rows,
+                        generation=generation, on_commit=committed.append,
+                    )
+                    total_rows += len(rows)
+                    if on_progress:
+                        on_progress(total_rows, None)
+
+                with transaction.atomic():
+                    sweep_providers(provider_counts, provider_ids, generation, keep_providers)
+                    refresh_providers(provider_ids.values())
+                    if catalog_changed(provider_counts):
+                        bump_catalog_generation()
+                published = True
+        finally:
+            if not published and commit_rows and committed:
+                publish_interrupted_load(provider_ids)
 
-            try:
-                existing_product = Product.objects.filter(item=row["item"]).first()
-                if existing_product:
-                    existing_product.product_name = row["product_name"]
-                    existing_product.product_price = row["product_price"]
-                    existing_product.proveedor = row["proveedor"]
-                    existing_product.fecha_actualizacion = metadata["fecha_actualizacion"]
-                    existing_products.append(existing_product)
-                else:
-                    new_products.append(Product(**product_data))
-            except Exception as e:
-                logging.error(f"Error al procesar el producto {row['item']}: {str(e)}")
-
-    # Bulk database operations - Critical performance optimization
-    # Previous approach: Individual saves for each product (45+ minutes for 15k products)
-    # Current approach: Two bulk operations completing in <2 minutes
-    with transaction.atomic():
-        if new_products:
-            Product.objects.bulk_create(new_products)
-            logging.info(f"{len(new_products)} productos nuevos creados.")
-
-        if existing_products:
-            Product.objects.bulk_update(existing_products, fields=["product_name", "product_price", "proveedor", "fecha_actualizacion"])
-            logging.info(f"{len(existing_products)} productos existentes actualizados.")
+    return build_load_stats(total_rows, provider_counts, counter.count, started)
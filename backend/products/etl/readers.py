@@ -0,0 +1,244 @@
+"""
+READER ENGINES - Pluggable readers for supplier price lists
+
+Suppliers publish .xlsx, legacy .xls and CSV price lists, some of them with the
+catalog split across several sheets. The extract stage reads every format
+through read_table, which picks a reader engine per file.
+
+TECHNICAL SOLUTION:
+- The format is detected from the file signature, not the extension: zip
+  container (xlsx), OLE2 compound file (xls), anything else is read as CSV
+- Engines per format, fastest available first:
+  * xlsx: calamine (Rust reader, optional python-calamine) > openpyxl
+  * xls: calamine > xlrd
+  * csv: pyarrow (Arrow multithreaded CSV parser, optional) > pandas C parser
+- extract_config options (all optional):
+  * engine: force an engine; an engine that is not installed falls back to the
+    automatic choice with a warning
+  * sheet: sheet index or name, a list of them, or "*" for every sheet; sheets
+    share the layout (skiprows/usecols/header) and are concatenated in order
+  * delimiter / encoding: CSV only; sniffed from the first block when absent
+- CSV cells are read as text, like Excel text cells: item codes keep their
+  leading zeros and prices go through the transform's price parser
+"""
+
+import csv
+import logging
+import pandas as pd
+from openpyxl.utils import column_index_from_string
+from products.etl.etl_exceptions import ExtractionError
+
+try:
+    import python_calamine
+except ImportError:  # Optional dependency, see requirements.txt
+    python_calamine = None
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:  # Optional dependency, see requirements.txt
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+XLSX = "xlsx"
+XLS = "xls"
+CSV = "csv"
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+FILE_SIGNATURES = [
+    (b"PK\x03\x04", XLSX),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", XLS),
+]
+CSV_SNIFF_BYTES = 64 * 1024
+# csv.Sniffer grows faster than linearly with the sample: a few lines are enough
+CSV_SNIFF_LINES = 50
+CSV_DELIMITERS = ",;\t|"
+ALL_SHEETS = "*"
+
+
+def detect_format(file_path):
+    """xlsx, xls or csv, from the first bytes of the file"""
+    with open(file_path, "rb") as f:
+        head = f.read(8)
+    for signature, file_format in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return file_format
+    return CSV
+
+
+def parse_usecols(usecols):
+    """
+    Converts an Excel-style column selection ("a:e", "A,C:E") into sorted 0-based indexes.
+    Returns None when every column is used.
+    """
+    if not usecols:
+        return None
+    indexes = set()
+    for part in usecols.replace(" ", "").split(","):
+        start, _, end = part.partition(":")
+        first = column_index_from_string(start.upper())
+        last = column_index_from_string(end.upper()) if end else first
+        indexes.update(range(first - 1, last))
+    return sorted(indexes)
+
+
+def read_options(extract_config):
+    """Reader options of an extract_config (None = defaults: first sheet, header on the first row)"""
+    extract_config = extract_config or {}
+    sheet = extract_config.get("sheet", 0)
+    return {
+        "skiprows": extract_config.get("skiprows") or 0,
+        "usecols": extract_config.get("usecols"),
+        "sheet": None if sheet == ALL_SHEETS else sheet,
+        "engine": extract_config.get("engine"),
+        "delimiter": extract_config.get("delimiter"),
+        "encoding": extract_config.get("encoding"),
+    }
+
+
+def concat_sheets(frames):
+    """read_excel returns a dict when several sheets are requested: concatenated in sheet order"""
+    if not isinstance(frames, dict):
+        return frames
+    frames = [frame for frame in frames.values() if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def excel_reader(engine):
+    def read(file_path, options, nrows=None):
+        frames = pd.read_excel(
+            file_path, engine=engine, sheet_name=options["sheet"],
+            skiprows=options["skiprows"], usecols=options["usecols"], header=0, nrows=nrows,
+        )
+        return concat_sheets(frames)
+    return read
+
+
+def sniff_csv(file_path, options):
+    """(delimiter, encoding) of a CSV file; configured values win over the sniffed ones"""
+    with open(file_path, "rb") as f:
+        head = f.read(CSV_SNIFF_BYTES)
+
+    encoding = options["encoding"]
+    if encoding is None:
+        try:
+            head.decode("utf-8")
+            encoding = "utf-8-sig"
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut at the end of the block is still utf-8
+            encoding = "utf-8-sig" if e.start >= len(head) - 3 else "latin-1"
+
+    delimiter = options["delimiter"]
+    if delimiter is None:
+        # Banner rows above the header (skiprows) are not part of the table
+        lines = head.decode(encoding, errors="ignore").splitlines()[options["skiprows"]:]
+        sample = "\n".join([line for line in lines if line.strip()][:CSV_SNIFF_LINES])
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+    return delimiter, encoding
+
+
+def select_columns(df, usecols):
+    """Applies an Excel-style usecols to a dataframe read with every column"""
+    indexes = parse_usecols(usecols)
+    if indexes is None:
+        return df
+    return df.iloc[:, [index for index in indexes if index < df.shape[1]]]
+
+
+def read_csv_pandas(file_path, options, nrows=None):
+    delimiter, encoding = sniff_csv(file_path, options)
+    df = pd.read_csv(
+        file_path, sep=delimiter, encoding=encoding, skiprows=options["skiprows"], header=0,
+        dtype=str, nrows=nrows, skip_blank_lines=True,
+    )
+    return select_columns(df, options["usecols"])
+
+
+def read_csv_arrow(file_path, options, nrows=None):
+    if nrows is not None:
+        # The Arrow reader has no row limit; a sample is cheaper with the pandas parser
+        return read_csv_pandas(file_path, options, nrows)
+
+    delimiter, encoding = sniff_csv(file_path, options)
+    read_options = pyarrow.csv.ReadOptions(skip_rows=options["skiprows"], encoding=encoding.replace("-sig", ""))
+    # Quoted cells spanning several lines are not parsed (newlines_in_values stays off, it
+    # disables the parallel parser); those files, and any other Arrow parse error, fall
+    # back to the pandas parser
+    parse_options = pyarrow.csv.ParseOptions(delimiter=delimiter)
+    try:
+        # Header read first so every column can be declared as text
+        with pyarrow.csv.open_csv(file_path, read_options=read_options, parse_options=parse_options) as reader:
+            names = reader.schema.names
+        convert_options = pyarrow.csv.ConvertOptions(
+            column_types={name: pyarrow.string() for name in names}, strings_can_be_null=True,
+        )
+        table = pyarrow.csv.read_csv(file_path, read_options=read_options, parse_options=parse_options, convert_options=convert_options)
+    except pyarrow.ArrowInvalid as e:
+        logger.info(f"El lector pyarrow no pudo leer {file_path} ({str(e)}); se usa pandas.")
+        return read_csv_pandas(file_path, options)
+    df = table.to_pandas()
+    if names and names[0].startswith("\ufeff"):
+        df = df.rename(columns={names[0]: names[0].lstrip("\ufeff")})
+    return select_columns(df, options["usecols"])
+
+
+ENGINES = {
+    "calamine": {"formats": (XLSX, XLS), "available": python_calamine is not None, "read": excel_reader("calamine")},
+    "openpyxl": {"formats": (XLSX,), "available": True, "read": excel_reader("openpyxl")},
+    "xlrd": {"formats": (XLS,), "available": True, "read": excel_reader("xlrd")},
+    "pyarrow": {"formats": (CSV,), "available": pyarrow is not None, "read": read_csv_arrow},
+    "pandas": {"formats": (CSV,), "available": True, "read": read_csv_pandas},
+}
+# Automatic choice per format, fastest first
+ENGINE_PREFERENCE = {
+    XLSX: ["calamine", "openpyxl"],
+    XLS: ["calamine", "xlrd"],
+    CSV: ["pyarrow", "pandas"],
+}
+
+
+def available_engines(file_format):
+    return [name for name in ENGINE_PREFERENCE[file_format] if ENGINES[name]["available"]]
+
+
+def resolve_engine(file_path, extract_config=None):
+    """(file format, engine name) used to read `file_path` with `extract_config`"""
+    file_format = detect_format(file_path)
+    requested = read_options(extract_config)["engine"]
+    if requested is not None:
+        if requested not in ENGINES:
+            raise ExtractionError(f"Motor de lectura desconocido: '{requested}'. Valores permitidos: {', '.join(ENGINES)}.")
+        if file_format not in ENGINES[requested]["formats"]:
+            raise ExtractionError(f"El motor '{requested}' no puede leer archivos {file_format}.")
+        if ENGINES[requested]["available"]:
+            return file_format, requested
+        logger.warning(f"El motor de lectura '{requested}' no está instalado, se usa la selección automática.")
+    return file_format, available_engines(file_format)[0]
+
+
+def read_table(file_path, extract_config=None, nrows=None, engine=None):
+    """
+    Reads a supplier file into a dataframe with the header row as column names.
+    `engine` forces an engine (benchmarks); otherwise it is resolved from the file and config.
+    """
+    options = read_options(extract_config)
+    if engine is None:
+        _, engine = resolve_engine(file_path, extract_config)
+    return ENGINES[engine]["read"](file_path, options, nrows)
+
+
+def iter_csv_chunks(file_path, extract_config, chunk_size):
+    """Streaming read of a CSV file, `chunk_size` rows at a time (pandas parser, text cells)"""
+    options = read_options(extract_config)
+    delimiter, encoding = sniff_csv(file_path, options)
+    with pd.read_csv(
+        file_path, sep=delimiter, encoding=encoding, skiprows=options["skiprows"], header=0,
+        dtype=str, chunksize=chunk_size, skip_blank_lines=True,
+    ) as chunks:
+        for chunk in chunks:
+            yield select_columns(chunk, options["usecols"])
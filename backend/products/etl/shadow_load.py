@@ -0,0 +1,366 @@
+"""
+SHADOW LOAD - New catalog built in a staging table and swapped in at once
+
+The in-place load (load.py) upserts rows into the live products table: readers
+see a half-loaded catalog between its commits, and every written row also
+updates the secondary indexes one entry at a time.
+
+TECHNICAL SOLUTION (settings.ETL_LOAD_MODE = "shadow", SQLite only):
+- products_product_shadow is created with the exact DDL of the live table,
+  without its secondary indexes or search triggers; its AUTOINCREMENT sequence
+  continues the live one, so new ids never reuse an id of a deleted product
+- New and modified rows are bulk inserted (modified ones keep their id, so
+  price history and API links stay valid); unchanged rows of the loaded
+  suppliers are copied from the live table with the load generation stamped,
+  one INSERT ... SELECT per batch
+- Once every chunk is written, the shadow rows of the loaded suppliers are
+  compared with the live ones to count created/updated/unchanged products and
+  stage the price history: an item repeated across files or chunks is counted
+  once, by its last occurrence
+- Mark and sweep: rows of the loaded suppliers that the files no longer list
+  keep an older generation and are left behind when the rest of the live table
+  is copied; the swap drops their price history
+- Swap transaction (IMMEDIATE, so concurrent writers wait for it): the rows of
+  the other suppliers are copied with one INSERT ... SELECT, the live table is
+  renamed away, the shadow table takes its name, the secondary indexes are built in one pass each (SQLite index names
+  are database-wide, so they can only be created once the previous table's
+  are dropped), the search index receives only the delta of the loaded
+  suppliers, then the staged price history, a foreign key check, provider
+  counts and the catalog generation
+- Renames run with foreign key enforcement off and legacy_alter_table on, so
+  the price history foreign key and the search view keep pointing at
+  "products_product" instead of following the renamed table
+- Readers (WAL, products/utils/sqlite_profile.py) keep reading the previous
+  catalog until the swap commits; a failed or cancelled load only drops the
+  shadow table and leaves the live catalog untouched
+- Loads that change nothing skip the swap
+"""
+
+import re
+import time
+import logging
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from products.models import Product, ProductPriceHistory
+from products.etl.etl_exceptions import LoadError
+from products.etl.load import (
+    next_load_generation, provider_sources, collect_rows, fetch_existing_items, classify_rows,
+    price_cents, sweep_targets, catalog_changed, build_load_stats,
+)
+from products.utils.db_utils import QueryCounter, chunked
+from products.services.provider_service import register_providers, refresh_providers
+from products.services.cache_service import bump_catalog_generation
+from products.services.search_service import swap_search_index
+
+logger = logging.getLogger(__name__)
+
+LOAD_MODES = ("incremental", "shadow")
+PRODUCT_TABLE = Product._meta.db_table
+SHADOW_TABLE = f"{PRODUCT_TABLE}_shadow"
+OLD_TABLE = f"{PRODUCT_TABLE}_old"
+HISTORY_TABLE = ProductPriceHistory._meta.db_table
+# Price history of the load, staged per connection until the swap publishes it
+STAGED_HISTORY_TABLE = "shadow_price_history"
+PRODUCT_COLUMNS = ["item", "product_name", "product_price", "fecha_actualizacion", "content_hash", "proveedor_id", "load_generation"]
+HISTORY_COLUMNS = ["product_id", "proveedor_id", "run_id", "old_price", "new_price", "changed_at"]
+CREATE_TABLE_PATTERN = re.compile(r'^CREATE TABLE\s+"?' + PRODUCT_TABLE + r'"?', re.IGNORECASE)
+
+
+def shadow_load_enabled():
+    """True when the ETL loads through a shadow table (settings.ETL_LOAD_MODE)"""
+    mode = settings.ETL_LOAD_MODE
+    if mode not in LOAD_MODES:
+        logger.warning(f"Modo de carga desconocido: '{mode}'. Se usa la carga incremental.")
+        return False
+    if mode == "shadow" and connection.vendor != "sqlite":
+        logger.warning("La carga con tabla temporal requiere SQLite. Se usa la carga incremental.")
+        return False
+    return mode == "shadow"
+
+
+def product_table_schema(cursor):
+    """(CREATE TABLE statement, [(index name, CREATE INDEX statement)]) of the live products table"""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [PRODUCT_TABLE])
+    table_sql = cursor.fetchone()[0]
+    # Automatic indexes of the UNIQUE constraint have no statement and come with the table
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL", [PRODUCT_TABLE])
+    return table_sql, cursor.fetchall()
+
+
+def drop_shadow_tables(cursor):
+    for table in (SHADOW_TABLE, OLD_TABLE):
+        cursor.execute(f'DROP TABLE IF EXISTS "{table}"')
+    cursor.execute(f'DROP TABLE IF EXISTS temp."{STAGED_HISTORY_TABLE}"')
+
+
+def create_shadow_table(cursor):
+    """Creates the empty shadow table, continuing the live AUTOINCREMENT sequence, and the price history staging table"""
+    drop_shadow_tables(cursor)
+    table_sql, _ = product_table_schema(cursor)
+    cursor.execute(CREATE_TABLE_PATTERN.sub(f'CREATE TABLE "{SHADOW_TABLE}"', table_sql, count=1))
+    cursor.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT %s, seq FROM sqlite_sequence WHERE name = %s",
+        [SHADOW_TABLE, PRODUCT_TABLE],
+    )
+    columns = ", ".join(f'"{column}"' for column in HISTORY_COLUMNS)
+    cursor.execute(f'CREATE TEMP TABLE "{STAGED_HISTORY_TABLE}" AS SELECT {columns} FROM "{HISTORY_TABLE}" WHERE 0')
+
+
+def product_values(rows, keys, existing=None):
+    """
+    Row tuples (PRODUCT_COLUMNS) of the given keys, prepared like the ORM would;
+    with `existing` the id of the stored product comes first.
+    """
+    price_field = Product._meta.get_field("product_price")
+    date_field = Product._meta.get_field("fecha_actualizacion")
+    # Every row of a supplier file shares its update date
+    dates = {}
+    values = []
+    for key in keys:
+        data = rows[key]
+        date = data["fecha_actualizacion"]
+        if date not in dates:
+            dates[date] = date_field.get_db_prep_save(date, connection)
+        row = (
+            data["item"], data["product_name"], price_field.get_db_prep_save(data["product_price"], connection),
+            dates[date], data["content_hash"], data["proveedor_id"], data["load_generation"],
+        )
+        values.append(row if existing is None else (existing[key][0], *row))
+    return values
+
+
+def insert_shadow_rows(cursor, values, batch_size, with_id=False):
+    """
+    Bulk inserts product_values() tuples into the shadow table.
+    A row repeated in a later chunk replaces the earlier one, like the upsert of the in-place load.
+    """
+    columns = ", ".join(f'"{column}"' for column in (["id"] if with_id else []) + PRODUCT_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(PRODUCT_COLUMNS) + with_id))
+    sql = f'INSERT OR REPLACE INTO "{SHADOW_TABLE}" ({columns}) VALUES ({placeholders})'
+    for chunk in chunked(values, batch_size):
+        cursor.executemany(sql, chunk)
+
+
+def classify_shadow_rows(cursor, provider_ids, provider_counts):
+    """
+    Created/updated/unchanged counts of the finished shadow table, per loaded supplier,
+    against the live table. Classifying the final rows counts an item repeated across
+    files or chunks once, by its last occurrence. Accumulates them in `provider_counts`.
+    """
+    names = {provider_id: provider for provider, provider_id in provider_ids.items()}
+    cursor.execute(
+        f'SELECT shadow.proveedor_id, SUM(live.id IS NULL), '
+        f'SUM(live.id IS NOT NULL AND live.content_hash IS NOT shadow.content_hash), '
+        f'SUM(live.id IS NOT NULL AND live.content_hash IS shadow.content_hash) '
+        f'FROM "{SHADOW_TABLE}" shadow LEFT JOIN "{PRODUCT_TABLE}" live ON live.id = shadow.id '
+        f'WHERE shadow.proveedor_id IN ({", ".join(["%s"] * len(names))}) GROUP BY shadow.proveedor_id',
+        list(names),
+    )
+    for provider_id, created, updated, unchanged in cursor.fetchall():
+        provider_counts[names[provider_id]] = {
+            "created": created, "updated": updated, "unchanged": unchanged, "price_changes": 0, "swept": 0,
+        }
+
+
+def stage_price_history(cursor, provider_ids, provider_counts, run, changed_at, batch_size):
+    """
+    Stages the ProductPriceHistory rows (HISTORY_COLUMNS) of the finished shadow table:
+    modified products whose price differs, in integer cents, from the live one.
+    Accumulates the price_changes count per supplier in `provider_counts`.
+    """
+    names = {provider_id: provider for provider, provider_id in provider_ids.items()}
+    cursor.execute(
+        f'SELECT shadow.id, shadow.proveedor_id, live.product_price, shadow.product_price '
+        f'FROM "{SHADOW_TABLE}" shadow JOIN "{PRODUCT_TABLE}" live ON live.id = shadow.id '
+        f'WHERE live.content_hash IS NOT shadow.content_hash AND shadow.proveedor_id IN ({", ".join(["%s"] * len(names))})',
+        list(names),
+    )
+    changed_ids = []
+    for product_id, provider_id, old_price, new_price in cursor.fetchall():
+        if price_cents(old_price) != price_cents(new_price):
+            changed_ids.append(product_id)
+            provider_counts[names[provider_id]]["price_changes"] += 1
+
+    columns = ", ".join(HISTORY_COLUMNS)
+    for chunk in chunked(changed_ids, batch_size):
+        cursor.execute(
+            f'INSERT INTO temp."{STAGED_HISTORY_TABLE}" ({columns}) '
+            f'SELECT shadow.id, shadow.proveedor_id, %s, live.product_price, shadow.product_price, %s '
+            f'FROM "{SHADOW_TABLE}" shadow JOIN "{PRODUCT_TABLE}" live ON live.id = shadow.id '
+            f'WHERE shadow.id IN ({", ".join(["%s"] * len(chunk))})',
+            [run.pk if run else None, changed_at, *chunk],
+        )
+
+
+def stamp_unchanged_rows(cursor, ids, generation, batch_size):
+    """Copies unchanged live products into the shadow table, stamped with the load `generation`"""
+    columns = [f'"{field.column}"' for field in Product._meta.concrete_fields if field.column != "load_generation"]
+    for chunk in chunked(ids, batch_size):
+        cursor.execute(
+            f'INSERT OR REPLACE INTO "{SHADOW_TABLE}" ({", ".join(columns)}, "load_generation") '
+            f'SELECT {", ".join(columns)}, %s FROM "{PRODUCT_TABLE}" WHERE id IN ({", ".join(["%s"] * len(chunk))})',
+            [generation, *chunk],
+        )
+
+
+def count_swept_rows(cursor, provider_counts, targets, generation):
+    """
+    Counts, per supplier to sweep, the live products the load left with an older generation.
+    Accumulates them in `provider_counts`. Returns the total.
+    """
+    swept = 0
+    for provider, provider_id in targets.items():
+        cursor.execute(
+            f'SELECT COUNT(*) FROM "{PRODUCT_TABLE}" live WHERE proveedor_id = %s AND load_generation < %s '
+            f'AND NOT EXISTS (SELECT 1 FROM "{SHADOW_TABLE}" shadow WHERE shadow.id = live.id)',
+            [provider_id, generation],
+        )
+        provider_counts[provider]["swept"] = cursor.fetchone()[0]
+        swept += provider_counts[provider]["swept"]
+        if provider_counts[provider]["swept"]:
+            logger.info(f"{provider_counts[provider]['swept']} productos de {provider} ya no figuran en su archivo y serán eliminados.")
+    return swept
+
+
+def check_foreign_keys(cursor):
+    """Raises LoadError when the swapped catalog or the price history reference missing rows"""
+    for table in (PRODUCT_TABLE, HISTORY_TABLE):
+        cursor.execute(f'PRAGMA foreign_key_check("{table}")')
+        violations = cursor.fetchall()
+        if violations:
+            raise LoadError(
+                f"El intercambio de la tabla de productos dejaría {len(violations)} filas de {table} "
+                f"con referencias inválidas; se descarta."
+            )
+
+
+def copy_remaining_rows(cursor, swept_ids, generation):
+    """
+    Copies the live rows the load did not write (other suppliers) into the shadow table,
+    except the older generation rows of the swept suppliers `swept_ids`
+    """
+    columns = ", ".join(f'"{field.column}"' for field in Product._meta.concrete_fields)
+    sweep = ""
+    params = []
+    if swept_ids:
+        sweep = f' AND NOT (live.proveedor_id IN ({", ".join(["%s"] * len(swept_ids))}) AND live.load_generation < %s)'
+        params = [*swept_ids, generation]
+    cursor.execute(
+        f'INSERT INTO "{SHADOW_TABLE}" ({columns}) SELECT {columns} FROM "{PRODUCT_TABLE}" live '
+        f'WHERE NOT EXISTS (SELECT 1 FROM "{SHADOW_TABLE}" shadow WHERE shadow.id = live.id){sweep}',
+        params,
+    )
+    return cursor.rowcount
+
+
+def delete_swept_history(cursor, swept_ids):
+    """Deletes the price history of the products the swap removed; the foreign key is only cascaded by the ORM"""
+    for provider_id in swept_ids:
+        cursor.execute(
+            f'DELETE FROM "{HISTORY_TABLE}" WHERE product_id IN (SELECT id FROM "{OLD_TABLE}" old '
+            f'WHERE old.proveedor_id = %s AND NOT EXISTS (SELECT 1 FROM "{PRODUCT_TABLE}" live WHERE live.id = old.id))',
+            [provider_id],
+        )
+
+
+def swap_shadow_table(cursor, provider_ids, swept_ids, generation):
+    """
+    Completes the shadow table and replaces the live products table by it in one
+    transaction. The rows of the other suppliers are copied in that transaction: it
+    starts IMMEDIATE, so no write to the live table can land between the copy and the
+    swap. Foreign keys are checked before committing. Returns the number of copied rows.
+    Must run outside any transaction: SQLite only toggles foreign key enforcement there.
+    """
+    if not connection.disable_constraint_checking():
+        raise LoadError("El intercambio de la tabla de productos no puede ejecutarse dentro de una transacción.")
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        with transaction.atomic():
+            copied = copy_remaining_rows(cursor, swept_ids, generation)
+
+            _, indexes = product_table_schema(cursor)
+            cursor.execute(f'ALTER TABLE "{PRODUCT_TABLE}" RENAME TO "{OLD_TABLE}"')
+            for name, _ in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+            cursor.execute(f'ALTER TABLE "{SHADOW_TABLE}" RENAME TO "{PRODUCT_TABLE}"')
+            for _, statement in indexes:
+                cursor.execute(statement)
+
+            swap_search_index(cursor, OLD_TABLE, provider_ids)
+            delete_swept_history(cursor, swept_ids)
+            columns = ", ".join(HISTORY_COLUMNS)
+            cursor.execute(f'INSERT INTO "{HISTORY_TABLE}" ({columns}) SELECT {columns} FROM temp."{STAGED_HISTORY_TABLE}"')
+            check_foreign_keys(cursor)
+            refresh_providers(provider_ids)
+            bump_catalog_generation()
+    finally:
+        cursor.execute("PRAGMA legacy_alter_table = OFF")
+        connection.enable_constraint_checking()
+    return copied
+
+
+def load_shadow(chunks, batch_size=None, on_progress=None, run=None, total_rows=None, keep_providers=()):
+    """
+    Shadow table loader: consumes (df, metadata) dataframes or chunks, like load_chunks,
+    and publishes the new catalog with a table swap. Returns the same run report as the
+    in-place loaders, plus the build and swap timings. Suppliers in `keep_providers`
+    are not swept, like in load_chunks.
+    `on_progress(rows_loaded, total_rows)` is called after every chunk; it may raise to abort.
+    """
+    batch_size = batch_size or settings.ETL_LOAD_BATCH_SIZE
+    started = time.perf_counter()
+    counter = QueryCounter()
+    loaded_rows = 0
+    provider_counts = {}
+    provider_ids = {}
+    changed_at = ProductPriceHistory._meta.get_field("changed_at").get_db_prep_save(timezone.now(), connection)
+    generation = next_load_generation()
+
+    with connection.execute_wrapper(counter), connection.cursor() as cursor:
+        create_shadow_table(cursor)
+        try:
+            for df, metadata in chunks:
+                provider = metadata["proveedor"]
+                if provider not in provider_ids:
+                    provider_ids.update(register_providers(provider_sources([(df, metadata)])))
+
+                rows = collect_rows([(df, metadata)], provider_ids, generation)
+                items = [item for _, item in rows]
+                existing = fetch_existing_items(provider, provider_ids[provider], items, batch_size)
+                # Counted once the shadow table is complete: an item may come back in a later chunk
+                new_keys, changed_keys, unchanged_keys, _ = classify_rows(rows, existing, {})
+
+                insert_shadow_rows(cursor, product_values(rows, new_keys), batch_size)
+                insert_shadow_rows(cursor, product_values(rows, changed_keys, existing), batch_size, with_id=True)
+                stamp_unchanged_rows(cursor, [existing[key][0] for key in unchanged_keys], generation, batch_size)
+
+                loaded_rows += len(rows)
+                if on_progress:
+                    on_progress(loaded_rows, total_rows)
+
+            if provider_ids:
+                classify_shadow_rows(cursor, provider_ids, provider_counts)
+                stage_price_history(cursor, provider_ids, provider_counts, run, changed_at, batch_size)
+            targets = sweep_targets(provider_counts, provider_ids, keep_providers)
+            swept_ids = list(targets.values())
+            count_swept_rows(cursor, provider_counts, targets, generation)
+            build_seconds = time.perf_counter() - started
+            swap_started = time.perf_counter()
+            if catalog_changed(provider_counts):
+                copied = swap_shadow_table(cursor, list(provider_ids.values()), swept_ids, generation)
+                logger.info(f"Carga con tabla temporal: {copied} filas de otros proveedores copiadas; tabla de productos intercambiada.")
+            else:
+                refresh_providers(provider_ids.values())
+                logger.info("Carga con tabla temporal: sin cambios en el catálogo, no se intercambia la tabla.")
+            swap_seconds = time.perf_counter() - swap_started
+        finally:
+            # The previous table (after a swap) or the unused shadow table (failure, cancellation)
+            drop_shadow_tables(cursor)
+
+    rows = sum(counts["created"] + counts["updated"] + counts["unchanged"] for counts in provider_counts.values())
+    stats = build_load_stats(rows, provider_counts, counter.count, started)
+    stats["mode"] = "shadow"
+    stats["build_seconds"] = round(build_seconds, 3)
+    stats["swap_seconds"] = round(swap_seconds, 3)
+    return stats
@@ -19,25 +19,23 @@ by systematically handling data inconsistencies that previously caused lookup mi
 
 import re
 import logging
-import json
-from products.utils.file_utils import get_config_path
+import numpy as np
+import pandas as pd
+from products.services.config_service import load_config
 from .etl_exceptions import TransformationError
 
 logger = logging.getLogger(__name__)
 
-def load_config():
-    """
-    Loads and returns the provider configuration from the JSON file.
-    """
-    try:
-        config_path = get_config_path()
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_providers = json.load(f)
-            logger.info(f"Configuración recargada: {config_providers}")
-        return config_providers
-    except json.JSONDecodeError as e:
-        logger.error(f"Error al decodificar el JSON de configuración: {str(e)}")
-        return {}
+# Leading characters that are not letters (codes, symbols, stray numbering) are stripped from names
+LEADING_JUNK_PATTERN = r'^[^a-zA-ZáéíóúÁÉÍÓÚñÑ]+'
+
+# Thousands/decimal separators per price format, selectable per provider with
+# transform_config["price_format"]
+PRICE_FORMATS = {
+    "en_US": {"thousands": ",", "decimal": "."},   # 1,234.56
+    "es_AR": {"thousands": ".", "decimal": ","},   # 1.234,56
+}
+DEFAULT_PRICE_FORMAT = "en_US"
 
 def clean_product_name(product_name):
     """
@@ -51,7 +49,60 @@ def clean_product_name(product_name):
     """
     if not isinstance(product_name, str):
         product_name = str(product_name)
-    return re.sub(r'^[^a-zA-ZáéíóúÁÉÍÓÚñÑ]+', '', product_name).strip()
+    return re.sub(LEADING_JUNK_PATTERN, '', product_name).strip()
+
+
+def clean_product_names(names):
+    """
+    Vectorized clean_product_name over a whole column (pandas string methods, no Python loop).
+    """
+    return names.astype(str).str.replace(LEADING_JUNK_PATTERN, '', regex=True).str.strip()
+
+
+def parse_prices(prices, price_format=DEFAULT_PRICE_FORMAT):
+    """
+    Vectorized, locale-aware price parser.
+
+    - Numeric cells are kept as they are (Excel already stores them as numbers)
+    - Text cells lose the currency symbol and the thousands separator, and the
+      decimal separator is normalized: "$ 1.234,56" (es_AR) -> 1234.56
+    - Clean columns take a single astype(float); other symbols or words are
+      stripped only when that fails
+    - Anything that still is not a number becomes NaN so the caller can flag it,
+      including non-finite values ("inf", "nan", "1e999"), which astype(float) accepts
+    """
+    parsed = parse_price_values(prices, PRICE_FORMATS[price_format])
+    return parsed.where(np.isfinite(parsed))
+
+
+def parse_price_values(prices, separators):
+    """Float column of parse_prices, before non-finite values are discarded"""
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.astype(float)
+
+    # Columns without any text cell (e.g. ints mixed with floats) need no text handling
+    if pd.api.types.infer_dtype(prices, skipna=True) not in ("string", "mixed", "mixed-integer"):
+        return pd.to_numeric(prices, errors="coerce").astype(float)
+
+    # .str yields NaN for non-text cells, which tells text and numeric cells apart
+    text = prices.str.strip()
+    is_text = text.notna()
+
+    numeric = pd.to_numeric(prices.where(~is_text), errors="coerce")
+    normalized = (
+        text[is_text]
+        .str.replace("$", "", regex=False)
+        .str.replace(separators["thousands"], "", regex=False)
+    )
+    if separators["decimal"] != ".":
+        normalized = normalized.str.replace(separators["decimal"], ".", regex=False)
+
+    try:
+        parsed = normalized.astype(float)
+    except (TypeError, ValueError):
+        # Slow path, only for columns with other symbols or text: keep digits, sign and decimal point
+        parsed = pd.to_numeric(normalized.str.replace(r"[^\d.\-]", "", regex=True), errors="coerce")
+    return numeric.astype(float).where(~is_text, parsed.reindex(prices.index))
 
 
 def transform_data(df, provider):
@@ -66,26 +117,45 @@ def transform_data(df, provider):
     TECHNICAL APPROACH:
     - JSON-driven column mapping eliminates hardcoded supplier logic
     - Required field validation prevents incomplete data processing
-    - Price normalization handles various currency formats
+    - Vectorized cleaning (pandas string methods) instead of per-row Python calls
+    - Price normalization handles currency symbols and en_US/es_AR number formats
+    - Unparseable prices are flagged and skipped without aborting the supplier
     - Graceful error handling with specific error messages for troubleshooting
     """
-    try:
-        config_providers = load_config()
-        if provider in config_providers:
-            config_data = config_providers[provider]
+    config_providers = load_config()
+    if provider in config_providers:
+        config_data = config_providers[provider]
+    else:
+        base_provider = provider.split("_")[0].lower()
+        if base_provider in config_providers:
+            config_data = config_providers[base_provider]
         else:
-            base_provider = provider.split("_")[0].lower()
-            if base_provider in config_providers:
-                config_data = config_providers[base_provider]
-            else:
-                logger.error(f"No se encontró configuración para el proveedor: {provider}")
-                return None
-
-        transform_config = config_data.get("transform_config", {})
-        if not transform_config:
-            logger.error(f"No se encontró mapeo de columnas para el proveedor: {provider}")
+            logger.error(f"No se encontró configuración para el proveedor: {provider}")
             return None
 
+    transform_config = config_data.get("transform_config", {})
+    if not transform_config:
+        logger.error(f"No se encontró mapeo de columnas para el proveedor: {provider}")
+        return None
+
+    return apply_transform_config(df, provider, transform_config)
+
+
+def check_price_format(provider, price_format):
+    """Raises TransformationError when `price_format` is not one of PRICE_FORMATS"""
+    if price_format not in PRICE_FORMATS:
+        raise TransformationError(
+            f"Para el proveedor {provider}, el formato de precio '{price_format}' no es válido. Valores permitidos: {', '.join(PRICE_FORMATS)}."
+        )
+
+
+def apply_transform_config(df, provider, transform_config):
+    """
+    Applies a provider's transform_config (column mappings, price format) to an extracted dataframe.
+    Used by transform_data with the saved configuration and by the extraction preview with a
+    candidate one. Returns None when the configuration has no column mappings.
+    """
+    try:
         column_mappings = transform_config.get("column_mappings", {})
         if not column_mappings:
             logger.error(f"No se encontró mapeo de columnas para el proveedor: {provider}")
@@ -113,20 +183,31 @@ def transform_data(df, provider):
             raise TransformationError(
                 f"Para el proveedor {provider}, las siguientes columnas no existen: {missing_str}. Por favor, revise la configuración del archivo."
             )
-        # Standardized product name cleaning for consistent matching
-        df["product_name"] = df["product_name"].astype(str).apply(clean_product_name)
-        df["proveedor"] = provider
+        price_format = transform_config.get("price_format", DEFAULT_PRICE_FORMAT)
+        check_price_format(provider, price_format)
 
         # Delete rows with null values ​​in key columns
         df = df.dropna(subset=required_columns)
 
-        # Price normalization - handles various currency formats from different suppliers
-        df.loc[:, "product_price"] = (
-            df["product_price"]
-            .replace({r"\$": "", ",": ""}, regex=True)
-            .astype(float)
+        # Vectorized cleaning: standardized names + price normalization for the supplier's number format
+        prices = parse_prices(df["product_price"], price_format)
+        df = df.assign(
+            product_name=clean_product_names(df["product_name"]),
+            product_price=prices,
+            proveedor=provider,
         )
 
+        # Rows whose price cannot be parsed are flagged and skipped instead of failing the whole file
+        invalid_prices = prices.isna()
+        invalid_count = int(invalid_prices.sum())
+        if invalid_count:
+            samples = df.loc[invalid_prices, "item"].astype(str).head(5).tolist()
+            logger.warning(
+                f"Proveedor {provider}: {invalid_count} filas con precio inválido fueron omitidas (ej. items {', '.join(samples)})."
+            )
+            df = df[~invalid_prices]
+        df.attrs["invalid_price_rows"] = invalid_count
+
         return df
 
     except KeyError as key:
@@ -134,4 +215,3 @@ def transform_data(df, provider):
         raise TransformationError(
             f"Para el proveedor {provider}, la columna '{missing_column}' no existe. Por favor, revise la configuración del archivo."
         ) from key
-    
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+CONCURRENCY BENCHMARK - Product API read latency while the ETL loads the catalog
+
+Generates synthetic supplier workbooks (products/benchmarks/workbooks.py) and
+loads them into a fresh SQLite database. Reader threads then request the
+product list API (random page, search, supplier and ordering, response cache
+disabled) twice: with the database idle, and while the whole catalog is loaded
+again with every price changed (upsert of every product plus price history).
+
+Reported per phase: requests, failed requests ("database is locked"), requests
+per second and p50/p95/p99/max latency. Compare the SQLite profile
+(products/utils/sqlite_profile.py) and bounded commits against the previous
+setup with --no-profile --commit-rows 0, and the shadow table load
+(products/etl/shadow_load.py) with --load-mode shadow.
+
+Usage:
+    python manage.py benchmark_concurrency --rows 100000 --readers 4
+    python manage.py benchmark_concurrency --rows 100000 --readers 4 --no-profile --commit-rows 0
+    python manage.py benchmark_concurrency --rows 100000 --readers 4 --load-mode shadow
+"""
+
+import os
+import json
+import math
+import time
+import random
+import shutil
+import tempfile
+import threading
+from functools import partial
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from products.benchmarks.workbooks import PRODUCT_WORDS, generate_dataset, provider_names
+from products.etl.extract import extract_data
+from products.etl.load import load_to_database
+from products.etl.shadow_load import LOAD_MODES, load_shadow
+from products.services.etl_service import transform_provider_data
+from products.services.metrics_service import rows_per_second
+
+READ_PATH = "/api/products/"
+ORDERINGS = ["", "product_price", "-product_price", "product_name"]
+MAX_PAGE = 50
+PRICE_CHANGE = 1.05
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(math.ceil(fraction * len(sorted_values)) - 1, 0))
+    return sorted_values[index]
+
+
+def latency_report(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    report = {
+        "requests": len(latencies) + len(errors),
+        "errors": len(errors),
+        "requests_per_second": rows_per_second(len(latencies), seconds),
+    }
+    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        value = percentile(latencies, fraction)
+        report[f"{name}_ms"] = round(value * 1000, 1) if value is not None else None
+    if errors:
+        report["first_error"] = errors[0]
+    return report
+
+
+def random_query(rng, providers):
+    """Query parameters of one product list request, as sent by the UI"""
+    params = {"page": rng.randint(1, MAX_PAGE)}
+    if rng.random() < 0.3:
+        params["search"] = rng.choice(PRODUCT_WORDS).lower()
+    if rng.random() < 0.3:
+        params["proveedor"] = rng.choice(providers)
+    ordering = rng.choice(ORDERINGS)
+    if ordering:
+        params["order_by"] = ordering
+    return params
+
+
+def read_product_list(index, providers, seed, stop, results):
+    """Reader thread: requests the product list until `stop` is set; stores (latencies, errors)"""
+    rng = random.Random(seed + index)
+    client = Client()
+    latencies = []
+    errors = []
+    try:
+        while not stop.is_set():
+            params = random_query(rng, providers)
+            started = time.perf_counter()
+            try:
+                response = client.get(READ_PATH, params)
+            except Exception as e:
+                # Lock timeouts surface as OperationalError("database is locked")
+                errors.append(f"{type(e).__name__}: {str(e)}")
+                continue
+            elapsed = time.perf_counter() - started
+            # Pages past the end of a filtered list answer 404; they are still a full read
+            if response.status_code in (200, 404):
+                latencies.append(elapsed)
+            else:
+                errors.append(f"HTTP {response.status_code}")
+    finally:
+        connection.close()
+        results[index] = (latencies, errors)
+
+
+def run_with_readers(readers, providers, seed, work):
+    """Runs `work()` in this thread while `readers` threads read the product list; returns (result, seconds, report)"""
+    stop = threading.Event()
+    results = {}
+    threads = [
+        threading.Thread(target=read_product_list, args=(index, providers, seed, stop, results), daemon=True)
+        for index in range(readers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        result = work()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    seconds = time.perf_counter() - started
+
+    latencies = [latency for thread_latencies, _ in results.values() for latency in thread_latencies]
+    errors = [error for _, thread_errors in results.values() for error in thread_errors]
+    return result, seconds, latency_report(latencies, errors, seconds)
+
+
+def changed_prices(transformed):
+    """Copy of the transformed dataframes with every price changed, so the reload rewrites every product"""
+    changed = []
+    for df, metadata in transformed:
+        df = df.copy()
+        df["product_price"] = (df["product_price"].astype(float) * PRICE_CHANGE).round(2)
+        changed.append((df, metadata))
+    return changed
+
+
+class Command(BaseCommand):
+    help = "Product API read latency (p50/p95/p99) while the ETL loads the whole catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000, help="Total rows of the synthetic catalog.")
+        parser.add_argument("--providers", type=int, default=3, help="Number of supplier files the rows are split into.")
+        parser.add_argument("--readers", type=int, default=4, help="Reader threads requesting the product list.")
+        parser.add_argument("--idle-seconds", type=float, default=3.0, help="Duration of the reads without a load.")
+        parser.add_argument("--commit-rows", type=int, help="Rows per committed load transaction (default settings.ETL_LOAD_COMMIT_ROWS, 0 = one transaction).")
+        parser.add_argument("--no-profile", action="store_true", help="Connections without the SQLite profile pragmas.")
+        parser.add_argument("--load-mode", choices=LOAD_MODES, default="incremental", help="Loader of the measured reload.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Path of the JSON report.")
+
+    def handle(self, *args, **options):
+        if options["readers"] < 1 or options["providers"] < 1 or options["rows"] < 1:
+            raise CommandError("--rows, --providers y --readers deben ser mayores que cero.")
+        if connection.vendor != "sqlite":
+            raise CommandError("El benchmark de concurrencia requiere SQLite.")
+
+        commit_rows = settings.ETL_LOAD_COMMIT_ROWS if options["commit_rows"] is None else options["commit_rows"]
+        workdir = tempfile.mkdtemp(prefix="concurrency-benchmark-")
+        try:
+            config = generate_dataset(os.path.join(workdir, "providers"), options["rows"], options["providers"], options["seed"])
+            os.makedirs(os.path.join(workdir, "config"))
+            with open(os.path.join(workdir, "config", "config_proveedores.json"), "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2)
+
+            # Reads must hit the database: the response cache would answer repeated pages from memory
+            with override_settings(
+                BASE_DIR=workdir, ETL_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"],
+                PRODUCT_RESPONSE_CACHE_SIZE=0, PRODUCT_RESPONSE_CACHE_SHARED=False,
+                SQLITE_PROFILE_ENABLED=not options["no_profile"],
+            ):
+                old_name = self.create_database(workdir)
+                try:
+                    report = self.run_phases(options, commit_rows)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Reporte guardado en {options['output']}")
+
+    def create_database(self, directory):
+        """Creates and migrates a fresh SQLite file database; returns the original database name"""
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(directory, "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        return old_name
+
+    def run_phases(self, options, commit_rows):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(
+            f"Perfil SQLite: {'desactivado' if options['no_profile'] else 'activado'} (journal {journal_mode}), "
+            f"carga {options['load_mode']}, filas por commit: {commit_rows or 'carga completa'}, lectores: {options['readers']}"
+        )
+
+        self.stdout.write(f"Cargando {options['rows']} filas iniciales...")
+        transformed = [(transform_provider_data(df, metadata), metadata) for df, metadata in extract_data()]
+        load_to_database(transformed, commit_rows=commit_rows)
+        providers = provider_names(options["providers"])
+
+        _, _, idle = run_with_readers(
+            options["readers"], providers, options["seed"], lambda: time.sleep(options["idle_seconds"]),
+        )
+        self.print_phase("sin carga", idle)
+
+        changed = changed_prices(transformed)
+        if options["load_mode"] == "shadow":
+            reload = partial(load_shadow, changed)
+        else:
+            reload = partial(load_to_database, changed, commit_rows=commit_rows)
+        load_stats, _, during_load = run_with_readers(options["readers"], providers, options["seed"], reload)
+        self.print_phase("durante la carga", during_load)
+        self.stdout.write(
+            f"Carga: {load_stats['updated']} productos actualizados, {load_stats['price_changes']} cambios de precio "
+            f"en {load_stats['seconds']}s ({load_stats['rows_per_second']} filas/s)"
+        )
+
+        return {
+            "rows": options["rows"],
+            "readers": options["readers"],
+            "sqlite_profile": not options["no_profile"],
+            "journal_mode": journal_mode,
+            "commit_rows": commit_rows,
+            "load_mode": options["load_mode"],
+            "idle": idle,
+            "during_load": during_load,
+            "load": {key: load_stats[key] for key in ("rows", "updated", "price_changes", "queries", "seconds", "rows_per_second")},
+        }
+
+    def print_phase(self, name, report):
+        self.stdout.write(
+            f"Lecturas {name:>16}: {report['requests']:>6} solicitudes, {report['errors']} errores, "
+            f"{report['requests_per_second'] or 0:>7.1f}/s  p50 {report['p50_ms']} ms  p95 {report['p95_ms']} ms  "
+            f"p99 {report['p99_ms']} ms  máx {report['max_ms']} ms"
+        )
+        if report["errors"]:
+            self.stdout.write(f"{'':>26}Primer error: {report['first_error']}")
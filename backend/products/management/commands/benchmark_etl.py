@@ -0,0 +1,197 @@
+"""
+ETL BENCHMARK - Extract, transform and load timings on synthetic supplier files
+
+Generates synthetic supplier workbooks (products/benchmarks/workbooks.py) for
+each requested size, then times extract_data, transform and load_to_database
+separately against a fresh SQLite database created in the working directory
+(the configured database is never touched). A second load of the same data
+measures the "nothing changed" path.
+
+BASELINE: none is shipped with the repository, since timings depend on the
+hardware. Each machine supplies its own through --baseline: a report it saved
+earlier with --output, using the same --rows, --providers and --seed.
+
+Usage:
+    python manage.py benchmark_etl --rows 15000 100000 --providers 3 --output baseline.json
+    python manage.py benchmark_etl --rows 15000 100000 --providers 3 --baseline baseline.json --tolerance 0.2
+"""
+
+import os
+import json
+import time
+import shutil
+import platform
+import tempfile
+import django
+import pandas as pd
+import openpyxl
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from products.benchmarks.workbooks import generate_dataset
+from products.etl.extract import extract_data
+from products.etl.load import load_to_database
+from products.services.etl_service import transform_provider_data
+from products.services.metrics_service import peak_rss_kb, rows_per_second
+
+STAGES = ["extract", "transform", "load", "load_unchanged"]
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def stage_report(seconds, rows, **extra):
+    return {"seconds": round(seconds, 3), "rows_per_second": rows_per_second(rows, seconds), **extra}
+
+
+def environment_report():
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark of the ETL stages (extract, transform, load) on synthetic supplier workbooks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[15_000], help="Total rows per dataset (e.g. 15000 100000 1000000).")
+        parser.add_argument("--providers", type=int, default=3, help="Number of supplier files the rows are split into.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--workdir", help="Directory for the generated files and database (temporary by default).")
+        parser.add_argument("--output", help="Path of the JSON report.")
+        parser.add_argument("--baseline", help="JSON report of a previous run on this machine (--output) to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs. the baseline (0.2 = 20%%).")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["providers"] < 1:
+            raise CommandError("--providers debe ser mayor que cero.")
+        if connection.vendor != "sqlite":
+            raise CommandError("El benchmark del ETL requiere SQLite.")
+
+        workdir = options["workdir"] or tempfile.mkdtemp(prefix="etl-benchmark-")
+        results = []
+        try:
+            for rows in options["rows"]:
+                results.append(self.run_dataset(os.path.join(workdir, f"rows-{rows}"), rows, options))
+        finally:
+            if not options["workdir"]:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "environment": environment_report(),
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Reporte guardado en {options['output']}")
+
+        self.print_results(results)
+        if options["baseline"]:
+            regressions = self.compare_baseline(results, options["baseline"], options["tolerance"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} etapas más lentas que la línea base.")
+
+    def run_dataset(self, directory, rows, options):
+        """Generates one dataset and times every stage against a fresh database"""
+        providers_dir = os.path.join(directory, "providers")
+        config_dir = os.path.join(directory, "config")
+        os.makedirs(config_dir, exist_ok=True)
+
+        self.stdout.write(f"Generando {rows} filas en {options['providers']} archivos de proveedores...")
+        config, generate_seconds = timed(generate_dataset, providers_dir, rows, options["providers"], options["seed"])
+        with open(os.path.join(config_dir, "config_proveedores.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+
+        # BASE_DIR drives the providers/config paths; the extract cache would hide the parsing cost
+        with override_settings(BASE_DIR=directory, ETL_CACHE_ENABLED=False):
+            old_name = self.use_database(os.path.join(directory, "benchmark.sqlite3"))
+            try:
+                call_command("migrate", verbosity=0, interactive=False)
+                return self.time_stages(rows, options["providers"], generate_seconds)
+            finally:
+                self.use_database(old_name)
+
+    def use_database(self, name):
+        """Points the default connection at another SQLite file; returns the previous name"""
+        connection.close()
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict["NAME"] = name
+        return old_name
+
+    def time_stages(self, rows, providers, generate_seconds):
+        self.stdout.write(f"Midiendo etapas para {rows} filas...")
+        extracted, extract_seconds = timed(extract_data)
+        rows_read = sum(len(df) for df, _ in extracted)
+
+        def transform_all():
+            return [(transform_provider_data(df, metadata), metadata) for df, metadata in extracted]
+
+        transformed, transform_seconds = timed(transform_all)
+        rows_kept = sum(len(df) for df, _ in transformed)
+
+        load_stats, load_seconds = timed(load_to_database, transformed)
+        unchanged_stats, unchanged_seconds = timed(load_to_database, transformed)
+
+        return {
+            "rows": rows,
+            "providers": providers,
+            "rows_read": rows_read,
+            "rows_kept": rows_kept,
+            "generate_seconds": round(generate_seconds, 3),
+            "stages": {
+                "extract": stage_report(extract_seconds, rows_read),
+                "transform": stage_report(transform_seconds, rows_read, rows_dropped=rows_read - rows_kept),
+                "load": stage_report(load_seconds, rows_kept, queries=load_stats["queries"], created=load_stats["created"]),
+                "load_unchanged": stage_report(unchanged_seconds, rows_kept, queries=unchanged_stats["queries"], unchanged=unchanged_stats["unchanged"]),
+            },
+            "peak_rss_kb": peak_rss_kb(),
+        }
+
+    def print_results(self, results):
+        self.stdout.write(f"{'filas':>10} {'prov.':>6} " + " ".join(f"{stage + ' (s)':>20}" for stage in STAGES))
+        for result in results:
+            timings = " ".join(f"{result['stages'][stage]['seconds']:>20.3f}" for stage in STAGES)
+            self.stdout.write(f"{result['rows']:>10} {result['providers']:>6} {timings}")
+
+    def compare_baseline(self, results, baseline_path, tolerance):
+        """Prints the ratio of every stage against the baseline; returns the regressions"""
+        try:
+            with open(baseline_path, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer la línea base {baseline_path}: {str(e)}")
+
+        baseline_results = {(result["rows"], result["providers"]): result for result in baseline.get("results", [])}
+        regressions = []
+        for result in results:
+            previous = baseline_results.get((result["rows"], result["providers"]))
+            if previous is None:
+                self.stdout.write(f"Sin línea base para {result['rows']} filas / {result['providers']} proveedores.")
+                continue
+            for stage in STAGES:
+                before = previous["stages"].get(stage, {}).get("seconds")
+                after = result["stages"][stage]["seconds"]
+                if not before:
+                    continue
+                ratio = after / before
+                # Differences below MIN_REGRESSION_SECONDS are timer noise on small datasets
+                regression = ratio > 1 + tolerance and after - before > MIN_REGRESSION_SECONDS
+                if regression:
+                    regressions.append((result["rows"], stage, ratio))
+                marker = "REGRESIÓN" if regression else "ok"
+                self.stdout.write(f"{result['rows']:>10} {stage:>15} {before:>9.3f}s -> {after:>9.3f}s ({ratio:.2f}x) {marker}")
+        return regressions
@@ -0,0 +1,96 @@
+"""
+READER BENCHMARK - Throughput of each reader engine on the same data
+
+Writes one synthetic supplier price list (products/benchmarks/workbooks.py) as
+.xlsx and as CSV, then reads every file with each installed engine of its
+format (products/etl/readers.py). Supplier files can be added with --file; they
+are read with the extract_config of their provider.
+
+Frames read by the engines of the same file are compared with the first one;
+results are reported in seconds, rows per second and MB per second.
+
+Usage:
+    python manage.py benchmark_readers --rows 100000 --repeat 3
+    python manage.py benchmark_readers --rows 0 --file providers/mas&mas_septiembre.XLS
+"""
+
+import os
+import time
+import shutil
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from products.benchmarks.workbooks import PROVIDER_SHAPES, write_workbook, write_csv, provider_config
+from products.etl.extract import determine_provider
+from products.etl.readers import ENGINES, available_engines, detect_format, read_table
+from products.services.config_service import load_config
+from products.services.metrics_service import rows_per_second
+
+
+def best_of(repeat, func):
+    """(result, fastest of `repeat` runs in seconds)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+
+class Command(BaseCommand):
+    help = "Benchmark of the reader engines (calamine, openpyxl, xlrd, pyarrow, pandas) on the same supplier data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Rows of the synthetic price list (0 = only --file).")
+        parser.add_argument("--file", action="append", default=[], help="Supplier file to benchmark as well (repeatable).")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the fastest one is reported.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat debe ser mayor que cero.")
+
+        workdir = tempfile.mkdtemp(prefix="readers-benchmark-")
+        try:
+            targets = []
+            if options["rows"] > 0:
+                shape = PROVIDER_SHAPES[0]
+                extract_config = provider_config(shape)["extract_config"]
+                for write, extension in ((write_workbook, "xlsx"), (write_csv, "csv")):
+                    path = os.path.join(workdir, f"{shape['name']}_lista.{extension}")
+                    write(path, options["rows"], shape, options["seed"])
+                    targets.append((path, extract_config))
+
+            config_providers = load_config()
+            for path in options["file"]:
+                if not os.path.isfile(path):
+                    raise CommandError(f"Archivo no encontrado: {path}")
+                provider = determine_provider(os.path.basename(path))
+                targets.append((path, config_providers.get(provider, {}).get("extract_config")))
+
+            if not targets:
+                raise CommandError("No hay archivos para medir: use --rows mayor que cero o --file.")
+
+            for path, extract_config in targets:
+                self.benchmark_file(path, extract_config, options["repeat"])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def benchmark_file(self, path, extract_config, repeat):
+        file_format = detect_format(path)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        self.stdout.write(f"\n{os.path.basename(path)} ({file_format}, {size_mb:.1f} MB)")
+
+        missing = [name for name, engine in ENGINES.items() if file_format in engine["formats"] and not engine["available"]]
+        reference = None
+        for name in available_engines(file_format):
+            df, seconds = best_of(repeat, lambda: read_table(path, extract_config, engine=name))
+            if reference is None:
+                reference, match = df, "referencia"
+            else:
+                match = "idéntico" if df.equals(reference) else f"DIFIERE ({df.shape} vs {reference.shape})"
+            self.stdout.write(
+                f"{name:>10}: {seconds:>8.3f} s  {rows_per_second(len(df), seconds) or 0:>12,.0f} filas/s"
+                f"  {size_mb / seconds:>7.1f} MB/s  {len(df)} filas  {match}"
+            )
+        if missing:
+            self.stdout.write(f"{'':>10}  No instalados: {', '.join(missing)}")
@@ -0,0 +1,78 @@
+"""
+SERIALIZATION BENCHMARK - Product list serialization, legacy vs. fast path
+
+Times the two ways of turning catalog rows into the JSON body of the product
+list on the products of the configured database:
+- legacy: model instances + ProductSerializer(many=True) + DRF JSONRenderer
+- fast: values_list tuples + serialize_product_rows + FastJSONRenderer
+
+Both bodies are compared byte for byte before timing; results are reported in
+milliseconds per 1,000 rows.
+
+Usage:
+    python manage.py benchmark_serialization --rows 1000 --repeat 10
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from products.api.renderers import FastJSONRenderer, orjson
+from products.models import Product
+from products.serializers import ProductSerializer, PRODUCT_ROW_FIELDS, serialize_product_rows
+
+
+def best_of(repeat, func):
+    """Fastest of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def per_thousand(seconds, rows):
+    return round(seconds / rows * 1000 * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = "Benchmark of the product list serialization (legacy serializer vs. fast path), in ms per 1,000 rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Products serialized per run.")
+        parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement; the fastest one is reported.")
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.select_related("proveedor").order_by("product_name", "id")[:options["rows"]]
+        rows = queryset.count()
+        if not rows:
+            raise CommandError("No hay productos en la base de datos. Ejecute el ETL antes del benchmark.")
+
+        legacy_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        def legacy_serialize():
+            return ProductSerializer(list(queryset), many=True).data
+
+        def fast_serialize():
+            return serialize_product_rows(queryset.values_list(*PRODUCT_ROW_FIELDS))
+
+        legacy_data, fast_data = legacy_serialize(), fast_serialize()
+        if legacy_renderer.render(legacy_data) != fast_renderer.render(fast_data):
+            raise CommandError("La salida del camino rápido difiere de ProductSerializer.")
+
+        timings = {
+            "legacy_serialize": best_of(options["repeat"], legacy_serialize),
+            "legacy_render": best_of(options["repeat"], lambda: legacy_renderer.render(legacy_data)),
+            "fast_serialize": best_of(options["repeat"], fast_serialize),
+            "fast_render": best_of(options["repeat"], lambda: fast_renderer.render(fast_data)),
+        }
+        legacy = timings["legacy_serialize"] + timings["legacy_render"]
+        fast = timings["fast_serialize"] + timings["fast_render"]
+
+        self.stdout.write(f"{rows} productos, mejor de {options['repeat']} ejecuciones (orjson: {'sí' if orjson else 'no'})")
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>18}: {per_thousand(seconds, rows):>9.3f} ms / 1000 filas")
+        self.stdout.write(
+            f"{'total legacy':>18}: {per_thousand(legacy, rows):>9.3f} ms / 1000 filas\n"
+            f"{'total rápido':>18}: {per_thousand(fast, rows):>9.3f} ms / 1000 filas ({legacy / fast:.1f}x)"
+        )
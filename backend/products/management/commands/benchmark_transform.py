@@ -0,0 +1,66 @@
+"""
+TRANSFORM MICRO-BENCHMARK - Vectorized vs. per-row cleaning
+
+Compares the vectorized name cleaning + price parsing of the transform stage
+with the previous implementation (Series.apply(clean_product_name) plus a
+regex replace and astype(float)) on synthetic supplier columns.
+
+Usage: python manage.py benchmark_transform --rows 15000 1000000 --repeat 3
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from products.etl.transform import clean_product_name, clean_product_names, parse_prices
+
+
+def build_sample(rows, seed=0):
+    """Junk-prefixed names and en_US currency-formatted prices, like real supplier files"""
+    rng = np.random.default_rng(seed)
+    numbers = rng.integers(1, 10_000, size=rows)
+    prices = rng.uniform(10, 250_000, size=rows).round(2)
+    names = pd.Series([f"##{n} TORNILLO M{n % 12} X {n % 90}MM" for n in numbers], dtype=object)
+    price_text = pd.Series([f"${p:,.2f}" for p in prices], dtype=object)
+    return names, price_text
+
+
+def legacy_transform(names, prices):
+    cleaned = names.astype(str).apply(clean_product_name)
+    parsed = prices.replace({r"\$": "", ",": ""}, regex=True).astype(float)
+    return cleaned, parsed
+
+
+def vectorized_transform(names, prices):
+    return clean_product_names(names), parse_prices(prices, "en_US")
+
+
+def best_time(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark of the transform stage: per-row (legacy) vs. vectorized cleaning."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[15_000, 1_000_000])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'filas':>10} {'legacy (s)':>12} {'vectorizado (s)':>16} {'mejora':>8}")
+        for rows in options["rows"]:
+            names, prices = build_sample(rows)
+
+            legacy_names, legacy_prices = legacy_transform(names, prices)
+            new_names, new_prices = vectorized_transform(names, prices)
+            if not (legacy_names.equals(new_names) and np.allclose(legacy_prices, new_prices)):
+                self.stderr.write(f"Los resultados difieren para {rows} filas.")
+
+            legacy = best_time(legacy_transform, options["repeat"], names, prices)
+            vectorized = best_time(vectorized_transform, options["repeat"], names, prices)
+            self.stdout.write(f"{rows:>10} {legacy:>12.3f} {vectorized:>16.3f} {legacy / vectorized:>7.1f}x")
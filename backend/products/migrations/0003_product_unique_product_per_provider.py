@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_products(apps, schema_editor):
+    """Keeps the most recent row of every (proveedor, item) pair before adding the constraint"""
+    Product = apps.get_model("products", "Product")
+    duplicates = (
+        Product.objects.values("proveedor", "item")
+        .annotate(last_id=Max("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for group in duplicates:
+        Product.objects.filter(proveedor=group["proveedor"], item=group["item"]).exclude(id=group["last_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_etlstatus'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_products, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('proveedor', 'item'), name='unique_product_per_provider'),
+        ),
+    ]
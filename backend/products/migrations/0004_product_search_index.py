@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# External-content FTS5 index: the text lives only in products_product, the index stores tokens.
+# remove_diacritics 2 folds accents (á -> a, ñ -> n) and unicode61 folds case.
+CREATE_INDEX_SQL = [
+    """
+    CREATE VIRTUAL TABLE products_product_fts USING fts5(
+        item, product_name, proveedor,
+        content='products_product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER products_product_fts_ai AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, new.proveedor);
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_fts_ad AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, old.proveedor);
+    END
+    """,
+    # Price-only upserts (the common ETL case) do not touch the index
+    """
+    CREATE TRIGGER products_product_fts_au AFTER UPDATE OF item, product_name, proveedor ON products_product
+    WHEN old.item IS NOT new.item OR old.product_name IS NOT new.product_name OR old.proveedor IS NOT new.proveedor
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, old.proveedor);
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, new.proveedor);
+    END
+    """,
+    "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+    # Matches on item weigh more than on the name, and both more than on the supplier
+    "INSERT INTO products_product_fts(products_product_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+]
+
+DROP_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS products_product_fts_ai",
+    "DROP TRIGGER IF EXISTS products_product_fts_ad",
+    "DROP TRIGGER IF EXISTS products_product_fts_au",
+    "DROP TABLE IF EXISTS products_product_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_unique_product_per_provider'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
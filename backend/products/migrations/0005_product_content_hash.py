@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:06
+
+from django.db import migrations, models
+
+# SQLite rebuilds products_product to add a NOT NULL column, and dropping the old table
+# drops the FTS5 triggers of migration 0004 with it; they are reinstalled afterwards
+DROP_SEARCH_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS products_product_fts_ai",
+    "DROP TRIGGER IF EXISTS products_product_fts_ad",
+    "DROP TRIGGER IF EXISTS products_product_fts_au",
+]
+
+CREATE_SEARCH_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ai AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, new.proveedor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ad AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, old.proveedor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_au AFTER UPDATE OF item, product_name, proveedor ON products_product
+    WHEN old.item IS NOT new.item OR old.product_name IS NOT new.product_name OR old.proveedor IS NOT new.proveedor
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, old.proveedor);
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, new.proveedor);
+    END
+    """,
+    "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+]
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SEARCH_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SEARCH_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, create_search_triggers),
+        migrations.AddField(
+            model_name='product',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
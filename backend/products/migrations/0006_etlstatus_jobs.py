@@ -0,0 +1,57 @@
+import uuid
+from django.db import migrations, models
+
+
+def populate_jobs(apps, schema_editor):
+    """Past runs get their own job id and a final state derived from the status text"""
+    ETLStatus = apps.get_model("products", "ETLStatus")
+    for etl_status in ETLStatus.objects.all():
+        etl_status.job_id = uuid.uuid4()
+        etl_status.state = "finished" if etl_status.status == "Finalizado" else "failed"
+        etl_status.save(update_fields=["job_id", "state"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='etlstatus',
+            name='job_id',
+            field=models.UUIDField(null=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='etlstatus',
+            name='state',
+            field=models.CharField(choices=[('pending', 'En cola'), ('running', 'Ejecutando'), ('finished', 'Finalizado'), ('failed', 'Error'), ('cancelled', 'Cancelado')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='etlstatus',
+            name='cancel_requested',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='etlstatus',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='etlstatus',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='etlstatus',
+            name='result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_jobs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='etlstatus',
+            name='job_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_etlstatus_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='etlstatus',
+            name='create_ad',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
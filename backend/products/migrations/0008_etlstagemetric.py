@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_etlstatus_create_ad_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ETLStageMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('extract', 'Extracción'), ('transform', 'Transformación'), ('load', 'Carga'), ('total', 'Total')], max_length=20)),
+                ('provider', models.CharField(blank=True, default='', max_length=200)),
+                ('file', models.CharField(blank=True, default='', max_length=255)),
+                ('wall_seconds', models.FloatField(default=0)),
+                ('rows_read', models.IntegerField(default=0)),
+                ('rows_kept', models.IntegerField(default=0)),
+                ('rows_dropped', models.IntegerField(default=0)),
+                ('rows_per_second', models.FloatField(blank=True, null=True)),
+                ('query_count', models.IntegerField(default=0)),
+                ('peak_rss_kb', models.IntegerField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='products.etlstatus')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['stage', 'provider'], name='etlmetric_stage_provider_idx')],
+            },
+        ),
+    ]
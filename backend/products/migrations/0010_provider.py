@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:29
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def populate_providers(apps, schema_editor):
+    """Builds the materialized provider list from the existing products"""
+    Product = apps.get_model("products", "Product")
+    Provider = apps.get_model("products", "Provider")
+    stats = (
+        Product.objects.values("proveedor")
+        .annotate(product_count=Count("id"), last_update=Max("fecha_actualizacion"))
+    )
+    Provider.objects.bulk_create([
+        Provider(name=row["proveedor"], product_count=row["product_count"], last_update=row["last_update"])
+        for row in stats
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Provider',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('product_count', models.IntegerField(default=0)),
+                ('last_update', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_providers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,167 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+# FTS5 objects of migration 0004; they reference the proveedor text column removed here
+DROP_OLD_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS products_product_fts_ai",
+    "DROP TRIGGER IF EXISTS products_product_fts_ad",
+    "DROP TRIGGER IF EXISTS products_product_fts_au",
+    "DROP TABLE IF EXISTS products_product_fts",
+]
+
+DROP_SEARCH_INDEX_SQL = DROP_OLD_SEARCH_INDEX_SQL + [
+    "DROP TRIGGER IF EXISTS products_provider_fts_au",
+    "DROP VIEW IF EXISTS products_product_search",
+]
+
+# External content read through a view, so the index follows supplier renames;
+# remove_diacritics 2 folds accents (á -> a, ñ -> n) and unicode61 folds case
+CREATE_SEARCH_INDEX_SQL = [
+    """
+    CREATE VIEW IF NOT EXISTS products_product_search AS
+    SELECT p.id AS id, p.item AS item, p.product_name AS product_name, v.name AS proveedor
+    FROM products_product p JOIN products_provider v ON v.id = p.proveedor_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts USING fts5(
+        item, product_name, proveedor,
+        content='products_product_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ai AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ad AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_au AFTER UPDATE OF item, product_name, proveedor_id ON products_product
+    WHEN old.item IS NOT new.item OR old.product_name IS NOT new.product_name OR old.proveedor_id IS NOT new.proveedor_id
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_provider_fts_au AFTER UPDATE OF name ON products_provider
+    WHEN old.name IS NOT new.name
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        SELECT 'delete', id, item, product_name, old.name FROM products_product WHERE proveedor_id = new.id;
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        SELECT id, item, product_name, new.name FROM products_product WHERE proveedor_id = new.id;
+    END
+    """,
+    "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+    "INSERT INTO products_product_fts(products_product_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+]
+
+
+def drop_old_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_OLD_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def link_products_to_providers(apps, schema_editor):
+    """Creates a Provider for every supplier name and points its products to it (one UPDATE per supplier)"""
+    Product = apps.get_model("products", "Product")
+    Provider = apps.get_model("products", "Provider")
+    stats = (
+        Product.objects.values("proveedor")
+        .annotate(product_count=Count("id"), last_update=Max("fecha_actualizacion"))
+    )
+    for row in stats:
+        provider, _ = Provider.objects.update_or_create(
+            name=row["proveedor"],
+            defaults={"product_count": row["product_count"], "last_update": row["last_update"]},
+        )
+        Product.objects.filter(proveedor=row["proveedor"]).update(provider=provider)
+
+
+def unlink_products_from_providers(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Provider = apps.get_model("products", "Provider")
+    for provider in Provider.objects.all():
+        Product.objects.filter(provider=provider).update(proveedor=provider.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_provider'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='provider',
+            name='source_file',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='source_modified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='last_extracted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(drop_old_search_index, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='product',
+            name='provider',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.provider'),
+        ),
+        migrations.RunPython(link_products_to_providers, unlink_products_from_providers),
+        migrations.RemoveConstraint(
+            model_name='product',
+            name='unique_product_per_provider',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='proveedor',
+        ),
+        migrations.RenameField(
+            model_name='product',
+            old_name='provider',
+            new_name='proveedor',
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='proveedor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='products', to='products.provider'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('proveedor', 'item'), name='unique_product_per_provider'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+def create_catalog_state(apps, schema_editor):
+    CatalogState = apps.get_model("products", "CatalogState")
+    CatalogState.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_provider_fk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_catalog_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_catalogstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('changed_at', models.DateTimeField()),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='products.product')),
+                ('proveedor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_changes', to='products.provider')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='price_changes', to='products.etlstatus')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'changed_at'], name='pricehistory_product_date_idx'), models.Index(fields=['proveedor', 'changed_at'], name='pricehistory_provider_date_idx')],
+            },
+        ),
+    ]
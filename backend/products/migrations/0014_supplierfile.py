@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_productpricehistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('modified_ns', models.BigIntegerField()),
+                ('uploaded_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
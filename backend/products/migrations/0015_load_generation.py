@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:21
+
+from django.db import migrations, models
+
+# SQLite rebuilds products_product to add a NOT NULL column, and the rename at the end of
+# the rebuild fails while the search view and triggers reference the table
+DROP_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS products_product_fts_ai",
+    "DROP TRIGGER IF EXISTS products_product_fts_ad",
+    "DROP TRIGGER IF EXISTS products_product_fts_au",
+    "DROP TRIGGER IF EXISTS products_provider_fts_au",
+    "DROP VIEW IF EXISTS products_product_search",
+]
+
+# Search view and triggers as left by migration 0011; the FTS5 table survives the rebuild
+# and the rebuild re-reads every row through the new view
+CREATE_SEARCH_INDEX_SQL = [
+    """
+    CREATE VIEW IF NOT EXISTS products_product_search AS
+    SELECT p.id AS id, p.item AS item, p.product_name AS product_name, v.name AS proveedor
+    FROM products_product p JOIN products_provider v ON v.id = p.proveedor_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts USING fts5(
+        item, product_name, proveedor,
+        content='products_product_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ai AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ad AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_au AFTER UPDATE OF item, product_name, proveedor_id ON products_product
+    WHEN old.item IS NOT new.item OR old.product_name IS NOT new.product_name OR old.proveedor_id IS NOT new.proveedor_id
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_provider_fts_au AFTER UPDATE OF name ON products_provider
+    WHEN old.name IS NOT new.name
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        SELECT 'delete', id, item, product_name, old.name FROM products_product WHERE proveedor_id = new.id;
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        SELECT id, item, product_name, new.name FROM products_product WHERE proveedor_id = new.id;
+    END
+    """,
+    "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+    "INSERT INTO products_product_fts(products_product_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+]
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SEARCH_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_supplierfile'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_index, create_search_index),
+        migrations.AddField(
+            model_name='catalogstate',
+            name='load_generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='load_generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:54
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_extra_active_jobs(apps, schema_editor):
+    """Keeps only the most recent pending/running job active, so the constraint can be created"""
+    ETLStatus = apps.get_model("products", "ETLStatus")
+    active = ETLStatus.objects.filter(state__in=["pending", "running"]).order_by("-create_ad", "-id")
+    extra = list(active.values_list("id", flat=True)[1:])
+    ETLStatus.objects.filter(id__in=extra).update(
+        state="failed", status="Error: el proceso del ETL se interrumpió.", finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_load_generation'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_extra_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='etlstatus',
+            constraint=models.UniqueConstraint(models.ExpressionWrapper(models.Q(('state__in', ['pending', 'running'])), output_field=models.BooleanField()), condition=models.Q(('state__in', ['pending', 'running'])), name='single_active_etl_job'),
+        ),
+    ]
@@ -12,18 +12,96 @@ DATABASE DESIGN DECISIONS:
 - Timestamp tracking for data freshness and audit requirements
 """
 
+import uuid
 from django.db import models
 
+class Provider(models.Model):
+    """
+    Supplier of the catalog - one row per supplier price list
+
+    BUSINESS LOGIC:
+    - name: Supplier key, the same key used in config_proveedores.json
+    - source_file: Supplier file the products were last loaded from
+    - source_modified_at: Date of that file, used as fecha_actualizacion of its products
+    - last_extracted_at: Last ETL run that loaded the supplier
+    - product_count / last_update: Materialized product count and most recent
+      fecha_actualizacion, shown in the supplier filter
+
+    PERFORMANCE CONSIDERATIONS:
+    - Products reference the supplier by integer FK: renaming a supplier is a
+      one-row update and filtering by supplier is an indexed integer comparison
+    - product_count/last_update replace a DISTINCT over the whole products table;
+      refreshed by the ETL load (products/services/provider_service.py)
+    """
+    name = models.CharField(max_length=200, unique=True)
+    source_file = models.CharField(max_length=255, blank=True, default='')
+    source_modified_at = models.DateTimeField(null=True, blank=True)
+    last_extracted_at = models.DateTimeField(null=True, blank=True)
+    product_count = models.IntegerField(default=0)
+    last_update = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+class CatalogState(models.Model):
+    """
+    Catalog generation counter - a single row (pk=1)
+
+    BUSINESS LOGIC:
+    - generation: Incremented by every change of the published catalog (ETL load
+      that writes products, supplier file deleted or renamed)
+    - load_generation: Incremented by every ETL load; stamped on the products the
+      load reads from the supplier files (Product.load_generation)
+
+    PERFORMANCE CONSIDERATIONS:
+    - Cached product list responses are keyed by the generation, so a single
+      increment invalidates all of them (products/services/cache_service.py)
+    """
+    generation = models.PositiveBigIntegerField(default=0)
+    load_generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Generación {self.generation}"
+
+class SupplierFile(models.Model):
+    """
+    Supplier workbook published in the providers directory by an upload
+
+    BUSINESS LOGIC:
+    - name: File name inside providers/
+    - sha256 / size: Content hash and size verified when the upload was finalized
+    - modified_ns: mtime of the published file; when it and the size still match the
+      file on disk, the recorded hash is still the file's hash
+    - uploaded_at: Time the file was published
+
+    PERFORMANCE CONSIDERATIONS:
+    - The ETL reuses the recorded hash as the extract cache key instead of reading
+      the whole workbook again, so unchanged files go straight to a cache hit
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    modified_ns = models.BigIntegerField()
+    uploaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
 class Product(models.Model):
     """
     Core product model for multi-supplier catalog consolidation
     
     BUSINESS LOGIC:
-    - item: Unique product identifier (may vary by supplier)
+    - item: Product identifier, unique per supplier (proveedor + item)
     - product_name: Standardized product description after ETL cleaning
     - product_price: Decimal precision for accurate financial calculations
-    - proveedor: Supplier attribution for audit and source tracking
+    - proveedor: Supplier attribution for audit and source tracking (FK to Provider)
     - fecha_actualizacion: Data freshness tracking for inventory management
+    - content_hash: Change detection, only modified rows are rewritten by the ETL
+    - load_generation: Last ETL load whose supplier file listed the product; rows of
+      a loaded supplier left with an older generation are swept by that load
     
     PERFORMANCE CONSIDERATIONS:
     - Designed for bulk operations (15,000+ products loaded in <2 minutes)
@@ -36,20 +114,44 @@ class Product(models.Model):
     item = models.CharField(max_length=50)
     product_name = models.CharField(max_length=200)
     product_price = models.DecimalField(max_digits=10, decimal_places=2)
-    proveedor = models.CharField(max_length=200)
+    # Indexed through unique_product_per_provider, whose leading column is proveedor
+    proveedor = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name='products', db_index=False)
     fecha_actualizacion = models.DateTimeField()
+    # Hash of the loaded fields; lets the ETL skip rows whose data did not change
+    content_hash = models.CharField(max_length=16, blank=True, default='')
+    # Not indexed: the sweep reads one supplier's rows through unique_product_per_provider,
+    # and an index would be rewritten for every product on every load
+    load_generation = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        # Natural key used by the ETL upsert; its index also serves per-supplier lookups
+        constraints = [
+            models.UniqueConstraint(fields=["proveedor", "item"], name="unique_product_per_provider"),
+        ]
+        # One index per list ordering, with id as tiebreaker, for keyset pagination
+        indexes = [
+            models.Index(fields=["product_name", "id"], name="product_name_id_idx"),
+            models.Index(fields=["product_price", "id"], name="product_price_id_idx"),
+            models.Index(fields=["fecha_actualizacion", "id"], name="product_fecha_id_idx"),
+        ]
 
     def __str__(self):
         return self.product_name
 
 class ETLStatus(models.Model):
     """
-    ETL process tracking model
+    ETL process tracking model - one row per ETL job
 
     BUSINESS LOGIC:
     - status: Current state of the ETL process (e.g., 'No iniciado', 'En progreso', 'Completado')
     - progress: Percentage completion of the ETL process
     - create_ad: Timestamp of when the ETL process was initiated
+    - job_id: Public identifier returned by the API when the job is queued
+    - state: Machine-readable lifecycle (pending, running, finished, failed, cancelled)
+    - cancel_requested: Set by the cancel endpoint, checked by the running job
+    - updated_at / finished_at: Heartbeat of the running job and completion time
+    - result: Run report (per-provider timings, load counts) once finished
+    - single_active_etl_job: the database refuses a second pending/running job
 
     PERFORMANCE CONSIDERATIONS:
     - Minimal fields to ensure quick updates and retrievals
@@ -57,6 +159,120 @@ class ETLStatus(models.Model):
     
     BUSINESS VALUE: Provides visibility into ETL process status for operational monitoring.
     """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATE_CHOICES = [
+        (PENDING, 'En cola'),
+        (RUNNING, 'Ejecutando'),
+        (FINISHED, 'Finalizado'),
+        (FAILED, 'Error'),
+        (CANCELLED, 'Cancelado'),
+    ]
+    ACTIVE_STATES = [PENDING, RUNNING]
+
     status = models.CharField(max_length=50, default='No iniciado')
     progress = models.IntegerField(default=0)
-    create_ad = models.DateTimeField(auto_now_add=True)
+    create_ad = models.DateTimeField(auto_now_add=True, db_index=True)
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=PENDING)
+    cancel_requested = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # At most one queued or running job, whatever the number of web processes:
+            # every active row indexes the same value
+            models.UniqueConstraint(
+                models.ExpressionWrapper(models.Q(state__in=['pending', 'running']), output_field=models.BooleanField()),
+                condition=models.Q(state__in=['pending', 'running']),
+                name='single_active_etl_job',
+            ),
+        ]
+
+class ETLStageMetric(models.Model):
+    """
+    Timing and throughput of one ETL stage, per run and per supplier file
+
+    BUSINESS LOGIC:
+    - run: ETL job the measurement belongs to
+    - stage: extract / transform (one row per supplier file), load and total (one row per run)
+    - provider / file: Supplier and source file, empty for run-wide stages
+    - rows_read / rows_kept / rows_dropped: Rows entering and leaving the stage
+    - query_count: Database queries issued by the stage
+    - peak_rss_kb: High-water mark of the resident memory while the stage ran (Linux); where
+      the peak cannot be reset it is the peak of the whole process that ran the stage
+
+    BUSINESS VALUE: Lets us compare runs over weeks and see which stage or
+    supplier file made an ETL run slower.
+    """
+    EXTRACT = 'extract'
+    TRANSFORM = 'transform'
+    LOAD = 'load'
+    TOTAL = 'total'
+    STAGE_CHOICES = [
+        (EXTRACT, 'Extracción'),
+        (TRANSFORM, 'Transformación'),
+        (LOAD, 'Carga'),
+        (TOTAL, 'Total'),
+    ]
+
+    run = models.ForeignKey(ETLStatus, on_delete=models.CASCADE, related_name='metrics')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES)
+    provider = models.CharField(max_length=200, blank=True, default='')
+    file = models.CharField(max_length=255, blank=True, default='')
+    wall_seconds = models.FloatField(default=0)
+    rows_read = models.IntegerField(default=0)
+    rows_kept = models.IntegerField(default=0)
+    rows_dropped = models.IntegerField(default=0)
+    rows_per_second = models.FloatField(null=True, blank=True)
+    query_count = models.IntegerField(default=0)
+    peak_rss_kb = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        # Trend queries filter by stage/provider over the most recent runs
+        indexes = [
+            models.Index(fields=["stage", "provider"], name="etlmetric_stage_provider_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.run_id} {self.stage} {self.provider}".strip()
+
+class ProductPriceHistory(models.Model):
+    """
+    Price change of a product - appended by the ETL load, never updated
+
+    BUSINESS LOGIC:
+    - One row per product whose price differs from the stored one during a load
+      (new products and name-only changes do not create rows)
+    - proveedor: Copied from the product so supplier reports do not join products
+    - run: ETL job that loaded the new price
+    - changed_at: Time of the load
+
+    PERFORMANCE CONSIDERATIONS:
+    - (proveedor, changed_at) finds "what did supplier X change since date/run"
+      with an index range scan; the rows in the range are then read for their prices
+    - (product, changed_at) serves the history of a single product
+
+    BUSINESS VALUE: Buyers can see which suppliers raised prices and by how much,
+    information that the in-place upsert of product_price used to discard.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_history', db_index=False)
+    proveedor = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name='price_changes', db_index=False)
+    run = models.ForeignKey(ETLStatus, on_delete=models.SET_NULL, null=True, blank=True, related_name='price_changes')
+    old_price = models.DecimalField(max_digits=10, decimal_places=2)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "changed_at"], name="pricehistory_product_date_idx"),
+            models.Index(fields=["proveedor", "changed_at"], name="pricehistory_provider_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.old_price} -> {self.new_price}"
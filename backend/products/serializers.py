@@ -1,11 +1,29 @@
+"""
+PRODUCT SERIALIZATION - API representation of the catalog
+
+ProductSerializer defines the representation. The product list uses the
+fast path below, which produces exactly the same values:
+- Rows read as values_list tuples: no model instances, no per-field DRF machinery
+- ARS prices formatted with the es_AR locale data resolved once, instead of
+  babel's format_currency resolving the locale for every row
+- Dates formatted once per distinct value (all products of a supplier file share it)
+"""
+
+import functools
+from decimal import Decimal
 from rest_framework import serializers
+from babel import Locale
 from babel.numbers import format_currency
 from .models import Product
 
+PRODUCT_ROW_FIELDS = ("id", "item", "product_name", "product_price", "proveedor__name", "fecha_actualizacion")
+
+
 class ProductSerializer(serializers.ModelSerializer):
     # Custom field methods for enhanced user experience
     fecha_actualizacion = serializers.SerializerMethodField()
     formatted_price = serializers.SerializerMethodField()
+    proveedor = serializers.CharField(source='proveedor.name', read_only=True)
 
     class Meta:
         model = Product
@@ -21,3 +39,80 @@ class ProductSerializer(serializers.ModelSerializer):
             return format_currency(obj.product_price, 'ARS', locale='es_AR')
         except Exception:
             return obj.product_price
+
+
+@functools.lru_cache(maxsize=1)
+def ars_formatter():
+    """
+    Returns a function formatting Decimals exactly like format_currency(value, 'ARS', locale='es_AR').
+
+    The locale pattern, symbol and separators are resolved once. Prices with at most two
+    decimals (every stored price) take a plain string-formatting path; anything else, or a
+    locale pattern this shortcut does not reproduce, goes through babel's compiled pattern.
+    """
+    locale = Locale.parse('es_AR')
+    pattern = locale.currency_formats['standard']
+    symbols = locale.number_symbols['latn']
+    separators = str.maketrans({",": symbols['group'], ".": symbols['decimal']})
+    symbol = locale.currency_symbols.get('ARS', 'ARS')
+
+    def babel_format(value):
+        return pattern.apply(value, locale, currency='ARS', currency_digits=True, decimal_quantization=True)
+
+    def fast_format(value):
+        if type(value) is not Decimal or not value.is_finite() or value.as_tuple().exponent < -2:
+            return babel_format(value)
+        sign = "-" if value.is_signed() else ""
+        return f"{sign}{symbol}{format(abs(value), ',.2f').translate(separators)}"
+
+    probes = [Decimal(value) for value in ("0.00", "7", "12523.20", "-5.5", "1234567.89", "-0.00")]
+    if all(fast_format(value) == format_currency(value, 'ARS', locale='es_AR') for value in probes):
+        return fast_format
+    return babel_format
+
+
+def format_price(value):
+    """formatted_price of the fast path; same fallback as ProductSerializer.get_formatted_price"""
+    try:
+        return ars_formatter()(value)
+    except Exception:
+        return value
+
+
+@functools.lru_cache(maxsize=1024)
+def format_date(value):
+    return value.strftime('%d-%m-%Y') if value else None
+
+
+@functools.lru_cache(maxsize=1)
+def price_field():
+    """ProductSerializer's product_price field, reused to render the raw price"""
+    return ProductSerializer().fields['product_price']
+
+
+def format_raw_price(value):
+    """product_price of the fast path: stored prices already have the field's two decimals"""
+    if value is None:
+        # DRF serializers skip the field for None values
+        return None
+    if type(value) is Decimal and value.as_tuple().exponent == -2:
+        return f"{value:f}"
+    return price_field().to_representation(value)
+
+
+def serialize_product_rows(rows):
+    """
+    Representation of values_list(*PRODUCT_ROW_FIELDS) rows, identical to ProductSerializer(many=True).data.
+    """
+    return [
+        {
+            "id": product_id,
+            "item": item,
+            "product_name": product_name,
+            "product_price": format_raw_price(price),
+            "formatted_price": format_price(price),
+            "proveedor": proveedor,
+            "fecha_actualizacion": format_date(fecha),
+        }
+        for product_id, item, product_name, price, proveedor, fecha in rows
+    ]
@@ -0,0 +1,157 @@
+"""
+PRODUCT LIST RESPONSE CACHE - Rendered pages keyed by catalog generation
+
+The catalog only changes when the ETL loads new prices or a supplier file is
+deleted or renamed, yet every product list request queried the database and
+serialized the page again. Rendered responses are now cached under the
+normalized query parameters plus the catalog generation, a counter bumped by
+every catalog change: entries are never invalidated one by one, a bump makes
+all of them unreachable.
+
+TECHNICAL SOLUTION:
+- Catalog generation: single-row CatalogState counter, bumped by every catalog
+  change (ETL load, supplier delete/rename) once its rows are written
+- Per-process LRU of rendered bodies (settings.PRODUCT_RESPONSE_CACHE_SIZE entries)
+- Optional shared cache (settings.PRODUCT_RESPONSE_CACHE_SHARED): the 'responses'
+  Django cache backend, so every worker on the host reuses a page rendered once
+- Strong ETag (hash of the body); If-None-Match answered with 304 Not Modified
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from products.models import CatalogState
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered output changes, so shared entries of the previous format are ignored
+RESPONSE_CACHE_VERSION = 1
+RESPONSE_CACHE_PREFIX = "products:list:"
+SHARED_CACHE_ALIAS = "responses"
+CACHED_PARAMS = ("search", "proveedor", "order_by", "page", "page_size", "pagination", "cursor")
+# Case-insensitive filters: "Tornillo " and "tornillo" share an entry
+CASEFOLD_PARAMS = ("search", "proveedor")
+NUMERIC_PARAMS = ("page", "page_size")
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def catalog_generation():
+    """Current catalog generation (0 until the first change)"""
+    return CatalogState.objects.filter(pk=1).values_list("generation", flat=True).first() or 0
+
+
+def bump_catalog_generation():
+    """
+    Invalidates every cached product list response.
+    Call it inside the transaction that changes the catalog or after it commits,
+    never before: a request could cache the old rows under the new generation.
+    """
+    updated = CatalogState.objects.filter(pk=1).update(generation=F("generation") + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogState.objects.create(pk=1, generation=1)
+    logger.info("Generación del catálogo incrementada; respuestas en caché invalidadas.")
+
+
+def normalize_params(query_params):
+    """
+    Canonical (name, value) pairs of the product list parameters.
+    Returns None when the request is not cacheable (unknown or repeated parameters,
+    non-numeric page numbers), so it is always answered by the database.
+    """
+    params = []
+    for name in query_params:
+        values = query_params.getlist(name)
+        if name not in CACHED_PARAMS or len(values) != 1:
+            return None
+        value = " ".join(values[0].split())
+        if name in CASEFOLD_PARAMS:
+            value = value.casefold()
+        if name in NUMERIC_PARAMS and value:
+            if not value.isdigit():
+                return None
+            value = str(int(value))
+        if value:
+            params.append((name, value))
+    return sorted(params)
+
+
+def response_cache_key(request):
+    """Cache key of a product list request, or None if the request is not cacheable"""
+    if request.method not in ("GET", "HEAD") or request.accepted_renderer.format != "json":
+        return None
+    params = normalize_params(request.query_params)
+    if params is None:
+        return None
+    # Pagination links are absolute URLs, so the host is part of the rendered body
+    raw = repr((RESPONSE_CACHE_VERSION, request.scheme, request.get_host(), params))
+    return f"{RESPONSE_CACHE_PREFIX}{catalog_generation()}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def make_etag(body):
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def shared_cache():
+    return caches[SHARED_CACHE_ALIAS] if settings.PRODUCT_RESPONSE_CACHE_SHARED else None
+
+
+def remember(key, entry):
+    """Stores an entry in the process LRU, evicting the least recently used ones"""
+    size = settings.PRODUCT_RESPONSE_CACHE_SIZE
+    if size <= 0:
+        return
+    with _lru_lock:
+        _lru[key] = entry
+        _lru.move_to_end(key)
+        while len(_lru) > size:
+            _lru.popitem(last=False)
+
+
+def clear_response_cache():
+    """Empties the process LRU; generations restart in a rolled back test database"""
+    with _lru_lock:
+        _lru.clear()
+
+
+def get_cached_response(key):
+    """(body, content_type, etag) of a cached page, or None"""
+    with _lru_lock:
+        entry = _lru.get(key)
+        if entry is not None:
+            _lru.move_to_end(key)
+            return entry
+
+    shared = shared_cache()
+    if shared is None:
+        return None
+    try:
+        entry = shared.get(key)
+    except Exception as e:
+        logger.warning(f"No se pudo leer la caché compartida de respuestas: {str(e)}")
+        return None
+    if entry is not None:
+        remember(key, entry)
+    return entry
+
+
+def store_response(key, response):
+    """Caches a rendered product list page and sets its ETag"""
+    entry = (response.content, response["Content-Type"], make_etag(response.content))
+    response["ETag"] = entry[2]
+    remember(key, entry)
+
+    shared = shared_cache()
+    if shared is not None:
+        try:
+            shared.set(key, entry)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar en la caché compartida de respuestas: {str(e)}")
+    return entry
+
@@ -1,21 +1,160 @@
+import os
+import re
+import copy
 import json
 import logging
+import tempfile
+import threading
 from products.utils.file_utils import get_config_path
-from products.models import Product
+from products.services.provider_service import provider_exists, rename_provider
 
 logger = logging.getLogger(__name__)
 
-def remove_provider_config(filename):
+# Parsed config_proveedores.json shared by every reader of this process.
+# It is reloaded only when the file's mtime/size change or after save_config().
+_config_cache = {"path": None, "signature": None, "data": {}, "matcher": None}
+_config_lock = threading.Lock()
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _build_provider_matcher(config_providers):
+    """Single regex matching any configured provider name, longest names first"""
+    if not config_providers:
+        return None
+    names = sorted(config_providers.keys(), key=len, reverse=True)
+    return re.compile("|".join(re.escape(name) for name in names))
+
+def _refresh_config_cache():
+    """Reloads the cached configuration if the file changed. Must hold _config_lock."""
+    config_path = get_config_path()
+    try:
+        signature = _file_signature(config_path)
+    except FileNotFoundError:
+        signature = None
+
+    if _config_cache["path"] == config_path and _config_cache["signature"] == signature:
+        return
+
+    config_providers = {}
+    if signature is not None:
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                config_providers = json.load(f)
+            logger.debug(f"Configuración recargada: {config_providers}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Error al decodificar el JSON de configuración: {str(e)}")
+
+    _config_cache.update(
+        path=config_path,
+        signature=signature,
+        data=config_providers,
+        matcher=_build_provider_matcher(config_providers),
+    )
+
+def load_config():
     """
-    Removes the entry associated with the provider from the configuration, based on the filename
+    Returns the provider configuration from config_proveedores.json.
+
+    The parsed file is cached per process and revalidated with a single stat() call,
+    so the ETL can ask for it once per file without re-reading the JSON.
+    Callers get their own copy and may modify it freely.
+    """
+    with _config_lock:
+        _refresh_config_cache()
+        return copy.deepcopy(_config_cache["data"])
+
+def get_provider_matcher():
+    """
+    Returns a precompiled regex that finds any configured provider name inside a filename,
+    or None when there is no configuration.
+    """
+    with _config_lock:
+        _refresh_config_cache()
+        return _config_cache["matcher"]
+
+def invalidate_config_cache():
+    with _config_lock:
+        _config_cache["signature"] = None
+
+def save_config(config_data):
+    """
+    Atomically replaces config_proveedores.json (temp file + rename),
+    so concurrent readers never see a half-written JSON.
     """
     config_path = get_config_path()
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_providers = json.load(f)
-    except json.JSONDecodeError:
-        config_providers = {}
-        logger.error("Error al decodificar el JSON de configuración.")
+        mode = os.stat(config_path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(config_path), suffix=".tmp")
+    try:
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(config_data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, config_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        invalidate_config_cache()
+
+def build_provider_config(simple_config):
+    """
+    Converts the simplified configuration sent by FileEditor (file_name, start_row,
+    column_range, columns, price_format and the optional reader options) into the internal {provider: {extract_config,
+    transform_config}} format. Raises ValueError when a required field is missing.
+    """
+    file_name = simple_config.get("file_name")
+    if not file_name:
+        raise ValueError("El campo 'file_name' no puede estar vacío.")
+    file_without_extension = file_name.split('.')[0].lower()
+    provider_key = file_without_extension.split('_')[0].lower()
+    start_row = simple_config.get("start_row", 0) - 1
+    column_range = simple_config.get("column_range", {})
+    start_col = column_range.get("start", "")
+    end_col = column_range.get("end", "")
+    usecols = f"{start_col}:{end_col}" if start_col and end_col else None
+
+    columns = simple_config.get("columns", {})
+    if not all(k in columns for k in ["item", "product_name", "price"]):
+        raise ValueError("El objeto 'columns' debe incluir 'item', 'product_name' y 'price'.")
+
+    # Column mapping configuration for ETL transformation
+    provider_config = {
+        provider_key: {
+            "extract_config": {
+                "skiprows": start_row,
+                "usecols": usecols
+            },
+            "transform_config": {
+                "column_mappings": {
+                    columns["item"]: "item",
+                    columns["product_name"]: "product_name",
+                    columns["price"]: "product_price"
+                }
+            }
+        }
+    }
+    # Optional reader options: engine, sheet selection and CSV dialect (products/etl/readers.py)
+    for option in ("engine", "sheet", "delimiter", "encoding"):
+        if simple_config.get(option) is not None:
+            provider_config[provider_key]["extract_config"][option] = simple_config[option]
+    # Optional number format of the price column ("en_US": 1,234.56 / "es_AR": 1.234,56)
+    if simple_config.get("price_format"):
+        provider_config[provider_key]["transform_config"]["price_format"] = simple_config["price_format"]
+    return provider_config
+
+def remove_provider_config(filename):
+    """
+    Removes the entry associated with the provider from the configuration, based on the filename
+    """
+    config_providers = load_config()
 
     file_without_extension = filename.split('.')[0].strip().lower()
     provider_name = file_without_extension.split('_')[0]
@@ -23,30 +162,54 @@ def remove_provider_config(filename):
         del config_providers[provider_name]
         logger.info(f"Proveedor {provider_name} eliminado de la configuración.")
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config_providers, f, indent=2, ensure_ascii=False)
+        save_config(config_providers)
         logger.info("Archivo de configuración actualizado correctamente.")
     except Exception as e:
         logger.exception("Error al actualizar la configuración tras eliminar el archivo.")
         raise e
     
 
+def rename_key_conflict(old_name, new_name):
+    """
+    Supplier key that renaming the file old_name to new_name would overwrite, or None.
+    Checked before touching the file, the configuration or the database.
+    """
+    # Derive the keys (based on the name before “_” and in lowercase)
+    old_key = old_name.split('.')[0].split('_')[0].lower()
+    new_key = new_name.split('.')[0].split('_')[0].lower()
+    if old_key == new_key:
+        return None
+    if new_key in load_config() or provider_exists(new_key):
+        return new_key
+    return None
+
 def rename_provider_config(old_name, new_name):
     """
-    Rename the entry in the provider settings
+    Rename the entry in the provider settings.
+    Returns False, without changing anything, when the new key already belongs to another supplier.
     """
-    config_path = get_config_path()
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
-    except json.JSONDecodeError as e:
-        logger.error("Error al cargar la configuración para renombrar: %s", e)
-        config_data = {}
+    conflict = rename_key_conflict(old_name, new_name)
+    if conflict:
+        logger.error("Ya existe un proveedor '%s'", conflict)
+        return False
+
+    config_data = load_config()
 
     # Derive the keys (based on the name before “_” and in lowercase)
     old_key = old_name.split('.')[0].split('_')[0].lower()
     new_key = new_name.split('.')[0].split('_')[0].lower()
 
+    # Update the database first: a single-row rename, the products follow through the foreign key.
+    # It only fails on a key taken since the check above, and then the configuration is untouched.
+    try:
+        if not rename_provider(old_key, new_key):
+            logger.error("Ya existe un proveedor '%s' en la base de datos", new_key)
+            return False
+        logger.info("Proveedor '%s' renombrado a '%s' en la base de datos", old_key, new_key)
+    except Exception as e:
+        logger.exception("Error al actualizar los productos en la base de datos: %s", e)
+        return False
+
     if old_key in config_data:
         # Update the configuration: move the old entry to the new key
         config_data[new_key] = config_data.pop(old_key)
@@ -56,19 +219,11 @@ def rename_provider_config(old_name, new_name):
 
     # Save updated settings
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config_data, f, indent=2, ensure_ascii=False)
+        save_config(config_data)
         logger.info("Archivo de configuración actualizado correctamente.")
     except Exception as e:
         logger.exception("Error al guardar la configuración renombrada")
+        rename_provider(new_key, old_key)
         return False
 
-    # Update the database: change the 'provider' field in the associated products
-    try:
-        updated = Product.objects.filter(proveedor=old_key).update(proveedor=new_key)
-        logger.info("Se actualizaron %s productos de '%s' a '%s'", updated, old_key, new_key)
-    except Exception as e:
-        logger.exception("Error al actualizar los productos en la base de datos: %s", e)
-        return False
-
-    return True
\ No newline at end of file
+    return True
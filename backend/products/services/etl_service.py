@@ -1,74 +1,500 @@
+import time
 import logging
-from products.etl.extract import extract_data
+import multiprocessing
+import multiprocessing.connection
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from products.etl.extract import list_provider_files, determine_provider, extract_file, extract_file_chunks
 from products.etl.transform import transform_data
-from products.etl.load import load_to_database
-from products.etl.etl_exceptions import ExtractionError, TransformationError, LoadError
+from products.etl.load import load_to_database, load_chunks
+from products.etl.shadow_load import shadow_load_enabled, load_shadow
+from products.etl.etl_exceptions import ExtractionError, TransformationError, LoadError, ETLCancelled
+from products.services.config_service import load_config
+from products.services.progress_service import progress_channel
+from products.services.upload_service import recorded_file_hashes
+from products.services.metrics_service import peak_rss_kb, reset_peak_rss, save_run_metrics
+from products.services.etl_worker import run_provider_pipeline
+from products.utils.db_utils import QueryCounter
 from products.models import ETLStatus
 
 logger = logging.getLogger(__name__)
 
-def run_etl_service():
-    etl_status = ETLStatus.objects.create(status="Ejecutando...", progress=0)
+# Progress ranges of the job: extract+transform fills 0-50%, the load 50-100%
+EXTRACT_PROGRESS_START = 5
+LOAD_PROGRESS_START = 50
 
+def transform_provider_data(df, metadata):
+    """
+    Transforms one extracted dataframe and validates the key columns.
+    Raises TransformationError when the provider configuration does not match the file.
+    """
+    provider = metadata['proveedor']
+    creation_date = metadata['fecha_actualizacion']
+
+    # Perform the transformation and validate the existence of the key columns
+    df_transformed = transform_data(df, provider)
+    if df_transformed is None:
+        raise TransformationError(f"Error en la transformación de datos para el proveedor {provider}.")
+
+    #  list of required columns
+    required_columns = ["item", "product_name", "product_price"]
+
+    # Check for missing required columns
+    missing_columns = [col for col in required_columns if col not in df_transformed.columns]
+    if missing_columns:
+        raise TransformationError(
+            f"Las siguientes columnas están ausentes en los datos transformados para el proveedor {provider}: {', '.join(missing_columns)}."
+        )
+
+    # Add metadata columns
+    df_transformed.loc[:, 'fecha_actualizacion'] = creation_date
+    return df_transformed
+
+def new_provider_report(file_name):
+    """Per-provider entry of the run report"""
+    return {
+        "file": file_name,
+        "proveedor": None,
+        "rows_read": 0,
+        "rows_kept": 0,
+        "rows_invalid_price": 0,
+        "extract_seconds": 0.0,
+        "transform_seconds": 0.0,
+        "cache_hit": None,
+        "peak_rss_kb": None,
+        "error": None,
+        "error_stage": None,
+    }
+
+def process_provider_file(file_name, config_providers, content_hash=None):
+    """
+    Extract + transform for a single supplier file, executed in the ETL worker processes.
+    `content_hash` is the file's recorded upload hash, used as extract cache key.
+    Never raises: returns ((df, metadata) or None, report) where the report holds the
+    per-provider timings, row counts and the error (if any) with the stage it happened in.
+    """
+    report = new_provider_report(file_name)
+    reset_peak_rss()
+
+    started = time.perf_counter()
     try:
-        # Extract
-        etl_status.status = "Extrayendo datos"
-        etl_status.progress = 10
-        etl_status.save()
-        logger.info('ETL - Extracción iniciada.')
-
-        dataframes = extract_data()
-        if not dataframes:
-            raise ExtractionError("No se extrajeron datos. Verifica el archivo y la configuración.")
-
-        # Transform
-        etl_status.status = "Transformando datos"
-        etl_status.progress = 50
-        etl_status.save()
-        logger.info('ETL - Transformación iniciada.')
-        dataframes_transformed = []
-        for df, metadata in dataframes:
-            provider = metadata['proveedor']
-            creation_date = metadata['fecha_actualizacion']
-
-            # Perform the transformation and validate the existence of the key columns
-            df_transformed = transform_data(df, provider)
-            if df_transformed is None:
-                raise TransformationError(f"Error en la transformación de datos para el proveedor {provider}.")
-
-            #  list of required columns
-            required_columns = ["item", "product_name", "product_price"]
-
-            # Check for missing required columns
-            missing_columns = [col for col in required_columns if col not in df_transformed.columns]
-            if missing_columns:
-                raise TransformationError(
-                    f"Las siguientes columnas están ausentes en los datos transformados para el proveedor {provider}: {', '.join(missing_columns)}."
-                )
+        df, metadata = extract_file(file_name, config_providers, content_hash)
+    except Exception as ex:
+        # Any error skips the file, as in the worker processes of the parallel mode
+        logger.error(f"Error en la extracción para el archivo {file_name}: {str(ex)}")
+        report.update(error=str(ex), error_stage="extract")
+        return None, report
+    finally:
+        report["extract_seconds"] = round(time.perf_counter() - started, 3)
 
-            # Add metadata columns
-            df_transformed.loc[:, 'fecha_actualizacion'] = creation_date
-            dataframes_transformed.append((df_transformed, metadata))
+    report["proveedor"] = metadata['proveedor']
+    report["rows_read"] = len(df)
+    report["cache_hit"] = metadata.get('cache_hit')
 
-        # Load
-        etl_status.status = "Cargando datos en BD"
-        etl_status.progress = 80
-        etl_status.save()
-        logger.info('ETL - Carga en BD iniciada.')
+    started = time.perf_counter()
+    try:
+        df_transformed = transform_provider_data(df, metadata)
+    except Exception as te:
+        logger.error(f"Error en la transformación para el archivo {file_name}: {str(te)}")
+        report.update(error=str(te), error_stage="transform")
+        return None, report
+    finally:
+        report["transform_seconds"] = round(time.perf_counter() - started, 3)
+
+    report["rows_kept"] = len(df_transformed)
+    report["rows_invalid_price"] = df_transformed.attrs.get("invalid_price_rows", 0)
+    # Measured in the worker process when the pipelines run in parallel
+    report["peak_rss_kb"] = peak_rss_kb()
+    return (df_transformed, metadata), report
+
+def stream_provider_file(file_name, config_providers, report, chunk_size):
+    """
+    Streaming extract + transform for one supplier file.
+    Yields transformed (df, metadata) chunks and accumulates timings and row counts in `report`.
+    Errors after the first chunk propagate to the caller, since rows of this file
+    are already loaded.
+    """
+    reset_peak_rss()
+    chunks = extract_file_chunks(file_name, config_providers, chunk_size)
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = next(chunks, None)
+        except ExtractionError as ex:
+            # A file that fails before yielding any row is skipped, as in the batch mode
+            if report["rows_read"]:
+                raise
+            logger.error(f"Error en la extracción para el archivo {file_name}: {str(ex)}")
+            report.update(error=str(ex), error_stage="extract")
+            return
+        report["extract_seconds"] = round(report["extract_seconds"] + time.perf_counter() - started, 3)
+        if chunk is None:
+            report["peak_rss_kb"] = peak_rss_kb()
+            return
+
+        df, metadata = chunk
+        report["proveedor"] = metadata['proveedor']
+        report["rows_read"] += len(df)
+
+        started = time.perf_counter()
+        df_transformed = transform_provider_data(df, metadata)
+        report["transform_seconds"] = round(report["transform_seconds"] + time.perf_counter() - started, 3)
+        report["rows_kept"] += len(df_transformed)
+        report["rows_invalid_price"] += df_transformed.attrs.get("invalid_price_rows", 0)
+        yield df_transformed, metadata
+
+def stream_provider_files(files, config_providers, reports, chunk_size=None, skipped_providers=None):
+    """
+    Chains the streaming pipelines of every supplier file into one sequence of chunks,
+    filling one report per file in `reports` and adding the supplier of every skipped
+    file to `skipped_providers`.
+    """
+    chunk_size = chunk_size or settings.ETL_CHUNK_SIZE
+    for file_name in files:
+        report = new_provider_report(file_name)
+        reports.append(report)
+        yield from stream_provider_file(file_name, config_providers, report, chunk_size)
+        if skipped_providers is not None:
+            skipped_providers.update(failed_providers([report]))
+
+def failed_providers(provider_reports):
+    """
+    Suppliers with a file that failed or was skipped in this run (extraction error,
+    worker crash, timeout). Several files can feed one supplier, so the products
+    missing from the loaded ones may still be listed in the failed one: the load
+    must not sweep them.
+    """
+    providers = set()
+    for report in provider_reports:
+        if not report["error"]:
+            continue
         try:
-            load_to_database(dataframes_transformed)
-        except Exception as e:
-            raise LoadError(f"Error al cargar los datos: {str(e)}")
-        
-        etl_status.status = "Finalizado"
-        etl_status.progress = 100
-        etl_status.save()
-        return {"message": "ETL finalizado correctamente."}
-    
+            # Extraction failures, timeouts and crashes are reported before the supplier is known
+            providers.add(report["proveedor"] or determine_provider(report["file"]))
+        except ValueError:
+            continue
+    return providers
+
+def summarize_cache(provider_reports):
+    """Hit/miss counts of the extract cache for the run report"""
+    hits = sum(1 for report in provider_reports if report["cache_hit"] is True)
+    misses = sum(1 for report in provider_reports if report["cache_hit"] is False)
+    return {"hits": hits, "misses": misses}
+
+def run_provider_pipelines(files, config_providers, workers=None, timeout=None, on_result=None):
+    """
+    Runs extract+transform for every supplier file, in parallel when workers > 1.
+    `on_result(done, total, report)` is called as each file's result is gathered.
+
+    PERFORMANCE:
+    - Excel parsing is CPU-bound: one worker process per file uses every core
+    - Results are returned in file order for a single load
+    - Each file gets `timeout` seconds from the moment its worker starts; a file still
+      running at its deadline is reported as failed and only its worker is terminated,
+      so a slow or broken file never holds up the others
+    - Workers are spawned, not forked, since the job runs in a thread of the web process
+      (products/services/etl_worker.py)
+    - Hashes recorded by the uploads are looked up here, before the workers start, so
+      unchanged files reach their extract cache entry without being read
+    """
+    workers = settings.ETL_WORKERS if workers is None else workers
+    timeout = settings.ETL_FILE_TIMEOUT if timeout is None else timeout
+
+    file_hashes = recorded_file_hashes(files)
+    results = {}
+
+    def gather(file_name, result):
+        results[file_name] = result
+        if on_result:
+            on_result(len(results), len(files), result[1])
+
+    if workers <= 1 or len(files) <= 1:
+        for file_name in files:
+            gather(file_name, process_provider_file(file_name, config_providers, file_hashes.get(file_name)))
+        return [results[file_name] for file_name in files]
+
+    context = multiprocessing.get_context("spawn")
+    queued = list(files)
+    running = {}  # result pipe -> (file name, worker process, deadline)
+
+    def failed(file_name, message, stage):
+        logger.error(message)
+        return None, {**new_provider_report(file_name), "error": message, "error_stage": stage}
+
+    try:
+        while queued or running:
+            while queued and len(running) < workers:
+                file_name = queued.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=run_provider_pipeline,
+                    args=(sender, file_name, config_providers, file_hashes.get(file_name)),
+                    daemon=True,
+                )
+                process.start()
+                sender.close()
+                running[receiver] = (file_name, process, time.monotonic() + timeout)
+
+            next_deadline = min(deadline for _, _, deadline in running.values())
+            for receiver in multiprocessing.connection.wait(list(running), max(0, next_deadline - time.monotonic())):
+                file_name, process, _ = running.pop(receiver)
+                try:
+                    result = receiver.recv()
+                except (EOFError, OSError):
+                    process.join()
+                    result = failed(
+                        file_name,
+                        f"Error inesperado procesando el archivo {file_name}: el proceso terminó con código {process.exitcode}.",
+                        "worker",
+                    )
+                receiver.close()
+                process.join()
+                gather(file_name, result)
+
+            now = time.monotonic()
+            for receiver, (file_name, process, deadline) in list(running.items()):
+                if deadline > now:
+                    continue
+                del running[receiver]
+                process.terminate()
+                process.join()
+                receiver.close()
+                gather(file_name, failed(
+                    file_name,
+                    f"El archivo {file_name} superó el tiempo máximo de procesamiento ({timeout}s).",
+                    "timeout",
+                ))
+    finally:
+        for receiver, (_, process, _) in running.items():
+            process.terminate()
+            process.join()
+            receiver.close()
+
+    return [results[file_name] for file_name in files]
+
+def raise_if_cancelled(etl_status, cancel_event=None, check_database=False):
+    """
+    Cancellation checkpoint of a running job.
+    The in-memory event is free to check and is polled between write chunks; the
+    database flag (set from any web worker) is only read between stages.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise ETLCancelled()
+    if check_database and ETLStatus.objects.filter(pk=etl_status.pk, cancel_requested=True).exists():
+        raise ETLCancelled()
+
+def publish_progress(etl_status, **details):
+    """Publishes the current job state to the in-memory progress channel (no database write)"""
+    progress_channel.publish(
+        str(etl_status.job_id),
+        state=etl_status.state,
+        status=etl_status.status,
+        progress=etl_status.progress,
+        **details,
+    )
+
+def publish_heartbeat(etl_status, **details):
+    """
+    Publishes progress from inside a stage and, at most every settings.ETL_JOB_HEARTBEAT_SECONDS,
+    saves the job's updated_at and progress so other web workers do not take it for dead
+    (job_service.fail_stale_jobs). Inside a load transaction the heartbeat lands with its commit.
+    """
+    publish_progress(etl_status, **details)
+    now = timezone.now()
+    if etl_status.updated_at and (now - etl_status.updated_at).total_seconds() < settings.ETL_JOB_HEARTBEAT_SECONDS:
+        return
+    ETLStatus.objects.filter(pk=etl_status.pk).update(updated_at=now, progress=etl_status.progress)
+    etl_status.updated_at = now
+
+def set_job_stage(etl_status, status, progress, **details):
+    """Persists a stage change of the job and publishes it"""
+    etl_status.status = status
+    etl_status.progress = progress
+    etl_status.save()
+    publish_progress(etl_status, **details)
+
+def run_etl_service(etl_status=None, cancel_event=None):
+    """
+    Runs the whole ETL for one job and records its outcome in `etl_status`.
+
+    Called by the background job runner (products/services/job_service.py) with the
+    job's ETLStatus row and cancellation event; without them a new row is created,
+    which keeps the service usable from scripts and benchmarks (IntegrityError while
+    another job is active, see ETLStatus.Meta.constraints).
+    """
+    if etl_status is None:
+        etl_status = ETLStatus.objects.create(status="Ejecutando...", progress=0, state=ETLStatus.RUNNING)
+        publish_progress(etl_status, stage="start")
+    else:
+        etl_status.state = ETLStatus.RUNNING
+        set_job_stage(etl_status, "Ejecutando...", 0, stage="start")
+
+    def checkpoint(check_database=False):
+        raise_if_cancelled(etl_status, cancel_event, check_database)
+
+    started = time.perf_counter()
+    counter = QueryCounter()
+    try:
+        checkpoint(check_database=True)
+        with connection.execute_wrapper(counter):
+            if settings.ETL_STREAMING:
+                result = run_streaming_etl(etl_status, checkpoint)
+            else:
+                result = run_batch_etl(etl_status, checkpoint)
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        save_run_metrics(etl_status, result, result["seconds"], counter.count)
+
+        etl_status.state = ETLStatus.FINISHED
+        etl_status.finished_at = timezone.now()
+        etl_status.result = result
+        set_job_stage(etl_status, "Finalizado", 100, stage="done")
+        return result
+
+    except ETLCancelled:
+        logger.warning(f"ETL - Job {etl_status.job_id} cancelado.")
+        etl_status.state = ETLStatus.CANCELLED
+        etl_status.finished_at = timezone.now()
+        set_job_stage(etl_status, "Cancelado", 0, stage="done")
+        raise
+
     except Exception as e:
         error_message = f"Error durante el ETL: {str(e)}"
         logger.error(error_message)
-        etl_status.status = error_message
-        etl_status.progress = 0
-        etl_status.save()
+        etl_status.state = ETLStatus.FAILED
+        etl_status.finished_at = timezone.now()
+        set_job_stage(etl_status, error_message, 0, stage="done")
         raise
+
+def run_batch_etl(etl_status, checkpoint):
+    """
+    Default ETL mode: extract+transform every supplier file (in parallel when
+    settings.ETL_WORKERS > 1), then load everything in bounded commits (settings.ETL_LOAD_COMMIT_ROWS)
+    or through a shadow table swapped in at once (settings.ETL_LOAD_MODE = "shadow").
+    """
+    # Extract + Transform (one pipeline per supplier file)
+    files = list_provider_files()
+    set_job_stage(
+        etl_status, "Extrayendo y transformando datos", EXTRACT_PROGRESS_START,
+        stage="extract", providers_done=0, providers_total=len(files),
+    )
+    logger.info('ETL - Extracción y transformación iniciadas.')
+
+    def on_provider_done(done, total, report):
+        progress = EXTRACT_PROGRESS_START + (LOAD_PROGRESS_START - EXTRACT_PROGRESS_START) * done // total
+        set_job_stage(
+            etl_status, f"Procesado {report['proveedor'] or report['file']} ({done}/{total})", progress,
+            stage="extract", provider=report['proveedor'], providers_done=done, providers_total=total,
+        )
+
+    results = run_provider_pipelines(files, load_config(), on_result=on_provider_done)
+    checkpoint(check_database=True)
+
+    dataframes_transformed = []
+    provider_reports = []
+    for data, report in results:
+        provider_reports.append(report)
+        logger.info(
+            f"ETL - {report['file']}: extracción {report['extract_seconds']}s, "
+            f"transformación {report['transform_seconds']}s, {report['rows_kept']} filas."
+        )
+        if data is not None:
+            dataframes_transformed.append(data)
+
+    # Configuration errors still abort the run, once every file has been processed
+    for report in provider_reports:
+        if report["error_stage"] == "transform":
+            raise TransformationError(report["error"])
+
+    if not dataframes_transformed:
+        raise ExtractionError("No se extrajeron datos. Verifica el archivo y la configuración.")
+
+    # Load
+    set_job_stage(etl_status, "Cargando datos en BD", LOAD_PROGRESS_START, stage="load")
+    logger.info('ETL - Carga en BD iniciada.')
+
+    def on_load_progress(written, total):
+        # Runs inside a load transaction: progress is published, only the throttled heartbeat is saved
+        checkpoint()
+        etl_status.progress = LOAD_PROGRESS_START + (99 - LOAD_PROGRESS_START) * written // max(total, 1)
+        publish_heartbeat(etl_status, stage="load", rows_written=written, rows_total=total)
+
+    # Suppliers with a skipped file keep the products the other files no longer list
+    keep_providers = failed_providers(provider_reports)
+    reset_peak_rss()
+    try:
+        if shadow_load_enabled():
+            total_rows = sum(len(df) for df, _ in dataframes_transformed)
+            load_stats = load_shadow(
+                dataframes_transformed, on_progress=on_load_progress, run=etl_status,
+                total_rows=total_rows, keep_providers=keep_providers,
+            )
+        else:
+            load_stats = load_to_database(
+                dataframes_transformed, on_progress=on_load_progress, run=etl_status, keep_providers=keep_providers,
+            )
+        load_stats["peak_rss_kb"] = peak_rss_kb()
+    except ETLCancelled:
+        raise
+    except Exception as e:
+        raise LoadError(f"Error al cargar los datos: {str(e)}")
+
+    return {
+        "message": "ETL finalizado correctamente.",
+        "providers": provider_reports,
+        "cache": summarize_cache(provider_reports),
+        "load": load_stats,
+    }
+
+def run_streaming_etl(etl_status, checkpoint):
+    """
+    Streaming ETL mode (settings.ETL_STREAMING)
+
+    MEMORY: rows flow from a read-only sheet iterator through the transform to the
+    chunked loader, ETL_CHUNK_SIZE rows at a time. Peak memory is bounded by the
+    chunk size instead of the catalog size, so very large price lists can be
+    loaded on small machines. Files are processed sequentially and written in
+    bounded commits; an extraction or transformation error stops the run and
+    the next run completes the batches already committed (settings.ETL_LOAD_COMMIT_ROWS
+    = 0 restores a single load transaction that the error rolls back). With
+    settings.ETL_LOAD_MODE = "shadow" the chunks fill a shadow table instead and
+    an error leaves the live catalog untouched.
+    """
+    files = list_provider_files()
+    set_job_stage(
+        etl_status, "Procesando datos en modo streaming", EXTRACT_PROGRESS_START,
+        stage="stream", providers_done=0, providers_total=len(files),
+    )
+    logger.info('ETL - Ejecución en modo streaming iniciada.')
+
+    provider_reports = []
+
+    def on_chunk_loaded(rows_loaded, _total):
+        # File sizes are unknown up front: progress advances per file, rows are reported as loaded
+        checkpoint()
+        done = max(len(provider_reports) - 1, 0)
+        etl_status.progress = EXTRACT_PROGRESS_START + (99 - EXTRACT_PROGRESS_START) * done // max(len(files), 1)
+        current = provider_reports[-1] if provider_reports else None
+        publish_heartbeat(
+            etl_status, stage="stream", provider=current and current['proveedor'],
+            providers_done=done, providers_total=len(files), rows_written=rows_loaded,
+        )
+
+    # Filled while the chunks are consumed; the loaders read it once every file is done
+    keep_providers = set()
+    chunks = stream_provider_files(files, load_config(), provider_reports, skipped_providers=keep_providers)
+    try:
+        loader = load_shadow if shadow_load_enabled() else load_chunks
+        load_stats = loader(chunks, on_progress=on_chunk_loaded, run=etl_status, keep_providers=keep_providers)
+        # The load runs interleaved with every file's extract and transform, which reset the window
+        peaks = [peak_rss_kb(), *(report["peak_rss_kb"] for report in provider_reports)]
+        load_stats["peak_rss_kb"] = max((peak for peak in peaks if peak is not None), default=None)
+    except (ExtractionError, TransformationError, ETLCancelled):
+        raise
+    except Exception as e:
+        raise LoadError(f"Error al cargar los datos: {str(e)}")
+
+    if not load_stats["rows"]:
+        raise ExtractionError("No se extrajeron datos. Verifica el archivo y la configuración.")
+
+    return {"message": "ETL finalizado correctamente.", "providers": provider_reports, "load": load_stats}
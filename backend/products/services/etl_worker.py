@@ -0,0 +1,22 @@
+"""
+ETL WORKER PROCESS - Entry point of the parallel extract+transform
+
+The ETL job runs in a thread of the web process, and forking a threaded
+process copies locks held by other threads (logging, database connections)
+in their locked state. Worker processes are therefore started with the
+"spawn" method: a fresh interpreter that sets Django up before importing the
+ETL code. This module imports nothing from Django at load time, so the child
+can unpickle its entry point before django.setup() runs.
+"""
+
+
+def run_provider_pipeline(sender, file_name, config_providers, content_hash):
+    """Runs process_provider_file in a spawned process and sends its result through `sender`"""
+    import django
+    django.setup()
+    from products.services.etl_service import process_provider_file
+
+    try:
+        sender.send(process_provider_file(file_name, config_providers, content_hash))
+    finally:
+        sender.close()
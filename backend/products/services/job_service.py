@@ -0,0 +1,147 @@
+"""
+ETL JOB RUNNER - Background Execution of the ETL Pipeline
+
+A full ETL run takes minutes on real catalogs, far longer than an HTTP request
+should stay open. Jobs are queued here and executed by a single background
+thread, so the API answers immediately with a job_id the frontend can follow.
+
+TECHNICAL SOLUTION:
+- One worker thread: ETL runs never overlap (they share the products table)
+- Only one active job at a time; a second submit returns the running job. The
+  lock below only serialises submits within this process; across web workers
+  the single_active_etl_job constraint makes the second insert fail
+- Cancellation: an in-process event checked between write chunks, plus a
+  database flag so a cancel received by another web worker is also honoured.
+  A cancelled load is not rolled back: the batches it already committed
+  (settings.ETL_LOAD_COMMIT_ROWS) stay in the catalog, with supplier counts and
+  the catalog generation refreshed, and the next run completes them. Loads in
+  a single transaction (ETL_LOAD_COMMIT_ROWS = 0) or through a shadow table
+  (ETL_LOAD_MODE = "shadow") leave the catalog untouched instead
+- Jobs whose heartbeat (updated_at) is older than settings.ETL_JOB_STALE_SECONDS
+  are considered dead (e.g. the server restarted mid-run) and marked as failed.
+  Running jobs save the heartbeat from their progress callbacks every
+  settings.ETL_JOB_HEARTBEAT_SECONDS, so a long load is not taken for dead
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction, IntegrityError, OperationalError
+from django.utils import timezone
+from products.models import ETLStatus
+from products.services.etl_service import run_etl_service, publish_progress
+from products.etl.etl_exceptions import ETLCancelled
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="etl-job")
+_submit_lock = threading.Lock()
+_cancel_events = {}
+
+
+def fail_stale_jobs():
+    """Marks as failed the active jobs that stopped reporting progress"""
+    threshold = timezone.now() - timedelta(seconds=settings.ETL_JOB_STALE_SECONDS)
+    stale = ETLStatus.objects.filter(state__in=ETLStatus.ACTIVE_STATES, updated_at__lt=threshold)
+    for job in stale:
+        if job.pk in _cancel_events:
+            # Still alive in this process, just a long stage
+            continue
+        job.state = ETLStatus.FAILED
+        job.status = "Error: el proceso del ETL se interrumpió."
+        job.finished_at = timezone.now()
+        # Only if no heartbeat landed since the query above
+        reaped = ETLStatus.objects.filter(
+            pk=job.pk, state__in=ETLStatus.ACTIVE_STATES, updated_at__lt=threshold,
+        ).update(state=job.state, status=job.status, finished_at=job.finished_at, updated_at=timezone.now())
+        if reaped:
+            logger.warning(f"ETL - Job {job.job_id} sin actividad, se marca como fallido.")
+            publish_progress(job, stage="done")
+
+
+def latest_job(**filters):
+    """Most recent job matching `filters`, resolved through the create_ad index"""
+    return ETLStatus.objects.filter(**filters).order_by('-create_ad', '-id').first()
+
+
+def get_active_job():
+    """Queued or running job, or None"""
+    fail_stale_jobs()
+    return latest_job(state__in=ETLStatus.ACTIVE_STATES)
+
+
+def submit_etl_job():
+    """
+    Queues a new ETL run.
+    Returns (job, created): when a job is already active it is returned with created=False.
+    """
+    with _submit_lock:
+        active_job = get_active_job()
+        if active_job is not None:
+            return active_job, False
+
+        try:
+            with transaction.atomic():
+                job = ETLStatus.objects.create(status="En cola", progress=0, state=ETLStatus.PENDING)
+        except IntegrityError:
+            # Another web worker queued a job since the check above
+            active_job = latest_job(state__in=ETLStatus.ACTIVE_STATES)
+            if active_job is None:
+                raise
+            return active_job, False
+
+        _cancel_events[job.pk] = threading.Event()
+        publish_progress(job, stage="queued")
+        _executor.submit(_run_job, job.pk)
+        logger.info(f"ETL - Job {job.job_id} en cola.")
+        return job, True
+
+
+def _run_job(job_pk):
+    """Worker thread body: runs the ETL for one queued job"""
+    cancel_event = _cancel_events.get(job_pk)
+    try:
+        close_old_connections()
+        job = ETLStatus.objects.get(pk=job_pk)
+        if job.cancel_requested or (cancel_event is not None and cancel_event.is_set()):
+            job.state = ETLStatus.CANCELLED
+            job.status = "Cancelado"
+            job.finished_at = timezone.now()
+            job.save()
+            publish_progress(job, stage="done")
+            return
+        run_etl_service(job, cancel_event)
+    except ETLCancelled:
+        pass
+    except Exception:
+        # Already recorded in the job row by run_etl_service
+        logger.exception(f"ETL - Job {job_pk} finalizado con error.")
+    finally:
+        _cancel_events.pop(job_pk, None)
+        connection.close()
+
+
+def cancel_etl_job(job):
+    """
+    Requests the cancellation of a queued or running job.
+    Returns False when the job already finished.
+    """
+    if job.state not in ETLStatus.ACTIVE_STATES:
+        return False
+
+    # The in-process event works even while the ETL transaction holds the SQLite write lock
+    cancel_event = _cancel_events.get(job.pk)
+    if cancel_event is not None:
+        cancel_event.set()
+
+    try:
+        ETLStatus.objects.filter(pk=job.pk).update(cancel_requested=True)
+    except OperationalError as e:
+        if cancel_event is None:
+            raise
+        logger.warning(f"ETL - No se pudo registrar la cancelación del job {job.job_id}: {str(e)}")
+
+    logger.info(f"ETL - Cancelación solicitada para el job {job.job_id}.")
+    return True
@@ -0,0 +1,140 @@
+"""
+ETL METRICS - Per-Stage and Per-Provider Run Measurements
+
+Every finished ETL run stores one ETLStageMetric row per stage and supplier
+file (wall time, rows read/kept/dropped, rows/sec, queries, peak memory of the stage), so
+a slow run can be traced to the stage or file that caused it.
+"""
+
+import sys
+import logging
+from products.models import ETLStageMetric
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def reset_peak_rss():
+    """
+    Starts a new peak memory window for the stage about to run. The kernel keeps a single
+    high-water mark per process, so without a reset a long-lived web process would report
+    the largest peak of any earlier run. Linux only (writing 5 to /proc/self/clear_refs);
+    returns False where the peak cannot be reset and peak_rss_kb() stays a process peak.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    """
+    High-water mark of the resident memory in KB since the last reset_peak_rss()
+    (the whole process lifetime where it cannot be reset), or None if unavailable
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def rows_per_second(rows, seconds):
+    return round(rows / seconds, 1) if seconds else None
+
+
+def build_stage_metrics(run, result, total_seconds, total_queries):
+    """ETLStageMetric rows (unsaved) for a run report produced by run_etl_service"""
+    metrics = []
+    rows_read_total = 0
+    # Every stage measures its own window, so the run peak is the largest of them
+    peaks = [report.get("peak_rss_kb") for report in result.get("providers", [])]
+    peaks.append((result.get("load") or {}).get("peak_rss_kb"))
+    peaks = [peak for peak in peaks if peak is not None]
+
+    for report in result.get("providers", []):
+        rows_read = report["rows_read"]
+        rows_kept = report["rows_kept"]
+        rows_read_total += rows_read
+        common = {"run": run, "provider": report["proveedor"] or "", "file": report["file"], "peak_rss_kb": report.get("peak_rss_kb")}
+        metrics.append(ETLStageMetric(
+            stage=ETLStageMetric.EXTRACT,
+            wall_seconds=report["extract_seconds"],
+            rows_read=rows_read,
+            rows_kept=rows_read,
+            rows_per_second=rows_per_second(rows_read, report["extract_seconds"]),
+            **common,
+        ))
+        metrics.append(ETLStageMetric(
+            stage=ETLStageMetric.TRANSFORM,
+            wall_seconds=report["transform_seconds"],
+            rows_read=rows_read,
+            rows_kept=rows_kept,
+            rows_dropped=rows_read - rows_kept,
+            rows_per_second=rows_per_second(rows_read, report["transform_seconds"]),
+            **common,
+        ))
+
+    load = result.get("load") or {}
+    load_rows = load.get("rows", 0)
+    metrics.append(ETLStageMetric(
+        run=run,
+        stage=ETLStageMetric.LOAD,
+        wall_seconds=load.get("seconds", 0),
+        rows_read=load_rows,
+        rows_kept=load_rows,
+        rows_per_second=load.get("rows_per_second"),
+        query_count=load.get("queries", 0),
+        peak_rss_kb=load.get("peak_rss_kb"),
+    ))
+    metrics.append(ETLStageMetric(
+        run=run,
+        stage=ETLStageMetric.TOTAL,
+        wall_seconds=round(total_seconds, 3),
+        rows_read=rows_read_total,
+        rows_kept=load_rows,
+        rows_dropped=max(rows_read_total - load_rows, 0),
+        rows_per_second=rows_per_second(rows_read_total, total_seconds),
+        query_count=total_queries,
+        peak_rss_kb=max(peaks, default=None),
+    ))
+    return metrics
+
+
+def save_run_metrics(run, result, total_seconds, total_queries):
+    """
+    Stores the metrics of a finished run. Never raises: a metrics failure must not
+    turn a successful ETL run into a failed one.
+    """
+    try:
+        ETLStageMetric.objects.bulk_create(build_stage_metrics(run, result, total_seconds, total_queries))
+    except Exception as e:
+        logger.error(f"No se pudieron guardar las métricas del ETL {run.job_id}: {str(e)}")
+
+
+def serialize_metric(metric):
+    return {
+        "stage": metric.stage,
+        "provider": metric.provider,
+        "file": metric.file,
+        "wall_seconds": metric.wall_seconds,
+        "rows_read": metric.rows_read,
+        "rows_kept": metric.rows_kept,
+        "rows_dropped": metric.rows_dropped,
+        "rows_per_second": metric.rows_per_second,
+        "query_count": metric.query_count,
+        "peak_rss_kb": metric.peak_rss_kb,
+    }
@@ -0,0 +1,118 @@
+"""
+EXTRACTION PREVIEW - Sample-based check of a candidate provider configuration
+
+Configuring a supplier used to be trial and error: every attempt meant saving
+the configuration and running the whole ETL over every file.
+
+TECHNICAL SOLUTION:
+- Only the first N rows of the file are read: .xlsx workbooks through the
+  read-only streaming reader of the streaming ETL (extract.iter_sheet_rows),
+  which stops after the sample instead of parsing the whole sheet; CSV and
+  .xls files through their reader engine with a row limit (etl/readers.py)
+- The sample goes through the same transform code as the ETL
+  (transform.apply_transform_config) with the candidate configuration
+- The response holds the mapped rows, the dtype detected for each source
+  column and a summary of the rows the ETL would drop, and why
+"""
+
+import os
+import time
+import logging
+from contextlib import closing
+from itertools import islice
+import pandas as pd
+from products.etl.extract import iter_sheet_rows, header_columns
+from products.etl.readers import XLSX, read_options, read_table, resolve_engine
+from products.etl.transform import apply_transform_config, check_price_format, DEFAULT_PRICE_FORMAT
+from products.etl.etl_exceptions import TransformationError
+from products.utils.file_utils import get_providers_path
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ["item", "product_name", "product_price"]
+ERROR_SAMPLES = 5
+
+
+def read_sample(file_path, extract_config, rows):
+    """First `rows` data rows of a supplier file as a dataframe (header row excluded)"""
+    file_format, _ = resolve_engine(file_path, extract_config)
+    if file_format == XLSX and read_options(extract_config)["sheet"] == 0:
+        with closing(iter_sheet_rows(file_path, skiprows=extract_config["skiprows"], usecols=extract_config["usecols"])) as sheet_rows:
+            columns = header_columns(next(sheet_rows, None))
+            records = list(islice(sheet_rows, rows))
+        return pd.DataFrame.from_records(records, columns=columns)
+    # CSV, .xls and other sheets: the reader engine stops after `rows` rows where it can
+    return read_table(file_path, extract_config, nrows=rows)
+
+
+def preview_value(value):
+    """JSON-friendly cell value"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def summarize_errors(sample, column_mappings, price_format, transformed):
+    """Rows of the sample the ETL would drop: missing key values and unparseable prices"""
+    mapped = sample.rename(columns=column_mappings)
+    missing_values = mapped[REQUIRED_COLUMNS].isna().any(axis=1)
+    invalid_price = ~missing_values & ~mapped.index.isin(transformed.index)
+    return {
+        "rows_missing_values": int(missing_values.sum()),
+        "rows_invalid_price": int(invalid_price.sum()),
+        "invalid_price_samples": [
+            {"item": preview_value(item), "product_price": preview_value(price)}
+            for item, price in mapped.loc[invalid_price, ["item", "product_price"]].head(ERROR_SAMPLES).itertuples(index=False)
+        ],
+        "price_format": price_format,
+    }
+
+
+def preview_extraction(file_name, provider, provider_config, rows):
+    """
+    Extracts and transforms the first `rows` rows of `file_name` with `provider_config`
+    ({"extract_config", "transform_config"}). Never writes anything.
+    """
+    started = time.perf_counter()
+    extract_config = provider_config["extract_config"]
+    transform_config = provider_config["transform_config"]
+    file_path = os.path.join(get_providers_path(), file_name)
+
+    sample = read_sample(file_path, extract_config, rows)
+    result = {
+        "file": file_name,
+        "proveedor": provider,
+        "columns": [str(column) for column in sample.columns],
+        "dtypes": {str(column): pd.api.types.infer_dtype(sample[column], skipna=True) for column in sample.columns},
+        "rows_read": len(sample),
+        "rows": [],
+        "errors": {},
+    }
+
+    price_format = transform_config.get("price_format", DEFAULT_PRICE_FORMAT)
+    transformed = None
+    try:
+        check_price_format(provider, price_format)
+    except TransformationError as e:
+        result["errors"]["price_format"] = str(e)
+    else:
+        try:
+            transformed = apply_transform_config(sample.copy(), provider, transform_config)
+        except TransformationError as e:
+            result["errors"]["columns"] = str(e)
+
+    if transformed is not None:
+        result["rows"] = [
+            {column: preview_value(value) for column, value in zip(REQUIRED_COLUMNS, values)}
+            for values in transformed[REQUIRED_COLUMNS].itertuples(index=False)
+        ]
+        result["errors"].update(summarize_errors(sample, transform_config["column_mappings"], price_format, transformed))
+
+    result["rows_kept"] = len(result["rows"])
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Vista previa de {file_name}: {result['rows_kept']}/{result['rows_read']} filas en {result['seconds']}s.")
+    return result
@@ -0,0 +1,43 @@
+from django.db.models import Count, F, Q
+from products.models import Provider, ProductPriceHistory
+
+
+def serialize_price_change(change):
+    old_price, new_price = change["old_price"], change["new_price"]
+    return {
+        "item": change["product__item"],
+        "product_name": change["product__product_name"],
+        "old_price": str(old_price),
+        "new_price": str(new_price),
+        "change_pct": round(float((new_price - old_price) / old_price * 100), 2) if old_price else None,
+        "changed_at": change["changed_at"].isoformat(),
+        "job_id": str(change["run__job_id"]) if change["run__job_id"] else None,
+    }
+
+def price_changes_since(since, provider_ids=None, limit=100):
+    """
+    Price changes loaded since `since`, grouped per supplier: totals (changes, increases,
+    decreases) and the `limit` most recent changes.
+    Each supplier's rows are found with a range scan of its (proveedor, changed_at) index;
+    the increase/decrease counts then read old_price and new_price from every matching
+    row, so the cost grows with the changes in the range, not with the table.
+    """
+    providers = Provider.objects.order_by("name")
+    if provider_ids is not None:
+        providers = providers.filter(id__in=provider_ids)
+
+    report = []
+    for provider_id, name in providers.values_list("id", "name"):
+        changes = ProductPriceHistory.objects.filter(proveedor_id=provider_id, changed_at__gte=since)
+        totals = changes.aggregate(
+            changes=Count("id"),
+            increases=Count("id", filter=Q(new_price__gt=F("old_price"))),
+            decreases=Count("id", filter=Q(new_price__lt=F("old_price"))),
+        )
+        if not totals["changes"]:
+            continue
+        recent = changes.order_by("-changed_at", "-id").values(
+            "product__item", "product__product_name", "old_price", "new_price", "changed_at", "run__job_id",
+        )[:limit]
+        report.append({"proveedor": name, **totals, "results": [serialize_price_change(change) for change in recent]})
+    return report
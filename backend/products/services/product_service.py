@@ -0,0 +1,40 @@
+from products.models import Product
+from products.services.search_service import apply_search
+from products.services.provider_service import find_provider_ids
+
+# Values accepted by ?order_by= (optionally prefixed with '-')
+PRODUCT_ORDERINGS = ["product_name", "product_price", "fecha_actualizacion", "item", "proveedor", "id", "search_rank"]
+
+def filter_products(search_query="", proveedor="", order_by=None):
+    """
+    Catalog queryset for the product filters, shared by the product list API and the export.
+    Search goes through the full-text index (ranked by relevance unless another order is given).
+    """
+    queryset = Product.objects.select_related('proveedor')
+    search_query = search_query.strip()
+    proveedor = proveedor.strip()
+
+    if search_query:
+        # Full-text index lookup ranked by relevance; substring scan only if the index is unavailable
+        searched = apply_search(queryset, search_query)
+        if searched is not None:
+            queryset = searched
+            order_by = order_by or 'search_rank'
+        else:
+            queryset = queryset.filter(product_name__istartswith=search_query) | queryset.filter(item__icontains=search_query)
+
+    if proveedor:
+        # Matching names are resolved on the small providers table, products are filtered by id
+        queryset = queryset.filter(proveedor_id__in=find_provider_ids(proveedor))
+
+    if order_by and order_by.lstrip('-') == 'proveedor':
+        order_by = order_by.replace('proveedor', 'proveedor__name')
+
+    return queryset.order_by(order_by or 'product_name', 'id')
+
+def is_valid_ordering(order_by, search_query=""):
+    """search_rank only exists when there is a search"""
+    if not order_by:
+        return True
+    field = order_by.lstrip('-')
+    return field in PRODUCT_ORDERINGS and (field != 'search_rank' or bool(search_query.strip()))
@@ -0,0 +1,81 @@
+"""
+ETL PROGRESS CHANNEL - In-Memory Publish/Subscribe for Job Progress
+
+The ETL stages publish a snapshot of their progress here (stage, provider,
+rows written...) and the SSE endpoint streams it to the browser as soon as it
+changes, so the frontend no longer polls the database every 2 seconds.
+
+TECHNICAL SOLUTION:
+- One snapshot per job, replaced on every publish and tagged with a version
+- Subscribers block on a Condition until the version changes (no busy polling)
+- Publishing never touches the database, so it is safe inside the load
+  transaction and cheap enough to run after every write chunk
+- Finished jobs are kept for a short retention period and then discarded
+
+The channel lives in the process that runs the job (see job_service.py); the
+SSE endpoint falls back to reading ETLStatus for jobs it does not know about.
+"""
+
+import time
+import threading
+
+# Job states after which no more progress is published
+FINAL_STATES = ("finished", "failed", "cancelled")
+FINISHED_RETENTION_SECONDS = 300
+
+
+class ProgressChannel:
+    """Latest progress snapshot per job, with blocking waits for subscribers"""
+
+    def __init__(self, retention_seconds=FINISHED_RETENTION_SECONDS):
+        self._condition = threading.Condition()
+        self._jobs = {}
+        self._retention_seconds = retention_seconds
+
+    def publish(self, job_id, **fields):
+        """Merges `fields` into the job snapshot and wakes up every subscriber"""
+        with self._condition:
+            entry = self._jobs.setdefault(job_id, {"version": 0, "snapshot": {"job_id": job_id}, "finished_at": None})
+            entry["snapshot"].update(fields)
+            entry["version"] += 1
+            if entry["snapshot"].get("state") in FINAL_STATES:
+                entry["finished_at"] = time.monotonic()
+            self._discard_expired()
+            self._condition.notify_all()
+
+    def get(self, job_id):
+        """(version, snapshot) of a job, or None if this process never saw it"""
+        with self._condition:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            return entry["version"], dict(entry["snapshot"])
+
+    def wait(self, job_id, version, timeout):
+        """
+        Blocks until the job snapshot is newer than `version` or `timeout` expires.
+        Returns (version, snapshot), or None if the job is unknown to this process.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                entry = self._jobs.get(job_id)
+                if entry is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if entry["version"] != version or remaining <= 0:
+                    return entry["version"], dict(entry["snapshot"])
+                self._condition.wait(remaining)
+
+    def _discard_expired(self):
+        """Drops finished jobs past the retention period. Must hold the condition."""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, entry in self._jobs.items()
+            if entry["finished_at"] is not None and now - entry["finished_at"] > self._retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+progress_channel = ProgressChannel()
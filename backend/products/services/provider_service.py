@@ -0,0 +1,98 @@
+import logging
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from products.models import Product, Provider
+from products.services.cache_service import bump_catalog_generation
+
+logger = logging.getLogger(__name__)
+
+def register_providers(sources):
+    """
+    Creates or updates the Provider rows of the suppliers being loaded.
+    `sources` maps supplier name -> {"source_file": ..., "source_modified_at": ...}.
+    Returns {name: provider_id}.
+    """
+    if not sources:
+        return {}
+
+    now = timezone.now()
+    Provider.objects.bulk_create(
+        [
+            Provider(
+                name=name,
+                source_file=source.get("source_file") or "",
+                source_modified_at=source.get("source_modified_at"),
+                last_extracted_at=now,
+            )
+            for name, source in sources.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["source_file", "source_modified_at", "last_extracted_at", "refreshed_at"],
+    )
+    return dict(Provider.objects.filter(name__in=sources).values_list("name", "id"))
+
+def refresh_providers(provider_ids):
+    """
+    Recomputes the materialized product_count/last_update of the given suppliers.
+    Cost is proportional to the products of these suppliers, never the whole catalog.
+    """
+    provider_ids = set(provider_ids)
+    if not provider_ids:
+        return
+
+    stats = {
+        row["proveedor_id"]: row
+        for row in Product.objects.filter(proveedor_id__in=provider_ids)
+        .values("proveedor_id")
+        .annotate(product_count=Count("id"), last_update=Max("fecha_actualizacion"))
+    }
+    for provider_id in provider_ids:
+        row = stats.get(provider_id, {})
+        Provider.objects.filter(id=provider_id).update(
+            product_count=row.get("product_count", 0),
+            last_update=row.get("last_update"),
+            refreshed_at=timezone.now(),
+        )
+    logger.info(f"Lista de proveedores actualizada: {len(provider_ids)} proveedores.")
+
+def find_provider_ids(name_filter):
+    """Ids of the suppliers whose name contains `name_filter`, resolved on the small providers table"""
+    return list(Provider.objects.filter(name__icontains=name_filter).values_list("id", flat=True))
+
+def delete_provider(name):
+    """
+    Deletes a supplier and, by cascade, its products.
+    Returns the number of deleted products.
+    """
+    with transaction.atomic():
+        _, deleted = Provider.objects.filter(name=name).delete()
+        if deleted:
+            bump_catalog_generation()
+    return deleted.get(Product._meta.label, 0)
+
+def provider_exists(name):
+    return Provider.objects.filter(name=name).exists()
+
+def rename_provider(old_name, new_name):
+    """
+    Renames a supplier: a single-row update, its products follow through the foreign key.
+    Returns False when the new name already belongs to another supplier.
+    """
+    if old_name == new_name:
+        return True
+    if Provider.objects.filter(name=new_name).exists():
+        return False
+    with transaction.atomic():
+        if Provider.objects.filter(name=old_name).update(name=new_name):
+            bump_catalog_generation()
+    return True
+
+def list_providers():
+    """Supplier list for the product filters, read from the materialized table"""
+    return list(
+        Provider.objects.filter(product_count__gt=0)
+        .order_by("name")
+        .values("name", "product_count", "last_update")
+    )
@@ -0,0 +1,233 @@
+"""
+PRODUCT SEARCH SERVICE - SQLite FTS5 Full-Text Index
+
+The catalog search box fires one request per keystroke. Substring filters
+(`LIKE '%...%'`) scan the whole products table on every request, so search
+latency grew linearly with the catalog size.
+
+TECHNICAL SOLUTION:
+- FTS5 index over item, product_name and the supplier name (migrations 0004, 0011)
+- External content: the text lives in products_product/products_provider, read
+  through the products_product_search view; the index stores only tokens
+- unicode61 tokenizer with diacritics removal: case and accent insensitive
+  ("tornillo" finds "TORNILLO", "cano" finds "CAÑO")
+- Prefix indexes so each keystroke is an index lookup, ranked with bm25
+- Kept in sync by triggers, so every ETL load updates only the rows it changes;
+  a shadow load swap (products/etl/shadow_load.py) applies the same delta in SQL
+
+SQLite drops the triggers whenever a migration rebuilds products_product, so
+ensure_search_index() runs after every migrate and reinstalls them if needed.
+"""
+
+import re
+import logging
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "products_product_fts"
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SEARCH_TRIGGERS = [
+    "products_product_fts_ai",
+    "products_product_fts_ad",
+    "products_product_fts_au",
+    "products_provider_fts_au",
+]
+
+# remove_diacritics 2 folds accents (á -> a, ñ -> n) and unicode61 folds case
+CREATE_TABLE_SQL = [
+    """
+    CREATE VIEW IF NOT EXISTS products_product_search AS
+    SELECT p.id AS id, p.item AS item, p.product_name AS product_name, v.name AS proveedor
+    FROM products_product p JOIN products_provider v ON v.id = p.proveedor_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts USING fts5(
+        item, product_name, proveedor,
+        content='products_product_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+]
+
+CREATE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ai AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_ad AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+    END
+    """,
+    # Price-only upserts (the common ETL case) do not touch the index
+    """
+    CREATE TRIGGER IF NOT EXISTS products_product_fts_au AFTER UPDATE OF item, product_name, proveedor_id ON products_product
+    WHEN old.item IS NOT new.item OR old.product_name IS NOT new.product_name OR old.proveedor_id IS NOT new.proveedor_id
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        VALUES ('delete', old.id, old.item, old.product_name, (SELECT name FROM products_provider WHERE id = old.proveedor_id));
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        VALUES (new.id, new.item, new.product_name, (SELECT name FROM products_provider WHERE id = new.proveedor_id));
+    END
+    """,
+    # A supplier rename re-tokenizes only that supplier's rows
+    """
+    CREATE TRIGGER IF NOT EXISTS products_provider_fts_au AFTER UPDATE OF name ON products_provider
+    WHEN old.name IS NOT new.name
+    BEGIN
+        INSERT INTO products_product_fts(products_product_fts, rowid, item, product_name, proveedor)
+        SELECT 'delete', id, item, product_name, old.name FROM products_product WHERE proveedor_id = new.id;
+        INSERT INTO products_product_fts(rowid, item, product_name, proveedor)
+        SELECT id, item, product_name, new.name FROM products_product WHERE proveedor_id = new.id;
+    END
+    """,
+]
+
+# Triggers on products_product, reinstalled on the new table by a shadow load swap
+PRODUCT_TRIGGERS = SEARCH_TRIGGERS[:3]
+PRODUCT_TRIGGERS_SQL = CREATE_TRIGGERS_SQL[:3]
+
+REBUILD_SQL = [
+    "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+    # Matches on item weigh more than on the name, and both more than on the supplier
+    "INSERT INTO products_product_fts(products_product_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+]
+
+_index_available = None
+
+
+def search_index_available():
+    """
+    Returns True when the FTS5 index exists (SQLite only); the result is cached per process.
+    """
+    global _index_available
+    if _index_available is None:
+        _index_available = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+        if not _index_available:
+            logger.warning("Índice de búsqueda FTS5 no disponible; se usará la búsqueda por coincidencia parcial.")
+    return _index_available
+
+
+def build_match_query(search_query):
+    """
+    Translates free text into an FTS5 MATCH expression.
+    Each whitespace-separated term becomes a prefix phrase and all of them must match:
+    "llave 3/8" -> "llave"* "3 8"*
+    """
+    phrases = []
+    for term in search_query.split():
+        tokens = TOKEN_PATTERN.findall(term)
+        if tokens:
+            phrases.append('"{}"*'.format(" ".join(tokens)))
+    return " ".join(phrases) or None
+
+
+def apply_search(queryset, search_query):
+    """
+    Restricts a Product queryset to the rows matching `search_query` in the FTS5 index
+    and annotates them with `search_rank` (lower is better).
+    Returns None when the index cannot serve the query so callers can fall back.
+    """
+    if not search_index_available():
+        return None
+
+    match = build_match_query(search_query)
+    if match is None:
+        return None
+
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = products_product.id", f"{FTS_TABLE} MATCH %s"],
+        params=[match],
+        select={"search_rank": f"{FTS_TABLE}.rank"},
+    )
+
+
+def ensure_search_index(using="default"):
+    """
+    Creates the FTS5 index and reinstalls any missing trigger, rebuilding the index
+    when triggers were missing (rows changed while they were gone are re-indexed).
+    Returns True when something had to be repaired.
+    """
+    target = connections[using]
+    if target.vendor != "sqlite":
+        return False
+
+    with target.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger', 'view')")
+        existing = {row[0] for row in cursor.fetchall()}
+        if not {"products_product", "products_provider"} <= existing:
+            return False
+        cursor.execute("SELECT name FROM pragma_table_info('products_product')")
+        if "proveedor_id" not in {row[0] for row in cursor.fetchall()}:
+            # Database still at the pre-Provider schema (before migration 0011)
+            return False
+        missing = [name for name in [FTS_TABLE, "products_product_search", *SEARCH_TRIGGERS] if name not in existing]
+        if not missing:
+            return False
+
+        for statement in CREATE_TABLE_SQL + CREATE_TRIGGERS_SQL + REBUILD_SQL:
+            cursor.execute(statement)
+
+    global _index_available
+    _index_available = None
+    logger.warning(f"Índice de búsqueda reparado; faltaban: {', '.join(missing)}.")
+    return True
+
+
+def rebuild_search_index():
+    """Rebuilds the whole FTS5 index from the products table"""
+    if not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+    logger.info("Índice de búsqueda reconstruido.")
+
+
+def swap_search_index(cursor, old_table, provider_ids):
+    """
+    Search index side of a shadow load swap, run inside the swap transaction once the
+    new table holds the products_product name and the previous one is `old_table`.
+    The product triggers followed the previous table and are reinstalled on the new one;
+    only rows of the loaded suppliers whose indexed text changed are re-tokenized.
+    """
+    if not search_index_available():
+        return
+    for name in PRODUCT_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for statement in PRODUCT_TRIGGERS_SQL:
+        cursor.execute(statement)
+    if not provider_ids:
+        return
+
+    placeholders = ", ".join(["%s"] * len(provider_ids))
+    changed = "n.item IS NOT o.item OR n.product_name IS NOT o.product_name OR n.proveedor_id IS NOT o.proveedor_id"
+    cursor.execute(
+        f"""
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, item, product_name, proveedor)
+        SELECT 'delete', o.id, o.item, o.product_name, v.name
+        FROM "{old_table}" o JOIN products_provider v ON v.id = o.proveedor_id
+        LEFT JOIN products_product n ON n.id = o.id
+        WHERE o.proveedor_id IN ({placeholders}) AND (n.id IS NULL OR {changed})
+        """,
+        list(provider_ids),
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {FTS_TABLE}(rowid, item, product_name, proveedor)
+        SELECT n.id, n.item, n.product_name, v.name
+        FROM products_product n JOIN products_provider v ON v.id = n.proveedor_id
+        LEFT JOIN "{old_table}" o ON o.id = n.id
+        WHERE n.proveedor_id IN ({placeholders}) AND (o.id IS NULL OR {changed})
+        """,
+        list(provider_ids),
+    )
@@ -0,0 +1,284 @@
+"""
+SUPPLIER FILE UPLOADS - Resumable, checksummed chunked uploads
+
+A supplier price list used to arrive in a single multipart request written
+straight into providers/: a dropped connection meant starting over, and an ETL
+running at the same time could read a half-written workbook.
+
+TECHNICAL SOLUTION:
+- init: validates the file name and size and opens an upload session in the
+  staging area (providers/.staging/<upload_id>.part + .json)
+- chunks: PUT at an explicit offset, appended to the .part file; the offset the
+  server holds is the resume point after a dropped connection
+- finalize: verifies size and the client's sha256 (required), then publishes
+  the file with os.replace, an atomic rename inside the same filesystem - the
+  ETL sees the old file or the complete new one, never a partial write
+- The verified hash is recorded in SupplierFile; the ETL reuses it as the
+  extract cache key (products/etl/cache.py) instead of hashing the file again
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import logging
+from django.conf import settings
+from django.db import transaction
+from products.models import SupplierFile
+from products.etl.cache import file_content_hash
+from products.etl.readers import SUPPORTED_EXTENSIONS
+from products.utils.file_utils import get_providers_path, get_staging_path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = SUPPORTED_EXTENSIONS
+COPY_BLOCK_SIZE = 1024 * 1024
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadError(Exception):
+    """Invalid upload request; `status` is the HTTP status returned by the API"""
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def validate_file_name(name):
+    """Returns the file name if it is a plain supplier workbook name, raises UploadError otherwise"""
+    name = (name or "").strip()
+    if not name or name != os.path.basename(name) or name.startswith(".") or "\\" in name:
+        raise UploadError("Nombre de archivo inválido.")
+    if not name.lower().endswith(ALLOWED_EXTENSIONS):
+        raise UploadError(f"Extensión no soportada. Valores permitidos: {', '.join(ALLOWED_EXTENSIONS)}.")
+    return name
+
+
+def session_paths(upload_id):
+    staging_path = get_staging_path()
+    return os.path.join(staging_path, f"{upload_id}.part"), os.path.join(staging_path, f"{upload_id}.json")
+
+
+def load_session(upload_id):
+    """Metadata of an open upload plus its current offset; raises UploadError(404) when unknown"""
+    part_path, meta_path = session_paths(upload_id)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            session = json.load(f)
+        session["offset"] = os.path.getsize(part_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        raise UploadError("Carga no encontrada o expirada.", status=404)
+    return session
+
+
+def purge_stale_uploads(max_age=None):
+    """Removes upload sessions with no chunk received for `max_age` seconds. Returns the sessions removed."""
+    max_age = settings.UPLOAD_STAGING_MAX_AGE if max_age is None else max_age
+    staging_path = get_staging_path()
+    if not os.path.isdir(staging_path):
+        return 0
+
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(staging_path):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += entry.name.endswith(".json")
+        except FileNotFoundError:
+            continue
+    if removed:
+        logger.info(f"Cargas: {removed} cargas incompletas eliminadas del área temporal.")
+    return removed
+
+
+def init_upload(name, size):
+    """Opens an upload session for `name` of `size` bytes. Returns the session with its upload_id."""
+    name = validate_file_name(name)
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise UploadError("El tamaño del archivo debe ser un entero positivo.")
+    if size > settings.UPLOAD_MAX_BYTES:
+        raise UploadError(f"El archivo supera el tamaño máximo permitido ({settings.UPLOAD_MAX_BYTES} bytes).", status=413)
+
+    purge_stale_uploads()
+    os.makedirs(get_staging_path(), exist_ok=True)
+
+    upload_id = str(uuid.uuid4())
+    part_path, meta_path = session_paths(upload_id)
+    session = {"upload_id": upload_id, "name": name, "size": size, "created_at": time.time()}
+    open(part_path, "wb").close()
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(session, f)
+
+    logger.info(f"Carga {upload_id} iniciada: {name} ({size} bytes).")
+    return {**session, "offset": 0, "chunk_size": settings.UPLOAD_CHUNK_SIZE}
+
+
+def lock_part_file(part):
+    """
+    Exclusive lock on an open .part file, released when it is closed. A concurrent
+    request already holding it gets 409 with the current offset, like a stale offset.
+    """
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(part.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise UploadError(
+            "Otra solicitud está escribiendo en esta carga.", status=409, offset=os.fstat(part.fileno()).st_size,
+        )
+
+
+def write_chunk(upload_id, offset, stream, length):
+    """
+    Appends `length` bytes read from `stream` at `offset` of the upload. Returns the new offset.
+
+    The offset must be the number of bytes already received; any other value is
+    answered with 409 and the current offset, so the client resumes from there.
+    The offset is checked and the bytes appended under an exclusive lock on the
+    .part file, so two requests for the same offset never both append.
+    The bytes received before a dropped connection are kept.
+    """
+    session = load_session(upload_id)
+    if length <= 0:
+        raise UploadError("El fragmento está vacío.")
+    if length > settings.UPLOAD_CHUNK_MAX_BYTES:
+        raise UploadError(f"El fragmento supera el tamaño máximo permitido ({settings.UPLOAD_CHUNK_MAX_BYTES} bytes).", status=413)
+
+    part_path, _ = session_paths(upload_id)
+    remaining = length
+    with open(part_path, "ab") as part:
+        lock_part_file(part)
+        received = os.fstat(part.fileno()).st_size
+        if offset != received:
+            raise UploadError("El offset no coincide con los datos recibidos.", status=409, offset=received)
+        if offset + length > session["size"]:
+            raise UploadError("El fragmento excede el tamaño declarado del archivo.", status=413)
+        while remaining:
+            block = stream.read(min(COPY_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            part.write(block)
+            remaining -= len(block)
+    return offset + length - remaining
+
+
+def abort_upload(upload_id):
+    """Discards an upload session and its received bytes"""
+    load_session(upload_id)
+    for path in session_paths(upload_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    logger.info(f"Carga {upload_id} cancelada.")
+
+
+def finalize_upload(upload_id, sha256):
+    """
+    Verifies the received file and publishes it in providers/.
+    `sha256` (hex) is the client's checksum of the whole file and must match.
+    Returns {"name", "size", "sha256", "unchanged"}.
+    """
+    session = load_session(upload_id)
+    part_path, meta_path = session_paths(upload_id)
+    # Held until published, so no chunk can be appended while the file is hashed
+    with open(part_path, "rb") as part:
+        lock_part_file(part)
+        received = os.fstat(part.fileno()).st_size
+        if received != session["size"]:
+            raise UploadError(
+                f"La carga está incompleta: {received} de {session['size']} bytes recibidos.",
+                status=409, offset=received,
+            )
+
+        digest = file_content_hash(part_path)
+        if sha256.lower() != digest:
+            abort_upload(upload_id)
+            raise UploadError("La suma de verificación no coincide; el archivo fue descartado.", status=422)
+
+        result = publish_file(part_path, session["name"], digest)
+    os.remove(meta_path)
+    return result
+
+
+def publish_file(staged_path, name, sha256):
+    """
+    Moves a verified staged file into providers/ (atomic replace) and records its hash.
+    `unchanged` tells whether the previous version of the file had the same content.
+    """
+    target_path = os.path.join(get_providers_path(), name)
+    previous = SupplierFile.objects.filter(name=name).values_list("sha256", flat=True).first()
+    unchanged = previous == sha256 and os.path.exists(target_path)
+
+    os.replace(staged_path, target_path)
+    stat = os.stat(target_path)
+    SupplierFile.objects.update_or_create(
+        name=name,
+        defaults={"sha256": sha256, "size": stat.st_size, "modified_ns": stat.st_mtime_ns},
+    )
+
+    logger.info(f"Archivo {name} publicado ({stat.st_size} bytes, sha256 {sha256[:12]}{', sin cambios' if unchanged else ''}).")
+    return {"name": name, "size": stat.st_size, "sha256": sha256, "unchanged": unchanged}
+
+
+def store_uploaded_file(uploaded_file):
+    """
+    Single-request upload (multipart): written to the staging area, hashed while
+    writing and published like a finalized chunked upload.
+    """
+    name = validate_file_name(uploaded_file.name)
+    os.makedirs(get_staging_path(), exist_ok=True)
+    staged_path, _ = session_paths(uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    try:
+        with open(staged_path, "wb") as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+                digest.update(chunk)
+        return publish_file(staged_path, name, digest.hexdigest())
+    finally:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+
+
+def is_valid_checksum(value):
+    return isinstance(value, str) and SHA256_PATTERN.match(value.lower()) is not None
+
+
+def rename_supplier_file(old_name, new_name):
+    """Keeps the recorded hash of a renamed supplier file"""
+    with transaction.atomic():
+        SupplierFile.objects.filter(name=new_name).delete()
+        SupplierFile.objects.filter(name=old_name).update(name=new_name)
+
+
+def forget_supplier_file(name):
+    SupplierFile.objects.filter(name=name).delete()
+
+
+def recorded_file_hashes(files):
+    """
+    {file name: sha256} of the given supplier files whose recorded hash is still valid,
+    i.e. the size and mtime on disk are the ones recorded when the file was published.
+    """
+    providers_path = get_providers_path()
+    hashes = {}
+    for name, sha256, size, modified_ns in SupplierFile.objects.filter(name__in=files).values_list(
+        "name", "sha256", "size", "modified_ns"
+    ):
+        try:
+            stat = os.stat(os.path.join(providers_path, name))
+        except FileNotFoundError:
+            continue
+        if stat.st_size == size and stat.st_mtime_ns == modified_ns:
+            hashes[name] = sha256
+    return hashes
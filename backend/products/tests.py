@@ -1,3 +1,992 @@
-from django.test import TestCase
+import os
+import csv
+import json
+import shutil
+import time
+import io
+import fcntl
+import datetime
+import hashlib
+import tempfile
+import pandas as pd
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, TransactionTestCase
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.renderers import JSONRenderer
+from products.models import ETLStatus, Product, ProductPriceHistory, Provider
+from products.api.renderers import FastJSONRenderer
+from products.etl.cache import get_cached_frame, store_cached_frame
+from products.etl.etl_exceptions import ETLCancelled, LoadError
+from products.etl.extract import determine_provider, extract_creation_date, header_columns
+from products.etl.load import load_to_database
+from products.etl.readers import read_table
+from products.etl.transform import apply_transform_config, parse_prices
+from products.etl.shadow_load import OLD_TABLE, SHADOW_TABLE, load_shadow
+from products.management.commands.benchmark_concurrency import run_with_readers
+from products.serializers import PRODUCT_ROW_FIELDS, ProductSerializer, serialize_product_rows
+from products.services.cache_service import catalog_generation, clear_response_cache
+from products.services.config_service import get_provider_matcher, invalidate_config_cache, load_config, save_config
+from products.services.etl_service import publish_heartbeat, run_etl_service, run_provider_pipelines
+from products.services.job_service import fail_stale_jobs, submit_etl_job
+from products.services.preview_service import preview_extraction
+from products.views.etl_views import job_progress_frames
+from products.services.provider_service import delete_provider, list_providers
+from products.services.upload_service import UploadError, init_upload, session_paths, write_chunk
+from products.services.product_service import filter_products
+from products.services.search_service import (
+    FTS_TABLE, SEARCH_TRIGGERS, apply_search, build_match_query, ensure_search_index, rebuild_search_index,
+)
 
-# Create your tests here.
+CSV_CONFIG = {
+    "extract_config": {"skiprows": 0, "usecols": None},
+    "transform_config": {
+        "column_mappings": {"Codigo": "item", "Descripcion": "product_name", "Precio": "product_price"},
+        "price_format": "en_US",
+    },
+}
+
+
+def catalog_frames(provider, items, price=100):
+    """Transformed (df, metadata) of one supplier, as the load stage receives it"""
+    df = pd.DataFrame({
+        "item": items,
+        "product_name": [f"PRODUCTO {item}" for item in items],
+        "product_price": [float(price)] * len(items),
+    })
+    return [(df, {"proveedor": provider, "fecha_actualizacion": timezone.now(), "file": f"{provider}_lista.csv"})]
+
+
+class CatalogTransactionTestCase(TransactionTestCase):
+    """
+    TransactionTestCase whose tests start with a consistent search index: the flush between
+    tests empties the tables in no particular order, and products deleted after their supplier
+    leave stale entries behind
+    """
+
+    def setUp(self):
+        super().setUp()
+        rebuild_search_index()
+
+
+class CatalogFilesMixin:
+    """Temporary BASE_DIR with a providers/ directory and a config_proveedores.json for CSV price lists"""
+
+    def setUp(self):
+        super().setUp()
+        self.base_dir = tempfile.mkdtemp(prefix="products-tests-")
+        os.makedirs(os.path.join(self.base_dir, "providers"))
+        os.makedirs(os.path.join(self.base_dir, "config"))
+        settings_override = override_settings(BASE_DIR=self.base_dir, ETL_CACHE_ENABLED=False, ETL_WORKERS=1)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.base_dir, ignore_errors=True)
+        self.addCleanup(invalidate_config_cache)
+        invalidate_config_cache()
+
+    def write_config(self, *providers):
+        with open(os.path.join(self.base_dir, "config", "config_proveedores.json"), "w", encoding="utf-8") as f:
+            json.dump({provider: CSV_CONFIG for provider in providers}, f)
+        invalidate_config_cache()
+
+    def write_price_list(self, file_name, items, price=100):
+        """CSV price list with one row per item code"""
+        with open(os.path.join(self.base_dir, "providers", file_name), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Codigo", "Descripcion", "Precio"])
+            for item in items:
+                writer.writerow([item, f"PRODUCTO {item}", f"{price:.2f}"])
+
+    def write_broken_workbook(self, file_name):
+        """File detected as .xlsx that cannot be read, like a truncated upload"""
+        with open(os.path.join(self.base_dir, "providers", file_name), "wb") as f:
+            f.write(b"PK\x03\x04truncated")
+
+    def remove_file(self, file_name):
+        os.remove(os.path.join(self.base_dir, "providers", file_name))
+
+    def items(self, provider):
+        return set(Product.objects.filter(proveedor__name=provider).values_list("item", flat=True))
+
+
+class SweepTests(CatalogFilesMixin, TestCase):
+    """Mark-and-sweep of the products missing from a supplier's files"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_config("ferreteria")
+        self.write_price_list("ferreteria_productos.csv", ["P1", "P2", "P3"])
+        self.write_price_list("ferreteria_ofertas.csv", ["O1", "O2"])
+        run_etl_service()
+
+    def test_products_missing_from_the_files_are_swept(self):
+        self.write_price_list("ferreteria_productos.csv", ["P1", "P2"])
+        result = run_etl_service()
+        self.assertEqual(self.items("ferreteria"), {"P1", "P2", "O1", "O2"})
+        self.assertEqual(result["load"]["swept"], 1)
+
+    def check_failed_file_keeps_products(self):
+        self.remove_file("ferreteria_ofertas.csv")
+        self.write_broken_workbook("ferreteria_ofertas.xlsx")
+        self.write_price_list("ferreteria_productos.csv", ["P1", "P2"])
+        result = run_etl_service()
+        # The other file of the supplier was loaded, but nothing is swept while one of its files failed
+        self.assertEqual(self.items("ferreteria"), {"P1", "P2", "P3", "O1", "O2"})
+        self.assertEqual(result["load"]["swept"], 0)
+
+    def test_failed_file_keeps_supplier_products(self):
+        self.check_failed_file_keeps_products()
+
+    @override_settings(ETL_STREAMING=True)
+    def test_failed_file_keeps_supplier_products_streaming(self):
+        self.check_failed_file_keeps_products()
+
+
+class ProviderPipelineTests(CatalogFilesMixin, TestCase):
+    """Extract + transform of the supplier files, before the load"""
+
+    def test_unexpected_transform_error_is_reported(self):
+        self.write_config("ferreteria")
+        self.write_price_list("ferreteria_productos.csv", ["P1"])
+        with mock.patch("products.services.etl_service.transform_provider_data", side_effect=ValueError("precio")):
+            [(data, report)] = run_provider_pipelines(["ferreteria_productos.csv"], load_config(), workers=1)
+        self.assertIsNone(data)
+        self.assertEqual(report["error_stage"], "transform")
+        self.assertEqual(report["error"], "precio")
+
+    def test_multiline_cells_fall_back_to_pandas(self):
+        # Past the Arrow reader's 1 MB blocks a quoted line break lands on a block boundary
+        path = os.path.join(self.base_dir, "providers", "ferreteria_productos.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Codigo", "Descripcion", "Precio"])
+            for index in range(60000):
+                writer.writerow([f"P{index}", f"TORNILLO {index}\nLARGO", "10.50"])
+        df = read_table(path, CSV_CONFIG["extract_config"], engine="pyarrow")
+        self.assertEqual(len(df), 60000)
+        self.assertEqual(df["Descripcion"].iloc[-1], "TORNILLO 59999\nLARGO")
+
+
+class ConfigCacheTests(CatalogFilesMixin, TestCase):
+    """Provider configuration cached per process, revalidated by file signature, written atomically"""
+
+    def config_path(self):
+        return os.path.join(self.base_dir, "config", "config_proveedores.json")
+
+    def test_unchanged_file_is_parsed_once(self):
+        self.write_config("bulonera")
+        with mock.patch("products.services.config_service.json.load", wraps=json.load) as parse:
+            load_config()
+            load_config()
+            get_provider_matcher()
+        self.assertEqual(parse.call_count, 1)
+
+    def test_file_changed_on_disk_is_reloaded(self):
+        self.write_config("bulonera")
+        self.assertEqual(set(load_config()), {"bulonera"})
+        # Written by another process: no invalidation in this one
+        with open(self.config_path(), "w", encoding="utf-8") as f:
+            json.dump({"bulonera": CSV_CONFIG, "ferreteria": CSV_CONFIG}, f)
+        self.assertEqual(set(load_config()), {"bulonera", "ferreteria"})
+
+    def test_callers_get_their_own_copy(self):
+        self.write_config("bulonera")
+        load_config()["bulonera"]["transform_config"]["price_format"] = "es_AR"
+        self.assertEqual(load_config()["bulonera"]["transform_config"]["price_format"], "en_US")
+
+    def test_matcher_prefers_the_longest_name(self):
+        self.write_config("ferre", "ferreteria")
+        self.assertEqual(get_provider_matcher().search("ferreteria_lista_2026").group(), "ferreteria")
+        self.assertEqual(determine_provider("Ferreteria_Lista.xlsx"), "ferreteria")
+
+    def test_save_is_atomic(self):
+        self.write_config("bulonera")
+        with open(self.config_path(), encoding="utf-8") as f:
+            before = f.read()
+
+        with self.assertRaises(TypeError):
+            save_config({"ferreteria": {"extract_config": object()}})
+
+        # A failed write leaves the previous file and no temporary file behind
+        with open(self.config_path(), encoding="utf-8") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(os.path.join(self.base_dir, "config")), ["config_proveedores.json"])
+
+        save_config({"ferreteria": CSV_CONFIG})
+        self.assertEqual(set(load_config()), {"ferreteria"})
+        self.assertEqual(os.listdir(os.path.join(self.base_dir, "config")), ["config_proveedores.json"])
+
+
+class HeaderColumnsTests(TestCase):
+    """Streamed header rows are named like pandas.read_excel names them"""
+
+    def test_repeated_and_empty_headers(self):
+        header = ["Precio", "Precio", "Precio.1", None, "Codigo", None]
+        self.assertEqual(
+            header_columns(header),
+            ["Precio", "Precio.2", "Precio.1", "Unnamed: 3", "Codigo", "Unnamed: 5"],
+        )
+
+
+class CreationDateTests(TestCase):
+    """Update date of a supplier file, from its file system metadata"""
+
+    def test_filesystem_without_birth_time_uses_modification_time(self):
+        modified = datetime.datetime(2026, 3, 2, 10, 30).timestamp()
+        # os.stat() on Linux: st_birthtime is not part of the result
+        stat = mock.Mock(spec=["st_mtime"], st_mtime=modified)
+        with mock.patch("products.etl.extract.os.stat", return_value=stat):
+            creation_date = extract_creation_date("lista.xlsx")
+        self.assertEqual(creation_date.replace(tzinfo=None), datetime.datetime(2026, 3, 2, 10, 30))
+        self.assertEqual(creation_date.tzinfo.zone, "America/Argentina/Buenos_Aires")
+
+    def test_birth_time_is_preferred(self):
+        born = datetime.datetime(2026, 1, 5, 8, 0).timestamp()
+        stat = mock.Mock(spec=["st_birthtime", "st_mtime"], st_birthtime=born, st_mtime=born + 86400)
+        with mock.patch("products.etl.extract.os.stat", return_value=stat):
+            creation_date = extract_creation_date("lista.xlsx")
+        self.assertEqual(creation_date.replace(tzinfo=None), datetime.datetime(2026, 1, 5, 8, 0))
+
+
+class ExtractCacheTests(TestCase):
+    """Parsed tables cached on disk as Parquet"""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp(prefix="products-cache-")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(ETL_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_mixed_cells_round_trip(self):
+        # Sheets without a header row get the first row's values as column names
+        df = pd.DataFrame({
+            "Codigo": pd.Series(["A1", "A2", "A3", "A4"], dtype="str"),
+            10.74: [12.5, "$ 1.234,5", None, float("nan")],
+            2: [1, 2, 3, 4],
+            "Vigencia": [datetime.datetime(2026, 1, 2), datetime.date(2026, 3, 4), datetime.time(5, 6), True],
+        })
+        store_cached_frame("mixed", df)
+        cached = get_cached_frame("mixed")
+        self.assertEqual(list(cached.columns), list(df.columns))
+        self.assertEqual(list(cached.dtypes), list(df.dtypes))
+        for position in range(df.shape[1]):
+            for expected, value in zip(df.iloc[:, position], cached.iloc[:, position]):
+                self.assertIs(type(value), type(expected))
+                if expected == expected:
+                    self.assertEqual(value, expected)
+
+    def test_miss(self):
+        self.assertIsNone(get_cached_frame("missing"))
+
+
+class ChunkedUploadTests(CatalogFilesMixin, TestCase):
+    """Resumable uploads into the staging area"""
+
+    def test_concurrent_chunk_at_the_same_offset_is_refused(self):
+        upload = init_upload("ferreteria_productos.csv", 8)
+        part_path, _ = session_paths(upload["upload_id"])
+        with open(part_path, "ab") as part:
+            # Another request is appending the same chunk
+            fcntl.flock(part.fileno(), fcntl.LOCK_EX)
+            with self.assertRaises(UploadError) as raised:
+                write_chunk(upload["upload_id"], 0, io.BytesIO(b"abcd"), 4)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(raised.exception.details, {"offset": 0})
+        self.assertEqual(write_chunk(upload["upload_id"], 0, io.BytesIO(b"abcd"), 4), 4)
+        with self.assertRaises(UploadError):
+            write_chunk(upload["upload_id"], 0, io.BytesIO(b"abcd"), 4)
+        self.assertEqual(os.path.getsize(part_path), 4)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def test_finalize_requires_the_checksum(self):
+        content = b"Codigo,Descripcion,Precio\n"
+        upload = init_upload("ferreteria_productos.csv", len(content))
+        write_chunk(upload["upload_id"], 0, io.BytesIO(content), len(content))
+        url = f"/files/uploads/{upload['upload_id']}/finalize/"
+
+        response = self.client.post(url, {}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(os.path.exists(os.path.join(self.base_dir, "providers", "ferreteria_productos.csv")))
+
+        response = self.client.post(url, {"sha256": hashlib.sha256(content).hexdigest()}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, "providers", "ferreteria_productos.csv")))
+
+
+class PriceParsingTests(TestCase):
+    """Vectorized, locale-aware price parsing of the transform stage"""
+
+    def test_es_ar_prices(self):
+        prices = pd.Series(["$ 1.234,56", "$1.000", "99,9", " 12,50 "])
+        self.assertEqual(parse_prices(prices, "es_AR").tolist(), [1234.56, 1000.0, 99.9, 12.5])
+
+    def test_en_us_prices(self):
+        prices = pd.Series(["$1,234.56", "$ 1,000", "99.9", "12.50 "])
+        self.assertEqual(parse_prices(prices, "en_US").tolist(), [1234.56, 1000.0, 99.9, 12.5])
+
+    def test_numeric_cells_are_kept(self):
+        prices = pd.Series([1500, 12.5, "$ 2.000,00"], dtype=object)
+        self.assertEqual(parse_prices(prices, "es_AR").tolist(), [1500.0, 12.5, 2000.0])
+
+    def test_non_finite_values_are_rejected(self):
+        for prices in (pd.Series(["10", "inf", "nan", "-Infinity", "1e999"]), pd.Series([10.0, float("inf"), float("nan")])):
+            parsed = parse_prices(prices, "en_US")
+            self.assertEqual(parsed.iloc[0], 10.0)
+            self.assertTrue(parsed.iloc[1:].isna().all(), prices.tolist())
+
+    def test_unparseable_rows_are_flagged_and_dropped(self):
+        df = pd.DataFrame({
+            "Codigo": ["P1", "P2", "P3", "P4"],
+            "Descripcion": ["TORNILLO", "TUERCA", "ARANDELA", "BULON"],
+            "Precio": ["$ 1.234,56", "consultar", "inf", "$ 10,00"],
+        })
+        transform_config = {**CSV_CONFIG["transform_config"], "price_format": "es_AR"}
+        transformed = apply_transform_config(df, "bulonera", transform_config)
+        self.assertEqual(transformed.attrs["invalid_price_rows"], 2)
+        self.assertEqual(transformed["item"].tolist(), ["P1", "P4"])
+        self.assertEqual(transformed["product_price"].tolist(), [1234.56, 10.0])
+
+
+class PreviewTests(CatalogFilesMixin, TestCase):
+    """Extraction preview of a candidate configuration"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_price_list("ferreteria_productos.csv", ["P1", "P2"])
+
+    def preview(self, transform_config):
+        provider_config = {"extract_config": CSV_CONFIG["extract_config"], "transform_config": transform_config}
+        return preview_extraction("ferreteria_productos.csv", "ferreteria", provider_config, 20)
+
+    def test_invalid_price_format_is_reported_under_its_own_key(self):
+        result = self.preview({**CSV_CONFIG["transform_config"], "price_format": "xx_XX"})
+        self.assertIn("xx_XX", result["errors"]["price_format"])
+        self.assertNotIn("columns", result["errors"])
+        self.assertEqual(result["rows"], [])
+
+    def test_missing_columns_are_reported_under_columns(self):
+        column_mappings = {"Codigo": "item", "Nombre": "product_name", "Precio": "product_price"}
+        result = self.preview({"column_mappings": column_mappings, "price_format": "en_US"})
+        self.assertIn("Nombre", result["errors"]["columns"])
+        self.assertEqual(result["rows_kept"], 0)
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class FileRenameTests(CatalogFilesMixin, TestCase):
+    """Renaming a supplier file renames its configuration entry and Provider row"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_config("ferreteria", "bulonera")
+        self.write_price_list("ferreteria_productos.csv", ["P1"])
+        self.write_price_list("bulonera_lista.csv", ["B1"])
+        run_etl_service()
+
+    def rename(self, old_name, new_name):
+        return self.client.post(
+            "/files/upload/", json.dumps({"id": old_name, "name": new_name}), content_type="application/json"
+        )
+
+    def test_rename_moves_the_supplier(self):
+        response = self.rename("ferreteria_productos.csv", "corralon_productos.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.items("corralon"), {"P1"})
+        self.assertIn("corralon", load_config())
+        self.assertEqual([provider["name"] for provider in list_providers()], ["bulonera", "corralon"])
+
+    def test_rename_onto_another_supplier_changes_nothing(self):
+        response = self.rename("ferreteria_productos.csv", "bulonera_productos.csv")
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, "providers", "ferreteria_productos.csv")))
+        self.assertEqual(set(load_config()), {"ferreteria", "bulonera"})
+        self.assertEqual(self.items("ferreteria"), {"P1"})
+        self.assertEqual(self.items("bulonera"), {"B1"})
+
+
+class ProviderListTests(TestCase):
+    """Supplier filter list served from the materialized Provider table"""
+
+    def setUp(self):
+        clear_response_cache()
+        self.addCleanup(clear_response_cache)
+        load_to_database(catalog_frames("ferreteria", ["F1", "F2"]) + catalog_frames("bulonera", ["B1", "B2", "B3"]))
+
+    def counts(self):
+        return [(provider["name"], provider["product_count"]) for provider in list_providers()]
+
+    def test_load_refreshes_counts_and_last_update(self):
+        self.assertEqual(self.counts(), [("bulonera", 3), ("ferreteria", 2)])
+        last_update = Product.objects.filter(proveedor__name="bulonera").latest("fecha_actualizacion").fecha_actualizacion
+        self.assertEqual(list_providers()[0]["last_update"], last_update)
+
+        load_to_database(catalog_frames("bulonera", ["B1"]))
+
+        self.assertEqual(self.counts(), [("bulonera", 1), ("ferreteria", 2)])
+
+    def test_list_does_not_read_the_products_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            list_providers()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(Product._meta.db_table, queries[0]["sql"])
+
+    def test_product_list_response_carries_the_providers(self):
+        data = self.client.get("/api/products/").json()
+        self.assertEqual(data["proveedores"], ["bulonera", "ferreteria"])
+        self.assertEqual(
+            [(provider["name"], provider["product_count"]) for provider in data["proveedores_detalle"]],
+            [("bulonera", 3), ("ferreteria", 2)],
+        )
+
+    def test_deleted_supplier_leaves_the_list(self):
+        self.assertEqual(delete_provider("ferreteria"), 2)
+        self.assertEqual(self.counts(), [("bulonera", 3)])
+        self.assertEqual(self.client.get("/api/products/").json()["proveedores"], ["bulonera"])
+
+
+class JobSubmitTests(TestCase):
+    """One active ETL job at a time, across web processes"""
+
+    def test_database_refuses_a_second_active_job(self):
+        ETLStatus.objects.create(state=ETLStatus.RUNNING)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ETLStatus.objects.create(state=ETLStatus.PENDING)
+        ETLStatus.objects.create(state=ETLStatus.FINISHED)
+
+    def test_submit_racing_another_process_returns_its_job(self):
+        other = ETLStatus.objects.create(state=ETLStatus.PENDING)
+        # The other web worker queued its job after this one checked for an active job
+        with mock.patch("products.services.job_service.get_active_job", return_value=None):
+            job, created = submit_etl_job()
+        self.assertFalse(created)
+        self.assertEqual(job, other)
+        self.assertEqual(ETLStatus.objects.count(), 1)
+
+
+    @override_settings(ETL_JOB_STALE_SECONDS=60, ETL_JOB_HEARTBEAT_SECONDS=30)
+    def test_job_reporting_progress_is_not_reaped(self):
+        job = ETLStatus.objects.create(state=ETLStatus.RUNNING)
+        # Last saved long ago by another web process, e.g. at the start of a long load
+        long_ago = timezone.now() - datetime.timedelta(minutes=10)
+        ETLStatus.objects.filter(pk=job.pk).update(updated_at=long_ago)
+        job.refresh_from_db()
+
+        publish_heartbeat(job, stage="load", rows_written=500)
+        fail_stale_jobs()
+        self.assertEqual(ETLStatus.objects.get(pk=job.pk).state, ETLStatus.RUNNING)
+
+        # A job that stops reporting is reaped
+        ETLStatus.objects.filter(pk=job.pk).update(updated_at=long_ago)
+        fail_stale_jobs()
+        self.assertEqual(ETLStatus.objects.get(pk=job.pk).state, ETLStatus.FAILED)
+
+
+class ProgressStreamTests(TestCase):
+    """The SSE progress stream releases its worker"""
+
+    @override_settings(ETL_SSE_MAX_SECONDS=0, ETL_SSE_POLL_SECONDS=0, ETL_SSE_HEARTBEAT_SECONDS=0)
+    def test_stream_of_a_running_job_ends_so_the_browser_reconnects(self):
+        job = ETLStatus.objects.create(state=ETLStatus.RUNNING, status="Extrayendo", progress=10)
+        frames = list(job_progress_frames(str(job.job_id)))
+        self.assertEqual(frames[0], "retry: 3000\n\n")
+        self.assertEqual(json.loads(frames[1][len("data: "):])["state"], ETLStatus.RUNNING)
+        self.assertEqual(len(frames), 2)
+
+
+class UpsertLoadTests(TestCase):
+    """Set-based load: products keyed by (proveedor, item), written with a fixed number of queries"""
+
+    def load(self, provider, rows, price=100):
+        items = [f"{provider[0].upper()}{index}" for index in range(rows)]
+        return load_to_database(catalog_frames(provider, items, price=price), batch_size=50, commit_rows=0)
+
+    def test_query_count_depends_on_chunks_not_rows(self):
+        # The first load of the database also creates the catalog state row
+        self.load("corralon", 1)
+
+        created = [self.load("bulonera", 10), self.load("ferreteria", 50), self.load("maderera", 400)]
+        updated = [self.load("bulonera", 10, 150), self.load("ferreteria", 50, 150), self.load("maderera", 400, 150)]
+
+        self.assertEqual([stats["created"] for stats in created], [10, 50, 400])
+        self.assertEqual([stats["updated"] for stats in updated], [10, 50, 400])
+        # One chunk of 50 rows costs the same as one of 10 rows
+        self.assertEqual(created[0]["queries"], created[1]["queries"])
+        self.assertEqual(updated[0]["queries"], updated[1]["queries"])
+        # 7 more chunks: one insert each; one upsert and one price history insert each
+        self.assertEqual(created[2]["queries"] - created[1]["queries"], 7)
+        self.assertEqual(updated[2]["queries"] - updated[1]["queries"], 14)
+        self.assertIsNotNone(created[2]["rows_per_second"])
+
+    def test_same_item_of_two_suppliers_are_two_products(self):
+        load_to_database(catalog_frames("bulonera", ["A1"], price=100) + catalog_frames("ferreteria", ["A1"], price=200))
+
+        stats = load_to_database(catalog_frames("bulonera", ["A1"], price=150))
+
+        self.assertEqual((stats["created"], stats["updated"]), (0, 1))
+        prices = dict(Product.objects.filter(item="A1").values_list("proveedor__name", "product_price"))
+        self.assertEqual(prices, {"bulonera": 150, "ferreteria": 200})
+
+    def test_database_rejects_a_repeated_supplier_item(self):
+        load_to_database(catalog_frames("bulonera", ["A1"]))
+        product = Product.objects.get(item="A1")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Product.objects.create(
+                item="A1", product_name="OTRO", product_price=1, proveedor=product.proveedor,
+                fecha_actualizacion=timezone.now(),
+            )
+
+
+class PriceChangeTests(TestCase):
+    """Price history of the in-place load"""
+
+    def test_prices_are_compared_in_cents(self):
+        load_to_database(catalog_frames("bulonera", ["A1", "A2"], price=99999999.99))
+        frames = catalog_frames("bulonera", ["A1", "A2"], price=99999999.99)
+        # Name-only change of A1, price change of A2 by one cent
+        frames[0][0].loc[0, "product_name"] = "PRODUCTO A1 NUEVO"
+        frames[0][0].loc[1, "product_price"] = 99999999.98
+        stats = load_to_database(frames)
+
+        self.assertEqual((stats["updated"], stats["price_changes"]), (2, 1))
+        change = ProductPriceHistory.objects.get()
+        self.assertEqual(change.product.item, "A2")
+        self.assertEqual((str(change.old_price), str(change.new_price)), ("99999999.99", "99999999.98"))
+
+    def test_rounded_price_is_not_a_change(self):
+        # 0.575 is stored as 0.58, while the float 0.575 * 100 is 57.49999999999999
+        load_to_database(catalog_frames("bulonera", ["A1"], price=0.575))
+        frames = catalog_frames("bulonera", ["A1"], price=0.575)
+        frames[0][0].loc[0, "product_name"] = "PRODUCTO A1 NUEVO"
+        stats = load_to_database(frames)
+
+        self.assertEqual((stats["updated"], stats["price_changes"]), (1, 0))
+        self.assertFalse(ProductPriceHistory.objects.exists())
+
+
+class SweepLoadTests(TestCase):
+    """Sweep of the in-place load, on transformed dataframes"""
+
+    def setUp(self):
+        self.items = [f"A{index}" for index in range(5)]
+        load_to_database(catalog_frames("bulonera", self.items, price=100))
+        load_to_database(catalog_frames("bulonera", self.items, price=150))
+
+    def test_swept_products_leave_search_and_price_history(self):
+        stats = load_to_database(catalog_frames("bulonera", self.items[:4], price=150))
+
+        self.assertEqual(stats["swept"], 1)
+        self.assertEqual(stats["providers"]["bulonera"]["swept"], 1)
+        self.assertFalse(Product.objects.filter(item="A4").exists())
+        self.assertEqual(ProductPriceHistory.objects.count(), 4)
+        self.assertEqual(Provider.objects.get(name="bulonera").product_count, 4)
+        self.assertEqual(search("a4"), set())
+
+    def test_empty_file_sweeps_nothing(self):
+        stats = load_to_database(catalog_frames("bulonera", []))
+        self.assertEqual(stats["swept"], 0)
+        self.assertEqual(Product.objects.count(), 5)
+
+    @override_settings(ETL_SWEEP_ENABLED=False)
+    def test_sweep_disabled(self):
+        load_to_database(catalog_frames("bulonera", self.items[:2], price=150))
+        self.assertEqual(Product.objects.count(), 5)
+
+
+class InterruptedLoadTests(TestCase):
+    """Loads with bounded commits that fail after some batches are committed"""
+
+    def test_cancelled_load_publishes_committed_batches(self):
+        load_to_database(catalog_frames("bulonera", [f"A{index}" for index in range(10)]))
+        generation = catalog_generation()
+
+        def cancel_after_two_batches(written, total):
+            if written > 4:
+                raise ETLCancelled()
+
+        with self.assertRaises(ETLCancelled):
+            load_to_database(
+                catalog_frames("bulonera", [f"B{index}" for index in range(10)]),
+                batch_size=2, commit_rows=2, on_progress=cancel_after_two_batches,
+            )
+
+        # Two batches of two rows were committed before the cancellation
+        self.assertEqual(Product.objects.count(), 14)
+        self.assertEqual(Provider.objects.get(name="bulonera").product_count, 14)
+        self.assertGreater(catalog_generation(), generation)
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"], PRODUCT_RESPONSE_CACHE_SIZE=0, PRODUCT_RESPONSE_CACHE_SHARED=False,
+)
+class ConcurrentReadTests(CatalogTransactionTestCase):
+    """Product list reads served from other threads while the ETL load commits in batches"""
+
+    def test_reads_during_bounded_commit_load(self):
+        items = [f"C{index:05d}" for index in range(3000)]
+        load_to_database(catalog_frames("bulonera", items, price=100))
+        reads_during_load = []
+
+        def slow_progress(written, total):
+            # Holds every batch open for a moment, so readers hit the load mid-transaction
+            time.sleep(0.01)
+            reads_during_load.append(written)
+
+        stats, _, report = run_with_readers(
+            2, ["bulonera"], 0,
+            lambda: load_to_database(
+                catalog_frames("bulonera", items, price=120), batch_size=250, commit_rows=500, on_progress=slow_progress,
+            ),
+        )
+
+        self.assertEqual(stats["updated"], 3000)
+        self.assertTrue(reads_during_load)
+        self.assertGreater(report["requests"], 0)
+        self.assertEqual(report["errors"], 0, report.get("first_error"))
+        self.assertEqual(set(Product.objects.values_list("product_price", flat=True)), {120})
+
+
+def sqlite_rows(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def search(text):
+    return set(apply_search(Product.objects.all(), text).values_list("item", flat=True))
+
+
+class SearchTests(TestCase):
+    """Product search through the SQLite FTS5 index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        products = {
+            "TOR-100": "TORNILLO AUTOPERFORANTE",
+            "TOR-200": "TORNILLO HEXAGONAL",
+            "CG-1": "CAÑO GALVANIZADO",
+            "LLAVE8": "JUEGO DE TUBOS",
+            "LC-10": "LLAVE COMBINADA 10",
+        }
+        df = pd.DataFrame({"item": list(products), "product_name": list(products.values()), "product_price": 100.0})
+        load_to_database([(df, {"proveedor": "ferretería", "fecha_actualizacion": timezone.now(), "file": "ferreteria.csv"})])
+
+    def ranked(self, text):
+        return list(apply_search(Product.objects.all(), text).order_by("search_rank").values_list("item", flat=True))
+
+    def test_case_and_accents_are_folded(self):
+        self.assertEqual(search("tornillo"), {"TOR-100", "TOR-200"})
+        self.assertEqual(search("cano"), {"CG-1"})
+        self.assertEqual(search("CAÑO"), {"CG-1"})
+        self.assertEqual(search("ferreteria"), {"TOR-100", "TOR-200", "CG-1", "LLAVE8", "LC-10"})
+
+    def test_prefix_terms_must_all_match(self):
+        self.assertEqual(search("torn"), {"TOR-100", "TOR-200"})
+        self.assertEqual(search("torn auto"), {"TOR-100"})
+        self.assertEqual(search("torn galv"), set())
+        self.assertEqual(build_match_query("llave 3/8"), '"llave"* "3 8"*')
+
+    def test_item_matches_rank_above_name_matches(self):
+        self.assertEqual(self.ranked("llave"), ["LLAVE8", "LC-10"])
+
+    def test_triggers_are_reinstalled_after_a_table_rebuild(self):
+        with connection.cursor() as cursor:
+            # What SQLite leaves behind when a migration remakes products_product
+            for trigger in SEARCH_TRIGGERS[:3]:
+                cursor.execute(f"DROP TRIGGER {trigger}")
+        Product.objects.filter(item="CG-1").update(product_name="CAÑERIA DE COBRE")
+
+        self.assertTrue(ensure_search_index())
+        self.assertFalse(ensure_search_index())
+        self.assertEqual(search("cobre"), {"CG-1"})
+        self.assertEqual(search("galvanizado"), set())
+        load_to_database(catalog_frames("bulonera", ["NUEVO1"]))
+        self.assertEqual(search("nuevo1"), {"NUEVO1"})
+
+    def test_substring_fallback_without_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {FTS_TABLE}")
+        with mock.patch("products.services.search_service._index_available", None):
+            self.assertIsNone(apply_search(Product.objects.all(), "tornillo"))
+            items = set(filter_products("TORNILLO").values_list("item", flat=True))
+            self.assertEqual(items, {"TOR-100", "TOR-200"})
+            self.assertEqual(set(filter_products("lc-").values_list("item", flat=True)), {"LC-10"})
+
+
+class ShadowLoadTests(CatalogTransactionTestCase):
+    """Shadow table load and table swap (settings.ETL_LOAD_MODE = "shadow")"""
+
+    INDEXES_SQL = "SELECT name, sql FROM sqlite_master WHERE tbl_name = 'products_product' ORDER BY name"
+    LEFTOVER_TABLES_SQL = f"SELECT name FROM sqlite_master WHERE name IN ('{SHADOW_TABLE}', '{OLD_TABLE}')"
+
+    def setUp(self):
+        super().setUp()
+        self.items = [f"A{index}" for index in range(10)]
+        load_to_database(catalog_frames("bulonera", self.items, price=100))
+        self.ids = dict(Product.objects.values_list("item", "id"))
+
+    def assertCatalogIntegrity(self):
+        self.assertEqual(sqlite_rows("PRAGMA foreign_keys"), [(1,)])
+        self.assertEqual(sqlite_rows("PRAGMA foreign_key_check"), [])
+        self.assertEqual(sqlite_rows(self.LEFTOVER_TABLES_SQL), [])
+        sqlite_rows(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    def test_swap_publishes_new_catalog(self):
+        schema = sqlite_rows(self.INDEXES_SQL)
+        generation = catalog_generation()
+
+        stats = load_shadow(catalog_frames("bulonera", self.items + ["NUEVO1"], price=150))
+
+        self.assertEqual((stats["created"], stats["updated"], stats["price_changes"]), (1, 10, 10))
+        # Modified products keep their id; new ones continue the sequence
+        ids = dict(Product.objects.values_list("item", "id"))
+        self.assertEqual({item: ids[item] for item in self.items}, self.ids)
+        self.assertGreater(ids["NUEVO1"], max(self.ids.values()))
+        self.assertEqual(set(Product.objects.values_list("product_price", flat=True)), {150})
+        self.assertEqual(ProductPriceHistory.objects.filter(old_price=100, new_price=150).count(), 10)
+        self.assertEqual(Provider.objects.get(name="bulonera").product_count, 11)
+        self.assertGreater(catalog_generation(), generation)
+        self.assertEqual(search("nuevo1"), {"NUEVO1"})
+        # Same table definition, indexes and search triggers as before the swap
+        self.assertEqual(sqlite_rows(self.INDEXES_SQL), schema)
+        self.assertCatalogIntegrity()
+
+    def test_cancelled_load_leaves_catalog_untouched(self):
+        generation = catalog_generation()
+
+        def cancel(loaded, total):
+            raise ETLCancelled()
+
+        with self.assertRaises(ETLCancelled):
+            load_shadow(catalog_frames("bulonera", self.items, price=150), on_progress=cancel)
+
+        self.assertEqual(set(Product.objects.values_list("product_price", flat=True)), {100})
+        self.assertEqual(ProductPriceHistory.objects.count(), 0)
+        self.assertEqual(catalog_generation(), generation)
+        self.assertCatalogIntegrity()
+
+    def test_unchanged_load_skips_swap(self):
+        generation = catalog_generation()
+        stats = load_shadow(catalog_frames("bulonera", self.items, price=100))
+        self.assertEqual(stats["unchanged"], 10)
+        self.assertEqual(catalog_generation(), generation)
+        self.assertEqual(dict(Product.objects.values_list("item", "id")), self.ids)
+        self.assertCatalogIntegrity()
+
+    def test_swap_sweeps_missing_products(self):
+        stats = load_shadow(catalog_frames("bulonera", self.items[:8], price=100))
+
+        self.assertEqual(stats["swept"], 2)
+        self.assertEqual(set(Product.objects.values_list("item", flat=True)), set(self.items[:8]))
+        self.assertEqual(Provider.objects.get(name="bulonera").product_count, 8)
+        self.assertEqual(search("a9"), set())
+        self.assertCatalogIntegrity()
+
+    def test_writes_during_the_build_are_kept(self):
+        load_to_database(catalog_frames("ferreteria", ["F1", "F2"]) + catalog_frames("corralon", ["C1"]))
+
+        def concurrent_delete(loaded, total):
+            # Committed by another request while the shadow table is being built
+            delete_provider("corralon")
+
+        load_shadow(catalog_frames("bulonera", self.items, price=150), on_progress=concurrent_delete)
+
+        self.assertEqual(set(Product.objects.values_list("proveedor__name", flat=True)), {"bulonera", "ferreteria"})
+        self.assertEqual(search("c1"), set())
+        self.assertEqual(search("f1"), {"F1"})
+        self.assertCatalogIntegrity()
+
+    def test_item_repeated_across_files_is_counted_once(self):
+        # The second file of the supplier lists A0 again at its stored price and NUEVO1 again
+        files = catalog_frames("bulonera", self.items + ["NUEVO1"], price=150) + catalog_frames("bulonera", ["A0", "NUEVO1"])
+
+        stats = load_shadow(files)
+
+        self.assertEqual(
+            (stats["rows"], stats["created"], stats["updated"], stats["unchanged"], stats["price_changes"]),
+            (11, 1, 9, 1, 9),
+        )
+        self.assertEqual(Product.objects.count(), 11)
+        self.assertEqual(Product.objects.get(item="A0").product_price, 100)
+        # The last occurrence wins, so A0 has no price change to record
+        self.assertFalse(ProductPriceHistory.objects.filter(product_id=self.ids["A0"]).exists())
+        self.assertEqual(ProductPriceHistory.objects.filter(old_price=100, new_price=150).count(), 9)
+        self.assertCatalogIntegrity()
+
+    def test_swap_with_dangling_references_is_discarded(self):
+        def orphan_row(loaded, total):
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA foreign_keys = OFF")
+                cursor.execute(
+                    f'INSERT INTO "{SHADOW_TABLE}" (item, product_name, product_price, fecha_actualizacion, '
+                    f"content_hash, proveedor_id, load_generation) VALUES ('X1', 'HUERFANO', 1, %s, '', 999999, 0)",
+                    [timezone.now()],
+                )
+                cursor.execute("PRAGMA foreign_keys = ON")
+
+        with self.assertRaises(LoadError):
+            load_shadow(catalog_frames("bulonera", self.items, price=150), on_progress=orphan_row)
+
+        self.assertEqual(set(Product.objects.values_list("product_price", flat=True)), {100})
+        self.assertEqual(dict(Product.objects.values_list("item", "id")), self.ids)
+        self.assertCatalogIntegrity()
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], PRODUCT_RESPONSE_CACHE_SIZE=100, PRODUCT_RESPONSE_CACHE_SHARED=False)
+class ResponseCacheTests(TestCase):
+    """Product list responses cached per catalog generation, with ETag/304"""
+
+    def setUp(self):
+        super().setUp()
+        clear_response_cache()
+        self.addCleanup(clear_response_cache)
+        load_to_database(catalog_frames("bulonera", ["A1", "A2"]))
+
+    def test_cache_hit_has_the_headers_of_a_miss(self):
+        miss = self.client.get("/api/products/", {"search": "a1"})
+        hit = self.client.get("/api/products/", {"search": "A1 "})
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(sorted(hit.headers.items()), sorted(miss.headers.items()))
+        self.assertIn("Accept", hit["Vary"])
+        self.assertEqual(hit["Allow"], "GET, HEAD, OPTIONS")
+
+    def test_if_none_match_is_answered_with_304(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_load_invalidates_cached_pages(self):
+        first = self.client.get("/api/products/")
+        generation = catalog_generation()
+
+        load_to_database(catalog_frames("bulonera", ["A1", "A2", "A3"]))
+
+        self.assertGreater(catalog_generation(), generation)
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual({product["item"] for product in response.json()["results"]}, {"A1", "A2", "A3"})
+
+
+class SerializationTests(TestCase):
+    """The fast serialization path renders the same bytes as ProductSerializer + JSONRenderer"""
+
+    ROWS = [
+        (1, "A1", "CAÑO GALVANIZADO ½\"", Decimal("12523.20"), "bulonera", datetime.datetime(2026, 3, 2, 10, 30)),
+        (2, "B-2", "LLAVE FRANCESA \u2028 8\u2029 PULGADAS", Decimal("5.50"), "ferretería", None),
+        (3, "C3", "TORNILLO 🔩 \"T1\"", None, "corralón", datetime.datetime(2025, 12, 31, 23, 59)),
+        (4, "D4", "DESCUENTO", Decimal("-0.75"), "bulonera", None),
+        (5, "E5", "MÁQUINA", Decimal("1234567.89"), "bulonera", datetime.datetime(2026, 1, 1)),
+    ]
+
+    def legacy_bytes(self, rows):
+        products = [
+            Product(
+                id=product_id, item=item, product_name=product_name, product_price=price,
+                proveedor=Provider(name=proveedor), fecha_actualizacion=fecha,
+            )
+            for product_id, item, product_name, price, proveedor, fecha in rows
+        ]
+        return JSONRenderer().render({"results": ProductSerializer(products, many=True).data})
+
+    def fast_bytes(self, rows):
+        return FastJSONRenderer().render({"results": serialize_product_rows(rows)})
+
+    def test_fast_path_is_byte_identical(self):
+        self.assertEqual(self.fast_bytes(self.ROWS), self.legacy_bytes(self.ROWS))
+        self.assertIn(b"\\u2028", self.fast_bytes(self.ROWS))
+
+    def test_page_read_from_the_database_is_byte_identical(self):
+        load_to_database(catalog_frames("ferretería", ["CAÑO-1", "LLAVE\u2028"], price=1234.5))
+        queryset = Product.objects.order_by("id")
+        legacy = JSONRenderer().render(ProductSerializer(queryset.select_related("proveedor"), many=True).data)
+        fast = FastJSONRenderer().render(serialize_product_rows(queryset.values_list(*PRODUCT_ROW_FIELDS)))
+        self.assertEqual(fast, legacy)
+
+    def test_non_finite_values_are_rejected_like_strict_json(self):
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({"value": Decimal("NaN")})
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({"value": Decimal("NaN")})
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], PRODUCT_RESPONSE_CACHE_SIZE=0, PRODUCT_RESPONSE_CACHE_SHARED=False)
+class ProductListTests(TestCase):
+    """Product list API: query parameter validation"""
+
+    @classmethod
+    def setUpTestData(cls):
+        load_to_database(catalog_frames("bulonera", [f"A{index}" for index in range(5)]))
+
+    def test_cursor_must_decode_to_an_object(self):
+        # "MQ==" decodes to 1 and "WzFd" to [1]: valid JSON, but not a cursor
+        for cursor in ["MQ==", "WzFd", "bm90LWpzb24="]:
+            response = self.client.get("/api/products/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn("cursor", response.json())
+
+    def test_order_by_must_be_a_known_field(self):
+        for order_by in ["search_rank", "-search_rank", "precio", "proveedor__name"]:
+            response = self.client.get("/api/products/", {"order_by": order_by})
+            self.assertEqual(response.status_code, 400, order_by)
+            self.assertIn("order_by", response.json())
+        self.assertEqual(self.client.get("/api/products/", {"order_by": "-product_price"}).status_code, 200)
+        self.assertEqual(self.client.get("/api/products/", {"order_by": "search_rank", "search": "a1"}).status_code, 200)
+
+    def test_cursor_pagination(self):
+        response = self.client.get("/api/products/", {"pagination": "cursor", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(PRODUCT_EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+    """Streaming catalog download with the filters of the product list"""
+
+    def setUp(self):
+        load_to_database(catalog_frames("bulonera", ["B1", "B2", "B3"], price=1234.5) + catalog_frames("ferreteria", ["F1", "F2"]))
+
+    def export(self, **params):
+        response = self.client.get("/api/products/export/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response
+
+    def test_csv_is_streamed_in_chunks(self):
+        response = self.export(order_by="item")
+        chunks = list(response.streaming_content)
+        # Header first, then one chunk per PRODUCT_EXPORT_CHUNK_SIZE rows
+        self.assertEqual(len(chunks), 1 + 3)
+        self.assertTrue(response["Content-Disposition"].endswith('.csv"'))
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+        self.assertEqual([row["item"] for row in rows], ["B1", "B2", "B3", "F1", "F2"])
+        self.assertEqual(rows[0]["proveedor"], "bulonera")
+        self.assertEqual(rows[0]["product_price"], "1234.50")
+
+    def test_list_filters_apply(self):
+        response = self.export(format="ndjson", proveedor="ferreteria", order_by="-item")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["item"] for row in rows], ["F2", "F1"])
+
+        response = self.export(format="ndjson", search="b2")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["item"] for row in rows], ["B2"])
+
+    def test_xlsx_has_numeric_prices(self):
+        response = self.export(format="xlsx", proveedor="bulonera", order_by="item")
+        sheet = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0][:4], ("id", "item", "product_name", "product_price"))
+        self.assertEqual([row[1] for row in rows[1:]], ["B1", "B2", "B3"])
+        self.assertEqual(rows[1][3], 1234.5)
+
+    def test_unknown_format_is_refused(self):
+        response = self.client.get("/api/products/export/", {"format": "pdf"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
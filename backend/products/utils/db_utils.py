@@ -0,0 +1,24 @@
+from itertools import islice
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements executed on a connection.
+    Meant to be installed with connection.execute_wrapper().
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def chunked(iterable, size):
+    """Yields lists of at most `size` elements from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
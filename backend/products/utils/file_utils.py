@@ -7,4 +7,8 @@ def get_providers_path():
 
 def get_config_path():
     """Get the path to the config-proveedores.json file"""
-    return os.path.join(settings.BASE_DIR, "config", "config_proveedores.json")
\ No newline at end of file
+    return os.path.join(settings.BASE_DIR, "config", "config_proveedores.json")
+
+def get_staging_path():
+    """Get the path to the upload staging directory (inside providers/, so publishing is an atomic rename)"""
+    return os.path.join(get_providers_path(), ".staging")
@@ -0,0 +1,65 @@
+"""
+SQLITE PROFILE - Connection pragmas for API reads during ETL loads
+
+SQLite in its default rollback-journal mode locks readers out while a writer
+commits, and the ETL load writes the whole catalog: product list requests
+stalled behind the load or failed with "database is locked".
+
+TECHNICAL SOLUTION:
+- journal_mode=WAL: readers keep reading the last committed snapshot while the
+  ETL writes; writers append to the -wal file and never wait for readers
+- synchronous=NORMAL: no fsync per commit in WAL mode; a power loss may drop
+  the last commits but never corrupts the database
+- cache_size / mmap_size: larger page cache and memory-mapped reads of the
+  catalog table, shared by the queries of a persistent connection
+- temp_store=MEMORY: sorts and temporary b-trees of ordered/filtered product
+  queries stay in memory
+- Applied on every new connection through the connection_created signal
+  (ProductsConfig.ready); with persistent connections (CONN_MAX_AGE) that is
+  once per worker thread instead of once per request
+- The loader commits in bounded batches (settings.ETL_LOAD_COMMIT_ROWS), so
+  the write lock is never held for a whole load
+"""
+
+import logging
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+TEMP_STORES = ("default", "file", "memory")
+
+
+def sqlite_pragmas():
+    """[(pragma, value)] of the configured profile; raises ImproperlyConfigured on invalid values"""
+    choices = {
+        "journal_mode": (settings.SQLITE_JOURNAL_MODE, JOURNAL_MODES),
+        "synchronous": (settings.SQLITE_SYNCHRONOUS, SYNCHRONOUS_LEVELS),
+        "temp_store": (settings.SQLITE_TEMP_STORE, TEMP_STORES),
+    }
+    pragmas = []
+    for name, (value, allowed) in choices.items():
+        value = str(value).lower()
+        if value not in allowed:
+            raise ImproperlyConfigured(f"Valor inválido para SQLITE_{name.upper()}: '{value}'. Valores permitidos: {', '.join(allowed)}.")
+        pragmas.append((name, value))
+    # Integers only: the values are interpolated into the PRAGMA statements
+    pragmas.append(("cache_size", int(settings.SQLITE_CACHE_SIZE)))
+    pragmas.append(("mmap_size", int(settings.SQLITE_MMAP_SIZE)))
+    return pragmas
+
+
+def apply_sqlite_profile(sender, connection, **kwargs):
+    """connection_created receiver: applies the pragmas of the profile to a new SQLite connection"""
+    if connection.vendor != "sqlite" or not settings.SQLITE_PROFILE_ENABLED:
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name} = {value}")
+            if name == "journal_mode":
+                # The pragma answers with the mode in effect; in-memory databases (tests) stay in "memory"
+                mode = cursor.fetchone()[0]
+                if mode != value and not connection.is_in_memory_db():
+                    logger.warning(f"SQLite no pudo activar el modo de journal {value} (modo actual: {mode}).")
@@ -1,3 +1,6 @@
+from products.etl.readers import ENGINES, ALL_SHEETS
+from products.etl.transform import PRICE_FORMATS
+
 def validate_provider_config(config_data):
     if not isinstance(config_data, dict):
         raise ValueError("La configuración debe ser un objeto JSON con claves para cada proveedor.")
@@ -26,6 +29,22 @@ def validate_provider_config(config_data):
         if extract_config["usecols"] is not None and not isinstance(extract_config["usecols"], str):
             raise ValueError(f"'usecols' para el proveedor '{provider}' debe ser una cadena o nulo.")
 
+        # Validar las opciones del lector (opcionales)
+        engine = extract_config.get("engine")
+        if engine is not None and engine not in ENGINES:
+            raise ValueError(f"'engine' para el proveedor '{provider}' debe ser uno de: {', '.join(ENGINES)}.")
+
+        sheet = extract_config.get("sheet")
+        sheets = sheet if isinstance(sheet, list) else [sheet]
+        if sheet is not None and (not sheets or not all(isinstance(s, (int, str)) and not isinstance(s, bool) for s in sheets)):
+            raise ValueError(
+                f"'sheet' para el proveedor '{provider}' debe ser un índice, un nombre de hoja, una lista de ellos o '{ALL_SHEETS}'."
+            )
+
+        for option in ("delimiter", "encoding"):
+            if extract_config.get(option) is not None and not isinstance(extract_config[option], str):
+                raise ValueError(f"'{option}' para el proveedor '{provider}' debe ser una cadena o nulo.")
+
         # Validar transform_config
         if "transform_config" not in config:
             raise ValueError(f"Falta 'transform_config' en la configuración del proveedor '{provider}'.")
@@ -41,6 +60,13 @@ def validate_provider_config(config_data):
         if not isinstance(column_mappings, dict):
             raise ValueError(f"'column_mappings' para el proveedor '{provider}' debe ser un objeto.")
 
+        # Validar el formato de precios (opcional)
+        price_format = transform_config.get("price_format")
+        if price_format is not None and price_format not in PRICE_FORMATS:
+            raise ValueError(
+                f"'price_format' para el proveedor '{provider}' debe ser uno de: {', '.join(PRICE_FORMATS)}."
+            )
+
         # Validar que en los valores se incluyan los mapeos obligatorios
         required_internal_fields = ["item", "product_name", "product_price"]
         for field in required_internal_fields:
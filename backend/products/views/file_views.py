@@ -11,8 +11,9 @@ import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from products.utils.file_utils import get_providers_path
-from products.models import Product
-from products.services.config_service import remove_provider_config, rename_provider_config
+from products.services.config_service import remove_provider_config, rename_key_conflict, rename_provider_config
+from products.services.provider_service import delete_provider
+from products.services.upload_service import UploadError, store_uploaded_file, rename_supplier_file, forget_supplier_file
 
 logger = logging.getLogger(__name__)
 
@@ -50,11 +51,19 @@ def file_upload(request):
             new_file_path = os.path.join(providers_path, new_name)
 
             if os.path.exists(old_file_path):
+                # Refuse before renaming anything: the new name must not take over another supplier
+                conflict = rename_key_conflict(old_name, new_name)
+                if conflict:
+                    return JsonResponse({"error": f"Ya existe un proveedor '{conflict}'."}, status=409)
+
                 os.rename(old_file_path, new_file_path)
+                rename_supplier_file(old_name, new_name)
 
                 # Update provider configuration to maintain ETL pipeline consistency
                 rename_success = rename_provider_config(old_name, new_name)
                 if not rename_success:
+                    os.rename(new_file_path, old_file_path)
+                    rename_supplier_file(new_name, old_name)
                     return JsonResponse({"error": "Error al renombrar la configuración."}, status=500)
 
                 return JsonResponse({"message": f"Archivo renombrado a {new_name} exitosamente."})
@@ -81,12 +90,13 @@ def file_delete(request, filename):
         file_path = os.path.join(providers_path, filename)
         if os.path.exists(file_path):
             os.remove(file_path)
+            forget_supplier_file(filename)
             logger.info(f"Archivo eliminado: {file_path}")
 
             # Clean up associated configuration and products
             remove_provider_config(filename)
             provider_name = filename.split('.')[0].split('_')[0].lower()
-            deleted, _ = Product.objects.filter(proveedor=provider_name).delete()
+            deleted = delete_provider(provider_name)
             logger.info(f"Se eliminaron {deleted} productos asociados al proveedor '{provider_name}'.")
             return JsonResponse({
                 "message": f"Archivo {filename} eliminado y {deleted} productos asociados borrados."
@@ -98,19 +108,18 @@ def file_delete(request, filename):
 
 @csrf_exempt
 def file_add(request):
-    # Handles new supplier Excel file uploads for ETL processing.
+    """
+    Single-request upload of a supplier Excel file for ETL processing.
+    The file is staged and published atomically (products/services/upload_service.py);
+    large files should use the resumable chunked upload (files/uploads/).
+    """
     if request.method == "POST" and request.FILES.get("file"):
         uploaded_file = request.FILES["file"]
-        providers_path = get_providers_path()
-        file_path = os.path.join(providers_path, uploaded_file.name)
-
         try:
-            # Stream upload for memory efficiency with large Excel files
-            with open(file_path, "wb+") as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
-
-            return JsonResponse({"message": f"Archivo {uploaded_file.name} subido exitosamente."})
+            result = store_uploaded_file(uploaded_file)
+            return JsonResponse({"message": f"Archivo {result['name']} subido exitosamente.", **result})
+        except UploadError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
         except Exception as e:
             logger.exception("Error al subir archivo")
             return JsonResponse({"error": f"Error al subir el archivo: {str(e)}"}, status=500)
@@ -0,0 +1,68 @@
+"""
+PRICE HISTORY API - Supplier price changes over time
+
+Answers the buyers' question "what did supplier X change since date/run"
+from ProductPriceHistory, which the ETL load appends to on every price change.
+"""
+
+import logging
+from datetime import datetime, time
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET
+from products.models import ETLStatus
+from products.services.price_history_service import price_changes_since
+from products.services.provider_service import find_provider_ids
+from products.views.etl_views import is_valid_uuid
+
+logger = logging.getLogger(__name__)
+
+MAX_CHANGES_PER_PROVIDER = 1000
+
+def parse_since(value):
+    """Aware datetime from 'YYYY-MM-DD' (start of that day) or an ISO datetime; None if invalid"""
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            since = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+@require_GET
+def price_changes(request):
+    """
+    Price changes per supplier since a date or since an ETL run.
+
+    Query params: since (YYYY-MM-DD or ISO datetime) or job_id (changes loaded since
+    that ETL run started), proveedor (name filter, as in the product list) and
+    limit (changes listed per supplier, default 100, max 1000).
+    """
+    try:
+        limit = min(max(int(request.GET.get("limit", 100)), 1), MAX_CHANGES_PER_PROVIDER)
+    except ValueError:
+        return JsonResponse({"error": "El parámetro limit debe ser un número entero."}, status=400)
+
+    job_id = request.GET.get("job_id")
+    if job_id:
+        run = ETLStatus.objects.filter(job_id=job_id).first() if is_valid_uuid(job_id) else None
+        if run is None:
+            return JsonResponse({"error": "Job no encontrado."}, status=404)
+        since = run.create_ad
+    elif request.GET.get("since"):
+        since = parse_since(request.GET["since"])
+        if since is None:
+            return JsonResponse({"error": "El parámetro since debe ser una fecha (AAAA-MM-DD) o fecha y hora ISO."}, status=400)
+    else:
+        return JsonResponse({"error": "Indique el parámetro since o job_id."}, status=400)
+
+    proveedor = request.GET.get("proveedor", "").strip()
+    provider_ids = find_provider_ids(proveedor) if proveedor else None
+    return JsonResponse({
+        "since": since.isoformat(),
+        "providers": price_changes_since(since, provider_ids, limit),
+    })
@@ -10,11 +10,17 @@ import json
 import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from products.utils.file_utils import get_config_path
+from products.services.config_service import load_config, save_config, build_provider_config
+from products.etl.etl_exceptions import ExtractionError
+from products.services.preview_service import preview_extraction
+from products.utils.file_utils import get_providers_path
 from products.utils.validators import validate_provider_config
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PREVIEW_ROWS = 20
+MAX_PREVIEW_ROWS = 500
+
 @csrf_exempt
 def provider_config(request):
     """
@@ -23,12 +29,9 @@ def provider_config(request):
     BUSINESS FLEXIBILITY: Enables adding new suppliers without code deployment.
     Handles column mapping variations across different Excel formats.
     """
-    config_path = get_config_path()
-    
     if request.method == "GET":
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config_data = json.load(f)
+            config_data = load_config()
             return JsonResponse(config_data, safe=False)
         except Exception as e:
             logger.exception("Error al leer la configuración")
@@ -42,48 +45,13 @@ def provider_config(request):
         
         # Transform simplified config format to internal ETL format
         if "file_name" in new_config:
-            file_name = new_config.get("file_name")
-            if not file_name:
-                return JsonResponse({"error": "El campo 'file_name' no puede estar vacío."}, status=400)
-            file_without_extension = file_name.split('.')[0].lower()
-            provider_key = file_without_extension.split('_')[0].lower()
-            start_row = new_config.get("start_row", 0) - 1
-            column_range = new_config.get("column_range", {})
-            start_col = column_range.get("start", "")
-            end_col = column_range.get("end", "")
-            usecols = f"{start_col}:{end_col}" if start_col and end_col else None
-
-            columns = new_config.get("columns", {})
-            if not all(k in columns for k in ["item", "product_name", "price"]):
-                return JsonResponse({"error": "El objeto 'columns' debe incluir 'item', 'product_name' y 'price'."}, status=400)
-            
-            # Column mapping configuration for ETL transformation
-            transformed_config = {
-                provider_key: {
-                    "extract_config": {
-                        "skiprows": start_row,
-                        "usecols": usecols
-                    },
-                    "transform_config": {
-                        "column_mappings": {
-                            columns["item"]: "item",
-                            columns["product_name"]: "product_name",
-                            columns["price"]: "product_price"
-                        }
-                    }
-                }
-            }
-            new_config = transformed_config
+            try:
+                new_config = build_provider_config(new_config)
+            except ValueError as ve:
+                return JsonResponse({"error": str(ve)}, status=400)
 
         # Load existing configuration and merge
-        existing_config = {}
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, "r", encoding="utf-8") as f:
-                    existing_config = json.load(f)
-            except Exception as e:
-                logger.error("Error al leer la configuración existente. Se procederá a crear una nueva configuración.")
-                existing_config = {}
+        existing_config = load_config()
 
         merged_config = {**existing_config, **new_config}
 
@@ -94,8 +62,7 @@ def provider_config(request):
             return JsonResponse({"error": f"Error de validación: {str(ve)}"}, status=400)
 
         try:
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(merged_config, f, indent=2, ensure_ascii=False)
+            save_config(merged_config)
             return JsonResponse({"message": "Configuración actualizada correctamente."})
         except Exception as e:
             logger.exception("Error al actualizar la configuración")
@@ -111,14 +78,7 @@ def get_file_config(request, file_identifier):
     """
     file_without_extension = file_identifier.split('.')[0].lower()
     provider_name = file_without_extension.split('_')[0]
-    config_path = get_config_path()
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
-            logger.info(f"Configuración cargada: {config_data}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Error al decodificar el JSON de configuración: {str(e)}")
-        config_data = {}
+    config_data = load_config()
 
     key = provider_name.lower()
     config_for_file = config_data.get(key)
@@ -132,4 +92,41 @@ def get_file_config(request, file_identifier):
         inverted_column_mappings = {v: k for k, v in column_mappings.items()}
         config_for_file["transform_config"]["column_mappings"] = inverted_column_mappings
 
-    return JsonResponse({"config": config_for_file})
\ No newline at end of file
+    return JsonResponse({"config": config_for_file})
+
+@csrf_exempt
+def preview_config(request):
+    """
+    Extraction preview of a candidate configuration, without saving it or running the ETL.
+
+    Body: the same simplified configuration as the PUT of provider_config (file_name,
+    start_row, column_range, columns, price_format) plus "rows", the sample size
+    (default 20, max 500). Returns the mapped rows, the detected dtypes of the source
+    columns and a summary of the rows that would be dropped.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Solicitud inválida. Se esperaba JSON."}, status=400)
+
+    file_name = data.get("file_name") or ""
+    if file_name != os.path.basename(file_name) or not os.path.isfile(os.path.join(get_providers_path(), file_name)):
+        return JsonResponse({"error": "Archivo no encontrado."}, status=404)
+
+    try:
+        rows = min(max(int(data.get("rows", DEFAULT_PREVIEW_ROWS)), 1), MAX_PREVIEW_ROWS)
+        candidate = build_provider_config(data)
+        validate_provider_config(candidate)
+    except (TypeError, ValueError) as ve:
+        return JsonResponse({"error": f"Error de validación: {str(ve)}"}, status=400)
+
+    provider, provider_config = next(iter(candidate.items()))
+    try:
+        return JsonResponse(preview_extraction(file_name, provider, provider_config, rows))
+    except ExtractionError as e:
+        return JsonResponse({"error": str(e)}, status=422)
+    except Exception as e:
+        logger.exception(f"Error en la vista previa de {file_name}")
+        return JsonResponse({"error": f"No se pudo leer el archivo con esta configuración: {str(e)}"}, status=422)
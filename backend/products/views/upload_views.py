@@ -0,0 +1,97 @@
+"""
+CHUNKED UPLOAD API - Resumable supplier file uploads
+
+Protocol (products/services/upload_service.py):
+1. POST files/uploads/ {"name", "size"} -> upload_id, offset 0 and suggested chunk_size
+2. PUT files/uploads/<upload_id>/?offset=N with the raw bytes of the chunk as body
+   -> new offset; 409 with the current offset when N is not the resume point
+3. GET files/uploads/<upload_id>/ -> current offset, to resume after a dropped connection
+4. POST files/uploads/<upload_id>/finalize/ {"sha256"} -> file published in providers/
+   DELETE files/uploads/<upload_id>/ discards the upload
+"""
+
+import json
+import logging
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from products.services.upload_service import (
+    UploadError, init_upload, load_session, write_chunk, abort_upload, finalize_upload, is_valid_checksum,
+)
+
+logger = logging.getLogger(__name__)
+
+def upload_error_response(error):
+    return JsonResponse({"error": str(error), **error.details}, status=error.status)
+
+def parse_json_body(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        raise UploadError("Solicitud inválida. Se esperaba JSON.")
+    if not isinstance(data, dict):
+        raise UploadError("Solicitud inválida. Se esperaba un objeto JSON.")
+    return data
+
+@csrf_exempt
+def upload_create(request):
+    """Opens a chunked upload: {"name": "proveedor_lista.xlsx", "size": 12345}"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido."}, status=405)
+    try:
+        data = parse_json_body(request)
+        session = init_upload(data.get("name"), data.get("size"))
+    except UploadError as e:
+        return upload_error_response(e)
+    return JsonResponse(session, status=201)
+
+@csrf_exempt
+def upload_detail(request, upload_id):
+    """GET: upload state and offset. PUT ?offset=N: appends a chunk. DELETE: discards the upload."""
+    upload_id = str(upload_id)
+    try:
+        if request.method == "GET":
+            return JsonResponse(load_session(upload_id))
+
+        if request.method == "PUT":
+            try:
+                offset = int(request.GET["offset"])
+                length = int(request.META.get("CONTENT_LENGTH") or 0)
+            except (KeyError, ValueError):
+                raise UploadError("Se requiere el parámetro offset y el encabezado Content-Length.")
+            # The body is streamed from the request into the staging file, never loaded whole
+            new_offset = write_chunk(upload_id, offset, request, length)
+            return JsonResponse({"upload_id": upload_id, "offset": new_offset})
+
+        if request.method == "DELETE":
+            abort_upload(upload_id)
+            return JsonResponse({"message": "Carga cancelada."})
+
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        logger.exception(f"Error interno en la carga {upload_id}")
+        return JsonResponse({"error": f"Error interno: {str(e)}"}, status=500)
+
+    return JsonResponse({"error": "Método no permitido."}, status=405)
+
+@csrf_exempt
+def upload_finalize(request, upload_id):
+    """Verifies the checksum and publishes the file: {"sha256": "<hex>"} (required)"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido."}, status=405)
+    upload_id = str(upload_id)
+    try:
+        sha256 = parse_json_body(request).get("sha256")
+        if not is_valid_checksum(sha256):
+            raise UploadError("Se requiere la suma de verificación sha256 del archivo, en hexadecimal.")
+        result = finalize_upload(upload_id, sha256)
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        logger.exception(f"Error interno al finalizar la carga {upload_id}")
+        return JsonResponse({"error": f"Error interno: {str(e)}"}, status=500)
+
+    message = f"Archivo {result['name']} subido exitosamente."
+    if result["unchanged"]:
+        message = f"Archivo {result['name']} subido sin cambios respecto de la versión anterior."
+    return JsonResponse({"message": message, **result})
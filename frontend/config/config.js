@@ -7,6 +7,7 @@ const config = {
     VITE_API_URL_FILES_UPLOAD: import.meta.env.VITE_API_URL_FILES_UPLOAD,
     VITE_API_URL_FILES_DELETE: import.meta.env.VITE_API_URL_FILES_DELETE,
     VITE_API_URL_FILES_ADD: import.meta.env.VITE_API_URL_FILES_ADD,
+    VITE_API_URL_FILES_UPLOADS: import.meta.env.VITE_API_URL_FILES_UPLOADS,
     VITE_API_URL_FILE_CONFIG: import.meta.env.VITE_API_URL_FILE_CONFIG,
     VITE_API_URL_VALIDATE_CONFIG: import.meta.env.VITE_API_URL_VALIDATE_CONFIG,
     VITE_API_URL_FILE_CONFIG_ID: import.meta.env.VITE_API_URL_FILE_CONFIG_ID,
@@ -15,6 +16,7 @@ const config = {
     VITE_API_URL_ETL: import.meta.env.VITE_API_URL_ETL,
     VITE_API_URL_ETL_LAST_UPDATE: import.meta.env.VITE_API_URL_ETL_LAST_UPDATE,
     VITE_API_URL_ETL_STATUS: import.meta.env.VITE_API_URL_ETL_STATUS,
+    VITE_API_URL_ETL_JOBS: import.meta.env.VITE_API_URL_ETL_JOBS,
   },
 };
 
@@ -44,7 +44,7 @@ const AddExcelFile = ({ setIsEditing, setSelectedFile }) => {
         <input
           type="file"
           id="fileInput"
-          accept=".xlsx, .xls, .XLS, .XLSX"
+          accept=".xlsx, .xls, .csv, .XLS, .XLSX, .CSV"
           onChange={handleFileChange}
           className="hidden"
         />
@@ -7,6 +7,7 @@ import PropTypes from "prop-types";
 const ETLButton = ({ filesExist }) => {
   const {
     runETL,
+    cancelETL,
     etlStatus,
     etlProgress,
     showModal,
@@ -37,7 +38,12 @@ const ETLButton = ({ filesExist }) => {
           onClose={() => setShowErrorModal(false)}
         />
       ) : (
-        <ETLModal show={showModal} status={etlStatus} progress={etlProgress} />
+        <ETLModal
+          show={showModal}
+          status={etlStatus}
+          progress={etlProgress}
+          onCancel={cancelETL}
+        />
       )}
     </div>
   );
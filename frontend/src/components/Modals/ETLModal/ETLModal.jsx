@@ -2,7 +2,7 @@ import "animate.css";
 import Spinner from "../../Spinner/spinner.jsx";
 import PropTypes from "prop-types";
 
-const ETLModal = ({ show, status, progress }) => {
+const ETLModal = ({ show, status, progress, onCancel }) => {
   if (!show) return null;
 
   return (
@@ -20,6 +20,15 @@ const ETLModal = ({ show, status, progress }) => {
         <p className="text-sm text-gray-500 mt-4">
           {status} - Progreso: {progress}%
         </p>
+
+        {onCancel && (
+          <button
+            className="mt-4 bg-red-500 hover:bg-red-600 transition-colors text-white font-bold py-2 px-4 rounded"
+            onClick={onCancel}
+          >
+            Cancelar
+          </button>
+        )}
       </div>
     </div>
   );
@@ -31,4 +40,5 @@ ETLModal.propTypes = {
   show: PropTypes.bool.isRequired,
   status: PropTypes.string.isRequired,
   progress: PropTypes.number.isRequired,
+  onCancel: PropTypes.func,
 };
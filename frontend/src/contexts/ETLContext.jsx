@@ -1,6 +1,6 @@
 /***
   ETL Pipeline Integration: Real-time data processing orchestration from frontend
-  Manages async ETL operations with live progress tracking and error handling 
+  Manages async ETL jobs with live progress tracking, cancellation and error handling 
 ***/
 
 import { createContext, useContext, useEffect, useState } from "react";
@@ -11,8 +11,12 @@ import config from "../../config/config.js";
 
 const ETLContext = createContext();
 
+// Job states after which the backend no longer updates the run
+const FINAL_STATES = ["finished", "failed", "cancelled"];
+
 export const ETLProvider = ({ children }) => {
   const [etlRunning, setEtlRunning] = useState(false);
+  const [etlJobId, setEtlJobId] = useState(null);
   const [etlStatus, setEtlStatus] = useState("No iniciado");
   const [etlProgress, setEtlProgress] = useState(0);
   const [etlLastUpdate, setEtlLastUpdate] = useState(null);
@@ -38,8 +42,16 @@ export const ETLProvider = ({ children }) => {
     }
   };
 
-  // ETL Pipeline Trigger - initiates backend data processing workflow
-  // Handles async operations with comprehensive error handling
+  const handleETLError = (errorMessage) => {
+    setEtlError(errorMessage);
+    setShowErrorModal(true);
+    setShowModal(false);
+    setEtlRunning(false);
+    setEtlProgress(0);
+  };
+
+  // ETL Pipeline Trigger - queues a backend ETL job and follows it by job_id
+  // A 409 means a job is already running: the UI attaches to that job instead
   const runETL = async () => {
     setEtlRunning(true);
     setEtlStatus("Ejecutando...");
@@ -48,28 +60,42 @@ export const ETLProvider = ({ children }) => {
     setEtlError("");
 
     try {
-      await axios.post(config.etl.VITE_API_URL_ETL, {
+      const response = await axios.post(config.etl.VITE_API_URL_ETL, {
         headers: { "Content-Type": "application/json" },
       });
 
-      // Start real-time status polling after successful trigger
-      pollETLStatus();
+      // Start real-time progress tracking after successful trigger
+      setEtlJobId(response.data.job_id);
+      followETLProgress(response.data.job_id);
     } catch (error) {
+      if (error.response?.status === 409 && error.response.data?.job_id) {
+        setEtlJobId(error.response.data.job_id);
+        followETLProgress(error.response.data.job_id);
+        return;
+      }
       const errorMessage =
         error.response && error.response.data && error.response.data.error
           ? error.response.data.error
           : error.message || "Error desconocido durante el ETL.";
-      setEtlError(errorMessage);
-      setShowErrorModal(true);
-      setShowModal(false);
-      setEtlRunning(false);
-      setEtlProgress(0);
+      handleETLError(errorMessage);
+    }
+  };
+
+  const cancelETL = async () => {
+    if (!etlJobId) return;
+    try {
+      await axios.post(`${config.etl.VITE_API_URL_ETL_JOBS}${etlJobId}/cancel/`);
+      setEtlStatus("Cancelando...");
+    } catch (error) {
+      console.error("Error al cancelar el ETL:", error);
     }
   };
 
-  const getETLStatus = async () => {
+  const getETLStatus = async (jobId) => {
     try {
-      const response = await axios.get(config.etl.VITE_API_URL_ETL_STATUS);
+      const response = await axios.get(
+        `${config.etl.VITE_API_URL_ETL_JOBS}${jobId}/`
+      );
 
       setEtlStatus(response.data.status);
       setEtlProgress(response.data.progress);
@@ -79,18 +105,59 @@ export const ETLProvider = ({ children }) => {
     }
   };
 
-  // Real-time ETL monitoring - polling strategy for long-running processes
   // Auto-refreshes product data upon completion for seamless user experience
-  const pollETLStatus = () => {
-    const interval = setInterval(async () => {
-      const data = await getETLStatus();
+  const handleETLFinished = (data) => {
+    setEtlJobId(null);
+    if (data.state === "failed") {
+      handleETLError(data.status);
+      return;
+    }
+    fetchProducts();
+    fetchLastUpdate();
+    setEtlRunning(false);
+    setTimeout(() => setShowModal(false), 1000);
+  };
+
+  // Real-time ETL monitoring - Server-Sent Events pushed by the backend on every
+  // stage, provider and load chunk. Falls back to polling if the stream fails.
+  const followETLProgress = (jobId) => {
+    if (typeof EventSource === "undefined") {
+      pollETLStatus(jobId);
+      return;
+    }
+
+    const source = new EventSource(
+      `${config.etl.VITE_API_URL_ETL_JOBS}${jobId}/events/`
+    );
 
-      if (data?.status === "Finalizado" || data?.status === "Error") {
-        fetchProducts();
-        fetchLastUpdate();
-        clearInterval(interval);
-        setTimeout(() => setShowModal(false), 1000);
+    source.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      setEtlStatus(data.status);
+      setEtlProgress(data.progress);
+
+      if (FINAL_STATES.includes(data.state)) {
+        source.close();
+        handleETLFinished(data);
       }
+    };
+
+    // The server closes the stream periodically and the browser reconnects on its own;
+    // only a stream the browser gave up on (CLOSED) falls back to polling
+    source.onerror = () => {
+      if (source.readyState !== EventSource.CLOSED) return;
+      pollETLStatus(jobId);
+    };
+  };
+
+  // Polling fallback for browsers or proxies without Server-Sent Events support
+  const pollETLStatus = (jobId) => {
+    const interval = setInterval(async () => {
+      const data = await getETLStatus(jobId);
+
+      if (!data || !FINAL_STATES.includes(data.state)) return;
+
+      clearInterval(interval);
+      handleETLFinished(data);
     }, 2000);
   };
 
@@ -99,6 +166,7 @@ export const ETLProvider = ({ children }) => {
       value={{
         // ETL execution control
         runETL,
+        cancelETL,
 
         // Process monitoring
         etlRunning,
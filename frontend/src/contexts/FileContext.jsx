@@ -8,6 +8,7 @@ import axios from "axios";
 import PropTypes from "prop-types";
 import config from "../../config/config.js";
 import { useProductsContext } from "./ProductsContext.jsx";
+import { createSha256 } from "../../utils/sha256.js";
 
 const FileContext = createContext();
 
@@ -76,17 +77,59 @@ export const FileProvider = ({ children }) => {
     }
   };
 
-  // File upload with FormData - handles multipart/form-data properly
+  // Resumable chunked upload - a dropped chunk is retried from the offset the server holds.
+  // Returns the sha256 of the file for the finalize check, hashed chunk by chunk as the
+  // server confirms it, so the file is never read into memory whole
+  const uploadChunks = async (file, uploadUrl, chunkSize, maxRetries = 3) => {
+    const sha256 = createSha256();
+    let hashed = 0;
+    const hashUpTo = async (end) => {
+      if (end > hashed) {
+        sha256.update(new Uint8Array(await file.slice(hashed, end).arrayBuffer()));
+        hashed = end;
+      }
+    };
+
+    let offset = 0;
+    let retries = 0;
+    while (offset < file.size) {
+      try {
+        const chunk = new Uint8Array(await file.slice(offset, offset + chunkSize).arrayBuffer());
+        const response = await axios.put(`${uploadUrl}?offset=${offset}`, chunk, {
+          headers: { "Content-Type": "application/octet-stream" },
+        });
+        if (offset === hashed && response.data.offset === offset + chunk.length) {
+          sha256.update(chunk);
+          hashed = response.data.offset;
+        } else {
+          await hashUpTo(response.data.offset);
+        }
+        offset = response.data.offset;
+        retries = 0;
+      } catch (error) {
+        if (retries >= maxRetries) {
+          throw error;
+        }
+        retries += 1;
+        const status = await axios.get(uploadUrl);
+        offset = status.data.offset;
+        await hashUpTo(offset);
+      }
+    }
+    return sha256.hex();
+  };
+
   const addFile = async (file) => {
     try {
-      const formData = new FormData();
-      formData.append("file", file);
-
-      await axios.post(config.files.VITE_API_URL_FILES_ADD, formData, {
-        headers: {
-          "Content-Type": "multipart/form-data",
-        },
+      const uploadsUrl = config.files.VITE_API_URL_FILES_UPLOADS;
+      const { data: upload } = await axios.post(uploadsUrl, {
+        name: file.name,
+        size: file.size,
       });
+      const uploadUrl = `${uploadsUrl}${upload.upload_id}/`;
+
+      const sha256 = await uploadChunks(file, uploadUrl, upload.chunk_size);
+      await axios.post(`${uploadUrl}finalize/`, { sha256 });
       await fetchFiles();
     } catch (error) {
       console.error("Error uploading file:", error);
@@ -0,0 +1,98 @@
+/***
+  Incremental SHA-256 - hashes a file chunk by chunk as it is uploaded
+  WebCrypto only digests a whole buffer at once (and is missing on plain http),
+  so the upload would have to read the entire file into memory to checksum it
+***/
+
+const K = new Uint32Array([
+  0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+  0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+  0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+  0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+  0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+  0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+  0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+  0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+]);
+
+const rotr = (value, bits) => (value >>> bits) | (value << (32 - bits));
+
+export const createSha256 = () => {
+  const state = new Uint32Array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+  ]);
+  const words = new Uint32Array(64);
+  const block = new Uint8Array(64);
+  let blockLength = 0;
+  let totalLength = 0;
+
+  const compress = (bytes, start) => {
+    for (let i = 0; i < 16; i++) {
+      const j = start + i * 4;
+      words[i] = (bytes[j] << 24) | (bytes[j + 1] << 16) | (bytes[j + 2] << 8) | bytes[j + 3];
+    }
+    for (let i = 16; i < 64; i++) {
+      const s0 = rotr(words[i - 15], 7) ^ rotr(words[i - 15], 18) ^ (words[i - 15] >>> 3);
+      const s1 = rotr(words[i - 2], 17) ^ rotr(words[i - 2], 19) ^ (words[i - 2] >>> 10);
+      words[i] = words[i - 16] + s0 + words[i - 7] + s1;
+    }
+    let [a, b, c, d, e, f, g, h] = state;
+    for (let i = 0; i < 64; i++) {
+      const t1 = h + (rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25)) + ((e & f) ^ (~e & g)) + K[i] + words[i];
+      const t2 = (rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c));
+      h = g;
+      g = f;
+      f = e;
+      e = (d + t1) | 0;
+      d = c;
+      c = b;
+      b = a;
+      a = (t1 + t2) | 0;
+    }
+    state[0] += a;
+    state[1] += b;
+    state[2] += c;
+    state[3] += d;
+    state[4] += e;
+    state[5] += f;
+    state[6] += g;
+    state[7] += h;
+  };
+
+  const update = (bytes) => {
+    let position = 0;
+    totalLength += bytes.length;
+    if (blockLength) {
+      const taken = Math.min(64 - blockLength, bytes.length);
+      block.set(bytes.subarray(0, taken), blockLength);
+      blockLength += taken;
+      position = taken;
+      if (blockLength < 64) {
+        return;
+      }
+      compress(block, 0);
+      blockLength = 0;
+    }
+    for (; position + 64 <= bytes.length; position += 64) {
+      compress(bytes, position);
+    }
+    block.set(bytes.subarray(position), 0);
+    blockLength = bytes.length - position;
+  };
+
+  // Pads the last block with the message length in bits; the hasher is done afterwards
+  const hex = () => {
+    const bitLength = totalLength * 8;
+    const padding = new Uint8Array((blockLength < 56 ? 56 : 120) - blockLength + 8);
+    padding[0] = 0x80;
+    const view = new DataView(padding.buffer);
+    view.setUint32(padding.length - 8, Math.floor(bitLength / 0x100000000));
+    view.setUint32(padding.length - 4, bitLength >>> 0);
+    update(padding);
+    return Array.from(state)
+      .map((word) => word.toString(16).padStart(8, "0"))
+      .join("");
+  };
+
+  return { update, hex };
+};